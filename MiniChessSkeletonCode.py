@@ -1,26 +1,115 @@
+import os
 import math
-import copy
 import time
 import argparse
 import threading
 from game_io import get_game_parameters, save_game_trace
+from bitboard import BitboardPosition, WHITE, NO_CAPTURE_LIMIT, REPETITION_CLOCK, decode_move, board_key, moved_key, extend_history
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from move_ordering import MoveOrderer
+from evaluation import TABLES, evaluate_board
+from parallel_search import parallel_root_search
+from time_manager import TimeManager, MAX_SEARCH_DEPTH
+from tablebase import Tablebases
+from game_trace import TraceWriter
+from ponder import Ponderer
+from compact_position import CompactPosition, to_game_state
+from analysis_cache import AnalysisCache, search_variant
+from opening_book import OpeningBook
+from instrumentation import SearchStats, MoveProfiler, cutoff_rates, write_move_report
+try:
+    from batch_eval import score_children
+except ImportError:  # NumPy is optional; without it frontier nodes are scored one child at a time
+    score_children = None
+
+# Counters of the selective pruning techniques and of the nodes cut off as draws, reported with the search statistics
+PRUNING_COUNTERS = ("null_move_cutoffs", "reduced_moves", "reduction_re_searches", "futile_moves", "draw_cutoffs")
 
 class MiniChess:
-    def __init__(self):
-        self.game_parameters = get_game_parameters()
-        print(f"Loaded Game Parameters: {self.game_parameters}")
+    def __init__(self, game_parameters=None):
+        # Parameters come from the command line unless given directly (e.g. in a worker process)
+        if game_parameters is None:
+            game_parameters = get_game_parameters()
+            print(f"Loaded Game Parameters: {game_parameters}")
+        self.game_parameters = game_parameters
         self.current_game_state = self.init_board()
         self.initial_board = [row.copy() for row in self.current_game_state["board"]]
         self.totalMoves = 0
         self.turnNumber = 0  # Counter for draw condition
         self.moves_log = []
         self.board_snapshots = []
+        # Binary trace streamed during play() (None when the text trace is written at the end)
+        self.trace_writer = None
         
         # AI statistics
         self.states_explored = 0
         self.states_by_depth = {}
         self.total_branching_factor = 0
         self.total_branching_samples = 0
+        self.quiescence_nodes = 0
+
+        # Quiescence search at the leaves: node budget per leaf (0 for none) and delta pruning margin
+        self.use_quiescence = self.game_parameters.get("quiescence", True)
+        self.quiescence_budget = self.game_parameters.get("quiescence_budget", 256) or float('inf')
+        self.delta_margin = self.game_parameters.get("delta_margin", 2)
+        self.quiescence_left = 0
+
+        # Search algorithm: "minimax" (minimax with alpha-beta) or "pvs" (negamax principal variation search)
+        self.search_mode = self.game_parameters.get("search", "minimax")
+        self.aspiration_window = self.game_parameters.get("aspiration_window", 3)
+        # Triangular principal variation table filled in by negamax, and the line of the last iteration
+        self.pv_table = [[] for _ in range(MAX_SEARCH_DEPTH + 2)]
+        self.principal_variation = []
+
+        # Selective pruning, each off unless switched on (see null_move_allowed and late_move_reduced)
+        self.null_move = self.game_parameters.get("null_move", False)
+        self.null_move_reduction = self.game_parameters.get("null_move_reduction", 2)
+        self.late_move_reductions = self.game_parameters.get("lmr", False)
+        self.lmr_moves = self.game_parameters.get("lmr_moves", 3)
+        self.lmr_min_depth = self.game_parameters.get("lmr_min_depth", 3)
+        self.futility = self.game_parameters.get("futility", False)
+        self.futility_margin = self.game_parameters.get("futility_margin", 3)
+        self.pruning_counts = dict.fromkeys(PRUNING_COUNTERS, 0)
+        # The search scores the no-capture and max_turns draws and repetitions as 0
+        self.max_turns = self.game_parameters.get("max_turns")
+        # Generate moves in stages (see move_ordering.py) instead of all at once
+        self.staged_generation = self.game_parameters.get("staged_moves", True)
+
+        # Transposition table shared by every search in this game (size 0 disables it)
+        hash_size = self.game_parameters.get("hash_size", 16)
+        self.transposition_table = TranspositionTable(hash_size) if hash_size > 0 else None
+        self.move_orderer = MoveOrderer() if self.game_parameters.get("move_ordering", True) else None
+        self.batch_eval = self.game_parameters.get("batch_eval", False)
+        if self.batch_eval and score_children is None:
+            print("NumPy is not installed, batch evaluation is disabled.")
+            self.batch_eval = False
+        # Process pool for the parallel root search, started on first use
+        self.worker_pool = None
+        # Time manager of the search in progress (its stop() cancels the search)
+        self.time_manager = None
+        # Endgame tablebases (see tablebase.py), if any have been generated
+        self.tablebases = Tablebases(self.game_parameters.get("tablebase_dir", "tablebases"))
+        if len(self.tablebases) == 0:
+            self.tablebases = None
+        # Deep results shared with other engine processes through a file (see analysis_cache.py)
+        cache_path = self.game_parameters.get("analysis_cache", "")
+        self.analysis_cache = AnalysisCache(cache_path, self.game_parameters.get("analysis_cache_mb", 64)) if cache_path else None
+        self.cache_variant = search_variant(self.game_parameters)
+        self.cache_depth = self.game_parameters.get("cache_depth", 8)
+        self.cache_hit = False
+        # Depth of the last iteration search_position completed (a later one may have been cut short)
+        self.completed_depth = 0
+        # Opening book (see opening_book.py), if one was built for this heuristic
+        book_path = self.game_parameters.get("book", "")
+        self.opening_book = OpeningBook(book_path) if book_path and os.path.exists(book_path) else None
+        if self.opening_book is not None and self.opening_book.heuristic != self.game_parameters.get("heuristic", "e0"):
+            self.opening_book = None
+        # Per-depth and per-iteration search statistics (None keeps minimax free of them)
+        self.search_stats = SearchStats() if self.game_parameters.get("instrument", True) else None
+        profile_mode = self.game_parameters.get("profile", "off")
+        self.profiler = MoveProfiler(profile_mode) if profile_mode != "off" else None
+        # Background search while a human thinks (single-process search only, it shares this engine's table)
+        self.ponderer = Ponderer(self) if self.game_parameters.get("ponder", True) and self.game_parameters.get("workers", 1) == 1 else None
 
     def init_board(self):
         state = {
@@ -32,16 +121,25 @@ class MiniChess:
                 ['.', 'wN', 'wB', 'wQ', 'wK']
             ],
             "turn": 'white',
+            # Draw state for the search: moves since the last capture, moves played,
+            # Zobrist keys of the positions since the last capture (see BitboardPosition.is_draw;
+            # the list is shared with later states, only its first halfmove_clock keys belong to this one)
+            "halfmove_clock": 0,
+            "turns": 0,
+            "history": [],
         }
         return state
 
     def display_board(self, game_state):
+        game_state = to_game_state(game_state)
         print()
         for i, row in enumerate(game_state["board"], start=1):
             print(str(6 - i) + "  " + ' '.join(piece.rjust(3) for piece in row))
         print("\n     A   B   C   D   E\n")
 
     def valid_moves(self, game_state):
+        if isinstance(game_state, CompactPosition):
+            return game_state.generate_moves()
         valid_moves = []
         board = game_state["board"]
         turn = game_state["turn"]
@@ -123,7 +221,7 @@ class MiniChess:
 
     def pawn_moves(self, row, col, turn, game_state):
         moves = []
-        board = game_state["board"]
+        board = to_game_state(game_state)["board"]
         direction = -1 if turn == 'white' else 1
 
         if 0 <= row + direction < 5:
@@ -141,7 +239,10 @@ class MiniChess:
         return "\n".join(" ".join(piece.rjust(3) for piece in row) for row in board)
 
     def make_move(self, game_state, move):
-        new_state = copy.deepcopy(game_state)
+        if isinstance(game_state, CompactPosition):
+            return game_state.make_move(move)
+        new_state = dict(game_state)
+        new_state["board"] = [row[:] for row in game_state["board"]]
         start, end = move
         start_row, start_col = start
         end_row, end_col = end
@@ -160,6 +261,21 @@ class MiniChess:
         new_state["board"][end_row][end_col] = piece
         new_state["turn"] = "black" if new_state["turn"] == "white" else "white"
 
+        if "turns" in new_state:
+            # Draw state, with the Zobrist key updated incrementally (the states from init_board have none yet)
+            key = game_state.get("key")
+            if key is None:
+                key = board_key(game_state["board"], game_state["turn"])
+            new_state["key"] = moved_key(key, game_state["board"][start_row][start_col], target_piece, piece,
+                                         start_row * 5 + start_col, end_row * 5 + end_col)
+            new_state["turns"] += 1
+            if target_piece != '.':
+                new_state["halfmove_clock"] = 0
+                new_state["history"] = []
+            else:
+                new_state["history"] = extend_history(game_state["history"], game_state["halfmove_clock"], key)
+                new_state["halfmove_clock"] += 1
+
         return new_state, False, None
 
     def parse_input(self, move):
@@ -175,143 +291,163 @@ class MiniChess:
         row, col = coord
         return f"{chr(col + ord('A'))}{5 - row}"
 
+    def move_to_string(self, move):
+        """Packed bitboard move -> 'B2 B3'."""
+        start, end = decode_move(move)
+        return f"{self.coordinate_to_string(start)} {self.coordinate_to_string(end)}"
+
     def e0_heuristic(self, game_state):
         """
         Implements the e0 heuristic:
         e0 = (#wp + 3 · #wB + 3 · #wN + 9 · #wQ + 999 · wK) - (#bp + 3 · #bB + 3 · #bN + 9 · #bQ + 999 · bK)
+        Evaluated from the piece-square tables in evaluation.py.
         """
-        board = game_state["board"]
-        
-        # Initialize counters for each piece
-        piece_counts = {
-            'wp': 0, 'wB': 0, 'wN': 0, 'wQ': 0, 'wK': 0,
-            'bp': 0, 'bB': 0, 'bN': 0, 'bQ': 0, 'bK': 0
-        }
-        
-        # Count pieces on the board
-        for row in board:
-            for piece in row:
-                if piece in piece_counts:
-                    piece_counts[piece] += 1
-        
-        # Calculate heuristic value
-        white_value = (piece_counts['wp'] + 
-                       3 * piece_counts['wB'] + 
-                       3 * piece_counts['wN'] + 
-                       9 * piece_counts['wQ'] + 
-                       999 * piece_counts['wK'])
-        
-        black_value = (piece_counts['bp'] + 
-                       3 * piece_counts['bB'] + 
-                       3 * piece_counts['bN'] + 
-                       9 * piece_counts['bQ'] + 
-                       999 * piece_counts['bK'])
-        
-        return white_value - black_value
+        if isinstance(game_state, CompactPosition):
+            return game_state.evaluate(TABLES["e0"])
+        return evaluate_board(game_state["board"], "e0")
 		
     def e1_heuristic(self, game_state):
         """
         e1 = e0 + positional weighting
         Encourages central control and pawn advancement.
         """
-        e0_value = self.e0_heuristic(game_state)
-        board = game_state["board"]
-        
-        # Positional weight map (encourages central control)
-        position_weights = [
-            [ 3,  4,  5,  4,  3],
-            [ 4,  6,  8,  6,  4],
-            [ 5,  8, 10,  8,  5],
-            [ 4,  6,  8,  6,  4],
-            [ 3,  4,  5,  4,  3]
-        ]
-        
-        position_score = 0
-        for row in range(5):
-            for col in range(5):
-                piece = board[row][col]
-                if piece == '.':
-                    continue
-                
-                weight = position_weights[row][col]
-                if piece[0] == 'w':
-                    position_score += weight
-                elif piece[0] == 'b':
-                    position_score -= weight
-        
-        return e0_value + position_score
+        if isinstance(game_state, CompactPosition):
+            return game_state.evaluate(TABLES["e1"])
+        return evaluate_board(game_state["board"], "e1")
 		
     def e2_heuristic(self, game_state):
         """
         Faster e2 heuristic: Simplified material + positional evaluation.
+        Kings prefer edges, pawns advancing, Knights/Bishops and the Queen the center.
         """
-        e0_value = self.e0_heuristic(game_state)
-        board = game_state["board"]
-        
-        position_score = 0
-        
-        for row in range(5):
-            for col in range(5):
-                piece = board[row][col]
-                if piece == '.':
-                    continue
-                
-                piece_type = piece[1]
-                owner = 1 if piece[0] == 'w' else -1  # White: +1, Black: -1
-                
-                # Simple positional scoring
-                if piece_type == 'K':  # King prefers edges
-                    position_score += owner * (1 if row in [0, 4] or col in [0, 4] else -1)
-                elif piece_type == 'p':  # Pawns prefer advancing but avoid last row
-                    position_score += owner * (row if piece[0] == 'w' else (4 - row))
-                elif piece_type in ['N', 'B']:  # Knights/Bishops prefer the center
-                    position_score += owner * (2 - abs(2 - row) - abs(2 - col))
-                elif piece_type == 'Q':  # Queen prefers mobility
-                    position_score += owner * (5 - abs(2 - row) - abs(2 - col))
-        
-        return e0_value + position_score
+        if isinstance(game_state, CompactPosition):
+            return game_state.evaluate(TABLES["e2"])
+        return evaluate_board(game_state["board"], "e2")
 		
-    def minimax(self, game_state, depth, max_depth, maximizing_player, alpha=float('-inf'), beta=float('inf'), use_alpha_beta=True, start_time=None, max_time=None):
+    def minimax(self, game_state, depth, max_depth, maximizing_player, alpha=float('-inf'), beta=float('inf'), use_alpha_beta=True, timer=None, root_moves=None, allow_null=True):
+        """
+        Minimax search over a BitboardPosition (see bitboard.py), which follows
+        the same move rules as valid_moves/make_move on the game_state dict.
+        Children are visited with apply_move/undo_move on the one position.
+        Leaves are scored with the position's incrementally updated evaluation.
+        root_moves restricts the moves searched at the root (parallel search).
+        If the timer expires, the root still returns the best of the moves it
+        finished searching, with time_exceeded set. With alpha-beta on, null-move
+        pruning, late move reductions and futility pruning apply when switched on.
+        Nodes drawn by the no-capture rule or max_turns, and repetitions, score 0.
+        """
         # Track states explored
         self.states_explored += 1
-        if depth not in self.states_by_depth:
-            self.states_by_depth[depth] = 0
-        self.states_by_depth[depth] += 1
+        stats = self.search_stats
+        if stats is not None:
+            stats.nodes[depth] += 1
         
-        # Check if we've run out of time
-        if start_time and max_time and time.time() - start_time > max_time:
+        # Check if we've run out of time (the time manager reads the clock every few hundred nodes)
+        if timer is not None and timer.expired():
             return None, None, True  # Time's up
         
+        # Drawn by the no-capture rule or max_turns, or a repetition
+        if depth > 0 and game_state.is_draw(self.max_turns):
+            self.pruning_counts["draw_cutoffs"] += 1
+            return 0, None, False
+        
+        # Exact result from the endgame tablebases once few pieces are left (if the win comes before a draw)
+        if self.tablebases is not None and depth > 0:
+            score = self.tablebases.probe(game_state, game_state.plies_to_draw(self.max_turns))
+            if score is not None:
+                return score, None, False
+        
         # Terminal conditions: depth reached or game over
         if depth == max_depth:
-            return self.e0_heuristic(game_state), None, False
+            if self.use_quiescence:
+                self.quiescence_left = self.quiescence_budget
+                value, time_exceeded = self.quiescence(game_state, alpha, beta, maximizing_player, timer)
+                return value, None, time_exceeded
+            return game_state.score, None, False
         
-        valid_moves = self.valid_moves(game_state)
+        # Transposition table lookup (never cut off at the root, which must return a move)
+        remaining = max_depth - depth
+        table = self.transposition_table
+        hash_move = None
+        if table is not None:
+            entry = table.probe(game_state.key)
+            if entry is not None:
+                stored_depth, bound, score, hash_move = entry
+                if depth > 0 and stored_depth >= remaining:
+                    if bound == EXACT or (bound == LOWER_BOUND and score >= beta) or (bound == UPPER_BOUND and score <= alpha):
+                        return score, hash_move, False
+            alpha_start, beta_start = alpha, beta
         
-        # Add to branching factor statistics
-        if depth > 0:  # Don't count root node
-            self.total_branching_factor += len(valid_moves)
-            self.total_branching_samples += 1
+        # Null-move pruning: if passing the turn still fails high (low for Black), a real move would too
+        if use_alpha_beta and allow_null and self.null_move_allowed(game_state, depth, remaining):
+            if maximizing_player and game_state.score >= beta:
+                null = game_state.apply_null_move()
+                value, _, time_exceeded = self.minimax(game_state, depth + 1, max_depth - self.null_move_reduction, False, beta - 1, beta, True, timer, allow_null=False)
+                game_state.undo_null_move(null)
+                if time_exceeded:
+                    return None, None, True
+                if value >= beta:
+                    self.pruning_counts["null_move_cutoffs"] += 1
+                    return beta, None, False
+            elif not maximizing_player and game_state.score <= alpha:
+                null = game_state.apply_null_move()
+                value, _, time_exceeded = self.minimax(game_state, depth + 1, max_depth - self.null_move_reduction, True, alpha, alpha + 1, True, timer, allow_null=False)
+                game_state.undo_null_move(null)
+                if time_exceeded:
+                    return None, None, True
+                if value <= alpha:
+                    self.pruning_counts["null_move_cutoffs"] += 1
+                    return alpha, None, False
+        
+        frontier_batch = self.batch_eval and not self.use_quiescence and depth + 1 == max_depth
+        valid_moves = self.node_moves(game_state, depth, hash_move, root_moves, frontier_batch)
         
-        # If no valid moves or game is over
+        # If no valid moves or game is over (a staged generator is checked after the loop)
         if not valid_moves:
-            return self.e0_heuristic(game_state), None, False
+            return game_state.score, None, False
+        
+        orderer = self.move_orderer
+        if stats is not None:
+            stats.expanded[depth] += 1
         
         best_move = None
         time_up = False
+        # Futility pruning: close to the leaves, quiet moves cannot lift a score this far below alpha (above beta)
+        futility_value = (game_state.score + self.futility_margin * remaining if maximizing_player
+                          else game_state.score - self.futility_margin * remaining)
+        futile = (use_alpha_beta and self.futility and depth > 0 and remaining <= 2 and
+                  (futility_value <= alpha if maximizing_player else futility_value >= beta))
+        skipped_futile = False
         
-        if maximizing_player:
+        if frontier_batch:
+            best_value, best_move = self.score_frontier(game_state, valid_moves, depth, maximizing_player)
+        elif maximizing_player:
             best_value = float('-inf')
-            for move in valid_moves:
-                new_state, game_over, winner = self.make_move(game_state, move)
-                
+            for move_number, move in enumerate(valid_moves):
                 # If game is over due to king capture
-                if game_over:
-                    return 1000 if winner == 'White' else -1000, move, False
+                if game_state.captures_king(move):
+                    return 1000, move, False
                 
-                value, _, time_exceeded = self.minimax(new_state, depth + 1, max_depth, False, alpha, beta, use_alpha_beta, start_time, max_time)
+                undo = game_state.apply_move(move)
+                quiet = undo[2] < 0 and not undo[3] and move != hash_move
+                if futile and quiet and best_move is not None:
+                    game_state.undo_move(undo)
+                    self.pruning_counts["futile_moves"] += 1
+                    skipped_futile = True
+                    continue
+                if self.late_move_reduced(use_alpha_beta, quiet, move_number, remaining):
+                    value, _, time_exceeded = self.minimax(game_state, depth + 1, max_depth - 1, False, alpha, beta, use_alpha_beta, timer)
+                    if not time_exceeded and value > alpha:
+                        self.pruning_counts["reduction_re_searches"] += 1
+                        value, _, time_exceeded = self.minimax(game_state, depth + 1, max_depth, False, alpha, beta, use_alpha_beta, timer)
+                else:
+                    value, _, time_exceeded = self.minimax(game_state, depth + 1, max_depth, False, alpha, beta, use_alpha_beta, timer)
+                game_state.undo_move(undo)
                 
                 if time_exceeded:
+                    # At the root, keep the best of the moves searched so far
+                    if depth == 0 and best_move is not None:
+                        return best_value, best_move, True
                     return None, None, True #stop searching immediately
                 
                 if value > best_value:
@@ -321,23 +457,38 @@ class MiniChess:
                 if use_alpha_beta:
                     alpha = max(alpha, best_value)
                     if beta <= alpha:
+                        if orderer is not None and undo[2] < 0:
+                            orderer.record_cutoff(game_state.turn, move, depth, max_depth - depth)
+                        if stats is not None:
+                            stats.cutoff(depth, move_number)
                         break
         else:
             best_value = float('inf')
-            for move in valid_moves:
-                #timeout check as well in moves loop
-                if time.time() - start_time > max_time:
-                    return None, None, True #stops searching immediately
-                
-                new_state, game_over, winner = self.make_move(game_state, move)
-                
+            for move_number, move in enumerate(valid_moves):
                 # If game is over due to king capture
-                if game_over:
-                    return -1000 if winner == 'Black' else 1000, move, False
+                if game_state.captures_king(move):
+                    return -1000, move, False
                 
-                value, _, time_exceeded = self.minimax(new_state, depth + 1, max_depth, True, alpha, beta, use_alpha_beta, start_time, max_time)
+                undo = game_state.apply_move(move)
+                quiet = undo[2] < 0 and not undo[3] and move != hash_move
+                if futile and quiet and best_move is not None:
+                    game_state.undo_move(undo)
+                    self.pruning_counts["futile_moves"] += 1
+                    skipped_futile = True
+                    continue
+                if self.late_move_reduced(use_alpha_beta, quiet, move_number, remaining):
+                    value, _, time_exceeded = self.minimax(game_state, depth + 1, max_depth - 1, True, alpha, beta, use_alpha_beta, timer)
+                    if not time_exceeded and value < beta:
+                        self.pruning_counts["reduction_re_searches"] += 1
+                        value, _, time_exceeded = self.minimax(game_state, depth + 1, max_depth, True, alpha, beta, use_alpha_beta, timer)
+                else:
+                    value, _, time_exceeded = self.minimax(game_state, depth + 1, max_depth, True, alpha, beta, use_alpha_beta, timer)
+                game_state.undo_move(undo)
                 
                 if time_exceeded:
+                    # At the root, keep the best of the moves searched so far
+                    if depth == 0 and best_move is not None:
+                        return best_value, best_move, True
                     return None, None, True # stops searching immediately
                 
                 if value < best_value:
@@ -347,25 +498,415 @@ class MiniChess:
                 if use_alpha_beta:
                     beta = min(beta, best_value)
                     if beta <= alpha:
+                        if orderer is not None and undo[2] < 0:
+                            orderer.record_cutoff(game_state.turn, move, depth, max_depth - depth)
+                        if stats is not None:
+                            stats.cutoff(depth, move_number)
                         break
         
+        if best_move is None:  # The staged generator had no moves
+            return game_state.score, None, False
+        # The skipped moves may be worth up to futility_value: the bound must not claim less
+        if skipped_futile:
+            best_value = max(best_value, futility_value) if maximizing_player else min(best_value, futility_value)
+        
+        # A root searched over a subset of its moves has no score to share
+        if table is not None and (root_moves is None or depth > 0):
+            if best_value <= alpha_start:
+                bound = UPPER_BOUND
+            elif best_value >= beta_start:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            table.store(game_state.key, remaining, bound, best_value, best_move)
+        
         return best_value, best_move, time_up
 
-    def get_ai_move(self, game_state):
-        # Reset statistics for this move
-        self.states_explored = 0
-        self.states_by_depth = {}
+    def negamax(self, game_state, depth, max_depth, alpha, beta, timer=None, root_moves=None, allow_null=True):
+        """
+        Principal variation search in negamax form: scores are from the side to
+        move's point of view and every child is searched with the negated window.
+        The first move of a node is searched with the full window, the others with
+        a null window that only proves they are no better, and a move that fails
+        high is searched again with the full window. The moves leading to the best
+        score are kept in pv_table[depth]. Uses the same transposition table
+        (with White's point of view), move ordering, tablebases and quiescence
+        search as minimax, and the same selective pruning (null-move and futility
+        pruning only at null-window nodes). Returns (score, move, time_exceeded).
+        """
+        self.states_explored += 1
+        stats = self.search_stats
+        if stats is not None:
+            stats.nodes[depth] += 1
+        self.pv_table[depth] = []
         
-        start_time = time.time()
-        max_time = self.game_parameters["time_limit"]
+        if timer is not None and timer.expired():
+            return None, None, True
+        
+        if depth > 0 and game_state.is_draw(self.max_turns):
+            self.pruning_counts["draw_cutoffs"] += 1
+            return 0, None, False
+        
+        sign = 1 if game_state.turn == WHITE else -1
+        if self.tablebases is not None and depth > 0:
+            score = self.tablebases.probe(game_state, game_state.plies_to_draw(self.max_turns))
+            if score is not None:
+                return sign * score, None, False
+        
+        if depth == max_depth:
+            if not self.use_quiescence:
+                return sign * game_state.score, None, False
+            self.quiescence_left = self.quiescence_budget
+            if sign == 1:
+                value, time_exceeded = self.quiescence(game_state, alpha, beta, True, timer)
+            else:
+                value, time_exceeded = self.quiescence(game_state, -beta, -alpha, False, timer)
+            return (None if time_exceeded else sign * value), None, time_exceeded
+        
+        # Transposition table entries are stored from White's point of view
+        remaining = max_depth - depth
+        table = self.transposition_table
+        hash_move = None
+        if table is not None:
+            entry = table.probe(game_state.key)
+            if entry is not None:
+                stored_depth, bound, score, hash_move = entry
+                if depth > 0 and stored_depth >= remaining:
+                    score *= sign
+                    if sign == -1 and bound != EXACT:
+                        bound = UPPER_BOUND if bound == LOWER_BOUND else LOWER_BOUND
+                    if bound == EXACT or (bound == LOWER_BOUND and score >= beta) or (bound == UPPER_BOUND and score <= alpha):
+                        return score, hash_move, False
+            alpha_start = alpha
+        static_score = sign * game_state.score
+        scout = beta - alpha == 1
+        
+        # Null-move pruning
+        if scout and allow_null and static_score >= beta and self.null_move_allowed(game_state, depth, remaining):
+            null = game_state.apply_null_move()
+            value, _, time_exceeded = self.negamax(game_state, depth + 1, max_depth - self.null_move_reduction, -beta, -beta + 1, timer, allow_null=False)
+            game_state.undo_null_move(null)
+            if time_exceeded:
+                return None, None, True
+            if -value >= beta:
+                self.pruning_counts["null_move_cutoffs"] += 1
+                return beta, None, False
+        
+        valid_moves = self.node_moves(game_state, depth, hash_move, root_moves)
+        if not valid_moves:
+            return sign * game_state.score, None, False
+        
+        orderer = self.move_orderer
+        if stats is not None:
+            stats.expanded[depth] += 1
+        
+        best_value = float('-inf')
+        best_move = None
+        futility_value = static_score + self.futility_margin * remaining
+        futile = scout and self.futility and depth > 0 and remaining <= 2 and futility_value <= alpha
+        skipped_futile = False
+        for move_number, move in enumerate(valid_moves):
+            if game_state.captures_king(move):
+                self.pv_table[depth] = [move]
+                return 1000, move, False
+            
+            undo = game_state.apply_move(move)
+            quiet = undo[2] < 0 and not undo[3] and move != hash_move
+            if futile and quiet and best_move is not None:
+                game_state.undo_move(undo)
+                self.pruning_counts["futile_moves"] += 1
+                skipped_futile = True
+                continue
+            if move_number == 0:
+                value, _, time_exceeded = self.negamax(game_state, depth + 1, max_depth, -beta, -alpha, timer)
+            else:
+                # Scout with a null window (one ply shallower for late quiet moves), search again if the move might be better
+                value, time_exceeded = None, False
+                if self.late_move_reduced(True, quiet, move_number, remaining):
+                    value, _, time_exceeded = self.negamax(game_state, depth + 1, max_depth - 1, -alpha - 1, -alpha, timer)
+                    if not time_exceeded and -value > alpha:
+                        self.pruning_counts["reduction_re_searches"] += 1
+                        value = None
+                if value is None and not time_exceeded:
+                    value, _, time_exceeded = self.negamax(game_state, depth + 1, max_depth, -alpha - 1, -alpha, timer)
+                if not time_exceeded and alpha < -value < beta:
+                    value, _, time_exceeded = self.negamax(game_state, depth + 1, max_depth, -beta, -alpha, timer)
+            game_state.undo_move(undo)
+            
+            if time_exceeded:
+                # At the root, keep the best of the moves searched so far
+                if depth == 0 and best_move is not None:
+                    return best_value, best_move, True
+                return None, None, True
+            value = -value
+            
+            if value > best_value:
+                best_value = value
+                best_move = move
+                if value > alpha:
+                    alpha = value
+                    self.pv_table[depth] = [move] + self.pv_table[depth + 1]
+            if alpha >= beta:
+                if orderer is not None and undo[2] < 0:
+                    orderer.record_cutoff(game_state.turn, move, depth, max_depth - depth)
+                if stats is not None:
+                    stats.cutoff(depth, move_number)
+                break
+        
+        if best_move is None:  # The staged generator had no moves
+            return sign * game_state.score, None, False
+        # The skipped moves may be worth up to futility_value: the bound must not claim less
+        if skipped_futile:
+            best_value = max(best_value, futility_value)
+        
+        if table is not None and (root_moves is None or depth > 0):
+            if best_value <= alpha_start:
+                bound = UPPER_BOUND if sign == 1 else LOWER_BOUND
+            elif best_value >= beta:
+                bound = LOWER_BOUND if sign == 1 else UPPER_BOUND
+            else:
+                bound = EXACT
+            table.store(game_state.key, remaining, bound, sign * best_value, best_move)
+        
+        return best_value, best_move, False
+
+    def node_moves(self, game_state, depth, hash_move, root_moves=None, full_list=False):
+        """
+        Moves of a search node in the order to try them: a staged generator
+        (MoveOrderer.staged_moves) when move ordering and staged generation are
+        on, otherwise a sorted list. The root of a parallel search uses its share
+        of root_moves, and full_list asks for a list.
+        """
+        orderer = self.move_orderer
+        if root_moves is not None and depth == 0:
+            valid_moves = list(root_moves)
+        elif orderer is not None and self.staged_generation and not full_list:
+            # The generator counts the moves of the nodes that reach its quiet stage (see search_counters)
+            return orderer.staged_moves(game_state, depth, hash_move)
+        else:
+            valid_moves = game_state.generate_moves()
+        
+        # Add to branching factor statistics
+        if depth > 0:  # Don't count root node
+            self.total_branching_factor += len(valid_moves)
+            self.total_branching_samples += 1
+        if orderer is not None:
+            orderer.order_moves(game_state, valid_moves, depth, hash_move)
+        return valid_moves
+
+    def null_move_allowed(self, game_state, depth, remaining):
+        """
+        Null-move pruning is skipped at the root, too close to the leaves, right
+        after another null move (allow_null), and when the side to move has only
+        its King and pawns, where passing can be better than any move (zugzwang).
+        """
+        return (self.null_move and depth > 0 and remaining > self.null_move_reduction
+                and game_state.has_non_pawn_material(game_state.turn))
+
+    def late_move_reduced(self, use_alpha_beta, quiet, move_number, remaining):
+        """Search this move one ply shallower first? (quiet moves ordered late, with enough depth left)"""
+        if (self.late_move_reductions and use_alpha_beta and quiet
+                and move_number >= self.lmr_moves and remaining >= self.lmr_min_depth):
+            self.pruning_counts["reduced_moves"] += 1
+            return True
+        return False
+
+    def aspiration_search(self, position, max_depth, previous_score, timer=None, root_moves=None):
+        """
+        One PVS iteration with a window of aspiration_window around the previous
+        iteration's score, widened on the side that fails until the score falls
+        inside it. Scores are from White's point of view, like minimax.
+        """
+        sign = 1 if position.turn == WHITE else -1
+        window = self.aspiration_window
+        if previous_score is None or abs(previous_score) >= 1000 or not window:
+            alpha, beta = float('-inf'), float('inf')
+        else:
+            alpha, beta = previous_score - window, previous_score + window
+        while True:
+            if sign == 1:
+                score, move, time_exceeded = self.negamax(position, 0, max_depth, alpha, beta, timer, root_moves)
+            else:
+                score, move, time_exceeded = self.negamax(position, 0, max_depth, -beta, -alpha, timer, root_moves)
+            if score is not None:
+                score *= sign
+            if time_exceeded or score is None:
+                return score, move, time_exceeded
+            if score <= alpha:
+                window *= 4
+                alpha = previous_score - window if window < 1000 else float('-inf')
+            elif score >= beta:
+                window *= 4
+                beta = previous_score + window if window < 1000 else float('inf')
+            else:
+                return score, move, False
+
+    def transposition_line(self, position, length):
+        """Expected line read from the hash moves of the transposition table (for minimax mode)."""
+        line = []
+        undos = []
+        seen = set()
+        while self.transposition_table is not None and len(line) < length and position.key not in seen:
+            seen.add(position.key)
+            entry = self.transposition_table.probe(position.key)
+            if entry is None or entry[3] is None or entry[3] not in position.generate_moves():
+                break
+            line.append(entry[3])
+            if position.captures_king(entry[3]):
+                break
+            undos.append(position.apply_move(entry[3]))
+        for undo in reversed(undos):
+            position.undo_move(undo)
+        return line
+
+    def quiescence(self, game_state, alpha, beta, maximizing_player, timer=None):
+        """
+        Extend a leaf through captures and promotions until the position is quiet.
+        The side to move may stand pat on the static score. Captures that lose
+        material by static exchange evaluation are skipped, and so are those that
+        leave the score more than delta_margin short of alpha (beta for Black).
+        Returns (score, time_exceeded).
+        """
+        stand_pat = game_state.score
+        if maximizing_player:
+            if stand_pat >= beta:
+                return stand_pat, False
+            alpha = max(alpha, stand_pat)
+        else:
+            if stand_pat <= alpha:
+                return stand_pat, False
+            beta = min(beta, stand_pat)
+        if self.quiescence_left <= 0:
+            return stand_pat, False
+        
+        # Winning and even exchanges first, by static exchange evaluation
+        exchanges = []
+        for move in game_state.generate_captures():
+            if game_state.captures_king(move):
+                return (1000 if maximizing_player else -1000), False
+            gain = game_state.static_exchange(move)
+            if gain >= 0:
+                exchanges.append((gain, move))
+        exchanges.sort(reverse=True)
+        
+        best_value = stand_pat
+        for _, move in exchanges:
+            # The budget also covers the siblings of the nodes that used it up
+            if self.quiescence_left <= 0:
+                break
+            undo = game_state.apply_move(move)
+            # Delta pruning: even a small positional bonus on top of this capture would not matter
+            if (game_state.score + self.delta_margin <= alpha) if maximizing_player else (game_state.score - self.delta_margin >= beta):
+                game_state.undo_move(undo)
+                continue
+            
+            self.quiescence_nodes += 1
+            self.quiescence_left -= 1
+            if timer is not None and timer.expired():
+                game_state.undo_move(undo)
+                return None, True
+            value, time_exceeded = self.quiescence(game_state, alpha, beta, not maximizing_player, timer)
+            game_state.undo_move(undo)
+            if time_exceeded:
+                return None, True
+            
+            if maximizing_player:
+                best_value = max(best_value, value)
+                alpha = max(alpha, value)
+            else:
+                best_value = min(best_value, value)
+                beta = min(beta, value)
+            if beta <= alpha:
+                break
+        
+        return best_value, False
+
+    def score_frontier(self, game_state, valid_moves, depth, maximizing_player):
+        """
+        Score every child of a node just above max_depth with one batch_eval call.
+        Children that minimax would score as draws or from the tablebases get
+        the same scores here, so batching never changes the result.
+        """
+        for move in valid_moves:
+            # If game is over due to king capture
+            if game_state.captures_king(move):
+                return (1000 if maximizing_player else -1000), move
+        
+        scores = score_children(game_state, valid_moves, self.game_parameters.get("heuristic", "e0"))
+        self.states_explored += len(valid_moves)
+        if self.search_stats is not None:
+            self.search_stats.nodes[depth + 1] += len(valid_moves)
+        
+        # Only visit the children one by one when one of them may be drawn (repetition, no-capture
+        # rule, max_turns) or covered by the tablebases (a capture can bring it into them)
+        tablebases = self.tablebases
+        may_probe = (tablebases is not None and
+                     (game_state.occupied[0] | game_state.occupied[1]).bit_count() - 1 <= tablebases.max_pieces)
+        max_turns = self.max_turns
+        if (may_probe or game_state.halfmove_clock + 1 >= REPETITION_CLOCK
+                or (max_turns is not None and game_state.ply + 1 >= max_turns)):
+            for index, move in enumerate(valid_moves):
+                undo = game_state.apply_move(move)
+                if game_state.is_draw(max_turns):
+                    self.pruning_counts["draw_cutoffs"] += 1
+                    scores[index] = 0
+                elif may_probe:
+                    score = tablebases.probe(game_state, game_state.plies_to_draw(self.max_turns))
+                    if score is not None:
+                        scores[index] = score
+                game_state.undo_move(undo)
+        
+        best = int(scores.argmax() if maximizing_player else scores.argmin())
+        return int(scores[best]), valid_moves[best]
+
+    def search_position(self, game_state, start_time, max_time, root_moves=None, depth_limit=None, timer=None, start_depth=1):
+        """
+        Iterative deepening from game_state within max_time seconds of start_time,
+        or until depth_limit is reached. Returns the (depth, score, move) of every
+        iteration, deepest last; the last one may come from a partially searched
+        iteration that ran out of time. A timer can be passed in to stop the search
+        from another thread (pondering), and start_depth skips depths already
+        searched. Tablebase positions and deep enough analysis cache entries are
+        answered without searching.
+        """
         use_alpha_beta = self.game_parameters["alpha_beta"]
         heuristic_choice = self.game_parameters.get("heuristic", "e0")
+        self.new_search()
+        stats = self.search_stats
         
-        best_score = None
-        best_move = None
-        current_depth = 1
+        position = BitboardPosition.from_game_state(game_state, TABLES[heuristic_choice])
+        is_maximizing = position.turn == WHITE
         
-        heuristic_function = self.e0_heuristic if heuristic_choice == "e0" else self.e1_heuristic
+        # A position covered by the tablebases is answered without searching
+        if self.tablebases is not None and root_moves is None:
+            probed = self.tablebases.best_move(position, position.plies_to_draw(self.max_turns))
+            if probed is not None:
+                self.states_explored = 1
+                self.states_by_depth = {0: 1}
+                self.completed_depth = 1
+                return [(1, probed[0], probed[1])]
+        
+        # So is a deep enough result from the analysis cache, unless a draw is closer than its depth
+        self.cache_hit = False
+        cache = self.analysis_cache if root_moves is None else None
+        if cache is not None:
+            cached = cache.probe(position.key, self.cache_variant)
+            if (cached is not None and self.cache_depth <= cached[0] < position.plies_to_draw(self.max_turns)
+                    and cached[2] in position.generate_moves()):
+                self.cache_hit = True
+                self.states_explored = 1
+                self.states_by_depth = {0: 1}
+                self.principal_variation = [cached[2]]
+                self.completed_depth = cached[0]
+                return [cached]
+        if timer is None:
+            timer = TimeManager(max_time, start_time, node_limit=self.game_parameters.get("node_limit", 0))
+        self.time_manager = timer
+        completed = []
+        finished = None
+        self.completed_depth = start_depth - 1
+        current_depth = start_depth
+        self.principal_variation = []
         
         # Iterative deepening
         while True:
@@ -374,55 +915,186 @@ class MiniChess:
             self.states_by_depth = {}
             self.total_branching_factor = 0
             self.total_branching_samples = 0
+            if self.move_orderer is not None:
+                self.move_orderer.reset_counts()
+            if stats is not None:
+                stats.begin_iteration()
+            iteration_start = time.time()
             
-            # Start with the initial search
-            is_maximizing = game_state["turn"] == "white"
-            score, move, time_exceeded = self.minimax(
-                game_state, 
-                0, 
-                current_depth, 
-                is_maximizing, 
-                float('-inf'),
-                float('inf'),
-                use_alpha_beta, 
-                start_time, 
-                max_time
-            )
+            if self.search_mode == "pvs" and use_alpha_beta:
+                previous_score = completed[-1][1] if completed else None
+                score, move, time_exceeded = self.aspiration_search(position, current_depth, previous_score, timer, root_moves)
+            else:
+                score, move, time_exceeded = self.minimax(
+                    position, 
+                    0, 
+                    current_depth, 
+                    is_maximizing, 
+                    float('-inf'),
+                    float('inf'),
+                    use_alpha_beta, 
+                    timer,
+                    root_moves
+                )
             
             if time_exceeded:
+                if move is not None:
+                    completed.append((current_depth, score, move))
                 break
             
-            best_score = score
-            best_move = move
+            completed.append((current_depth, score, move))
+            finished = completed[-1]
+            self.completed_depth = current_depth
+            if self.search_mode == "pvs" and use_alpha_beta:
+                self.principal_variation = self.pv_table[0] or [move]
+            else:
+                self.principal_variation = self.transposition_line(position, current_depth) or [move]
+            iteration_time = time.time() - iteration_start
+            timer.record_iteration(self.states_explored, iteration_time)
+            if stats is not None:
+                stats.end_iteration(current_depth, self.states_explored, iteration_time)
+            
+            if depth_limit is not None and current_depth >= depth_limit:
+                break
             
-            # If we've reached a terminal state or running out of time
-            if time.time() - start_time > max_time * 0.8:
+            # Stop once a King capture is forced either way, or the next depth is not expected to finish
+            if abs(score) >= 1000 or current_depth >= MAX_SEARCH_DEPTH or not timer.can_start_next_iteration():
                 break
                 
             current_depth += 1
         
+        self.states_by_depth = stats.nodes_by_depth() if stats is not None else {}
+        # Share the deepest completed iteration, if the draw rules played no part in it
+        if cache is not None and finished is not None and finished[0] < position.plies_to_draw(self.max_turns):
+            cache.store(position.key, self.cache_variant, *finished)
+        return completed
+
+    def new_search(self):
+        """Age the tables and reset the counters reported by search_counters."""
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+        if self.move_orderer is not None:
+            self.move_orderer.new_search()
+        if self.tablebases is not None:
+            self.tablebases.new_search()
+        if self.search_stats is not None:
+            self.search_stats.new_search()
+        self.quiescence_nodes = 0
+        self.pruning_counts = dict.fromkeys(PRUNING_COUNTERS, 0)
+        self.states_explored = 0
+        self.states_by_depth = {}
+        self.total_branching_factor = 0
+        self.total_branching_samples = 0
+        self.time_manager = None
+
+    def search_counters(self):
+        """Statistics of the last search, in a form that can be summed across worker processes."""
+        table = self.transposition_table
+        orderer = self.move_orderer
+        counters = {
+            "states_explored": self.states_explored,
+            "states_by_depth": dict(self.states_by_depth),
+            "total_branching_factor": self.total_branching_factor + (orderer.generated_moves if orderer else 0),
+            "total_branching_samples": self.total_branching_samples + (orderer.generated_nodes if orderer else 0),
+            "tt_probes": table.probes if table else 0,
+            "tt_hits": table.hits if table else 0,
+            "tt_fill": table.fill() if table else 0.0,
+            "tb_hits": self.tablebases.hits if self.tablebases else 0,
+            "nodes": self.time_manager.nodes if self.time_manager else 0,
+            "quiescence_nodes": self.quiescence_nodes,
+            **self.pruning_counts,
+        }
+        if self.search_stats is not None:
+            counters.update(self.search_stats.counters())
+        return counters
+
+    def close(self):
+        """Shut down the worker processes and release the files this engine holds open; it must not search afterwards."""
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+            self.worker_pool = None
+        if self.analysis_cache is not None:
+            self.analysis_cache.close()
+            self.analysis_cache = None
+
+    def get_ai_move(self, game_state):
+        """Search game_state and return (move string, stats), profiled and reported as configured."""
+        if self.profiler is not None:
+            move_str, stats = self.profiler.call(self.choose_ai_move, game_state)
+        else:
+            move_str, stats = self.choose_ai_move(game_state)
+        stats_file = self.game_parameters.get("stats_file", "")
+        if stats_file:
+            write_move_report(stats_file, move_str, stats)
+        return move_str, stats
+
+    def choose_ai_move(self, game_state):
+        start_time = time.time()
+        max_time = self.game_parameters["time_limit"]
+        heuristic_choice = self.game_parameters.get("heuristic", "e0")
+        workers = self.game_parameters.get("workers", 1)
+        
+        booked = self.opening_book.choose(BitboardPosition.from_game_state(game_state)) if self.opening_book is not None else None
+        pondered = self.ponderer.result_for(game_state) if self.ponderer is not None and not booked else None
+        if booked:
+            # Book move: no search at all
+            self.new_search()
+            self.principal_variation = []
+            best_score, best_move = booked
+            depth = self.opening_book.depth
+            counters = self.search_counters()
+        elif workers > 1:
+            best_score, best_move, depth, counters = parallel_root_search(self, game_state, start_time, max_time, workers)
+        elif pondered:
+            # The human played the predicted move: carry on deeper from the pondered iterations
+            self.ponderer.ponder_state = None
+            completed = pondered + self.search_position(game_state, start_time, max_time, start_depth=pondered[-1][0] + 1)
+            depth, best_score, best_move = completed[-1]
+            counters = self.search_counters()
+        else:
+            completed = self.search_position(game_state, start_time, max_time)
+            depth, best_score, best_move = completed[-1] if completed else (0, None, None)
+            counters = self.search_counters()
+        
         # Calculate average branching factor
-        avg_branching = self.total_branching_factor / max(1, self.total_branching_samples)
+        avg_branching = counters["total_branching_factor"] / max(1, counters["total_branching_samples"])
         
         # Prepare statistics for output
         search_time = time.time() - start_time
+        heuristic_function = {"e0": self.e0_heuristic, "e1": self.e1_heuristic, "e2": self.e2_heuristic}[heuristic_choice]
         heuristic_score = heuristic_function(game_state)
         
         stats = {
             "score": best_score,
             "time": search_time,
-            "depth": current_depth - 1,
-            "states_explored": self.states_explored,
-            "states_by_depth": self.states_by_depth,
+            "depth": depth,
+            "states_explored": counters["states_explored"],
+            "states_by_depth": counters["states_by_depth"],
             "avg_branching": avg_branching,
-            "heuristic_score": heuristic_score
+            "heuristic_score": heuristic_score,
+            "tt_hit_rate": counters["tt_hits"] / counters["tt_probes"] if counters["tt_probes"] else 0.0,
+            "tt_fill": counters["tt_fill"],
+            "tb_hits": counters["tb_hits"],
+            "nodes": counters["nodes"],
+            "quiescence_nodes": counters["quiescence_nodes"],
+            **{name: counters[name] for name in PRUNING_COUNTERS},
+            "nodes_per_second": counters["nodes"] / search_time if search_time else 0.0,
+            "workers": workers,
+            "ponder_hit": bool(pondered),
+            "cache_hit": workers == 1 and self.cache_hit and not booked,
+            "book": bool(booked),
         }
+        # Expected line of play, when the last completed iteration chose the move played
+        line = self.principal_variation if workers == 1 and self.principal_variation[:1] == [best_move] else [best_move]
+        stats["pv"] = [self.move_to_string(move) for move in line if move is not None]
+        if self.search_stats is not None:
+            rates = cutoff_rates(counters)
+            stats["cutoff_rate_by_depth"] = {depth: rate for depth, (rate, _) in rates.items()}
+            stats["first_move_cutoff_by_depth"] = {depth: first for depth, (_, first) in rates.items()}
+            stats["iterations"] = counters["iterations"]
         
-        if best_move:
-            start_str = self.coordinate_to_string(best_move[0])
-            end_str = self.coordinate_to_string(best_move[1])
-            move_str = f"{start_str} {end_str}"
-            return move_str, stats
+        if best_move is not None:
+            return self.move_to_string(best_move), stats
         else:
             # If no move was found, select a random valid move
             valid_moves = self.valid_moves(game_state)
@@ -438,9 +1110,9 @@ class MiniChess:
         """
         Allows user to select heuristic and set other game parameters before starting the game.
         """
-        print("Select AI heuristic (e0 = Material, e1 = Material + Position):")
-        heuristic_choice = input("Enter 'e0' or 'e1': ").strip()
-        if heuristic_choice not in ["e0", "e1"]:
+        print("Select AI heuristic (e0 = Material, e1 = Material + Position, e2 = Material + Piece placement):")
+        heuristic_choice = input("Enter 'e0', 'e1' or 'e2': ").strip()
+        if heuristic_choice not in ["e0", "e1", "e2"]:
             heuristic_choice = "e0"  # Default to e0 if invalid input
         
         self.game_parameters["heuristic"] = heuristic_choice
@@ -460,8 +1132,11 @@ class MiniChess:
         if target_piece in ["bK", "wK"]:
             winner = currentPlayer
             print(f"Game Over! {winner} wins by capturing the King.")
-            self.moves_log.append(f"Turn {self.totalMoves + 1} ({currentPlayer}): move from {move_str}")
-            save_game_trace(self.game_parameters, self.moves_log, f"{winner} (King Capture)", self.initial_board, self.board_snapshots)
+            if self.trace_writer is not None:
+                self.trace_writer.record_move(self.totalMoves + 1, self.current_game_state["turn"], parsed_move)
+            else:
+                self.moves_log.append(f"Turn {self.totalMoves + 1} ({currentPlayer}): move from {move_str}")
+            self.save_trace(f"{winner} (King Capture)")
             return True  # Game over
 
         # Track turn for draw condition (reset if capture occurs, increment otherwise)
@@ -474,9 +1149,9 @@ class MiniChess:
         self.totalMoves += 1
 
         # Check for draw (no captures in 10 turns)
-        if self.turnNumber >= 20:  # 10 turns = 20 moves (white + black)
+        if self.turnNumber >= NO_CAPTURE_LIMIT:  # 10 turns = 20 moves (white + black)
             print("Game Over! It's a draw (10 turns without a capture).")
-            save_game_trace(self.game_parameters, self.moves_log, "Draw (10 Turns No Capture)", self.initial_board, self.board_snapshots)
+            self.save_trace("Draw (10 Turns No Capture)")
             return True  # Game over
 
         # Pawn promotion
@@ -484,41 +1159,66 @@ class MiniChess:
             piece = piece[0] + "Q"
 
         # Execute the move
+        previous_key = board_key(self.current_game_state["board"], self.current_game_state["turn"])
         self.current_game_state["board"][start_row][start_col] = '.'
         self.current_game_state["board"][end_row][end_col] = piece
 
-        # Format move log correctly
-        move_log = f"Turn {self.totalMoves} ({currentPlayer}): move from {move_str}"
+        if self.trace_writer is not None:
+            # Stream the move to the binary trace instead of keeping it in memory
+            self.trace_writer.record_move(self.totalMoves, self.current_game_state["turn"], parsed_move,
+                                          self.current_game_state["board"], ai_stats)
+        else:
+            # Format move log correctly
+            move_log = f"Turn {self.totalMoves} ({currentPlayer}): move from {move_str}"
 
-        # If AI played the move, append relevant statistics
-        if ai_stats:
-            move_log += f" | time for this action: {ai_stats['time']:.3f} sec"
-            move_log += f" | heuristic score: {ai_stats['heuristic_score']}"
-            move_log += f" | alpha-beta search score: {ai_stats['score']}"
+            # If AI played the move, append relevant statistics
+            if ai_stats:
+                move_log += f" | time for this action: {ai_stats['time']:.3f} sec"
+                move_log += f" | heuristic score: {ai_stats['heuristic_score']}"
+                move_log += f" | alpha-beta search score: {ai_stats['score']}"
 
-        # Save move logs and board snapshots
-        self.moves_log.append(move_log)
-        self.board_snapshots.append(f"Turn {self.totalMoves} ({currentPlayer}):\n{self.get_board_string(self.current_game_state['board'])}\n")
+            # Save move logs and board snapshots
+            self.moves_log.append(move_log)
+            self.board_snapshots.append(f"Turn {self.totalMoves} ({currentPlayer}):\n{self.get_board_string(self.current_game_state['board'])}\n")
 
         # Switch turns
         self.current_game_state["turn"] = "black" if self.current_game_state["turn"] == "white" else "white"
+        # Draw state for the search
+        if target_piece != '.':
+            self.current_game_state["history"] = []
+        else:
+            self.current_game_state["history"] = extend_history(self.current_game_state["history"],
+                                                                self.current_game_state["halfmove_clock"], previous_key)
+        self.current_game_state["halfmove_clock"] = self.turnNumber
+        self.current_game_state["turns"] = self.totalMoves
 
         # Check for max turns
         if self.totalMoves >= self.game_parameters['max_turns']:
             print("Game Over! Reached maximum moves.")
-            save_game_trace(self.game_parameters, self.moves_log, "Draw (Max Moves Reached)", self.initial_board, self.board_snapshots)
+            self.save_trace("Draw (Max Moves Reached)")
             return True  # Game over
         
         return False  # Game continues
 
+    def save_trace(self, winner):
+        """Finish the game trace: close the streamed binary trace or write the text trace."""
+        if self.trace_writer is not None:
+            self.trace_writer.finish(winner)
+            print(f"Game trace successfully saved to: {self.trace_writer.filename}")
+            self.trace_writer = None
+        else:
+            save_game_trace(self.game_parameters, self.moves_log, winner, self.initial_board, self.board_snapshots)
+
 
-    def format_states_by_depth(self):
+    def format_states_by_depth(self, states_by_depth=None):
         """Format the states explored by depth for display"""
-        total = sum(self.states_by_depth.values())
+        if states_by_depth is None:
+            states_by_depth = self.states_by_depth
+        total = sum(states_by_depth.values())
         raw_data = []
         percentage_data = []
         
-        for depth, count in sorted(self.states_by_depth.items()):
+        for depth, count in sorted(states_by_depth.items()):
             # Format the count
             if count < 1000:
                 count_str = str(count)
@@ -535,16 +1235,18 @@ class MiniChess:
             
         return " ".join(raw_data), " ".join(percentage_data)
 
-    def format_total_states(self):
+    def format_total_states(self, states_explored=None):
         """Format the total states explored for display"""
-        if self.states_explored < 1000:
-            return str(self.states_explored)
-        elif self.states_explored < 1000000:
-            return f"{self.states_explored/1000:.1f}k"
+        if states_explored is None:
+            states_explored = self.states_explored
+        if states_explored < 1000:
+            return str(states_explored)
+        elif states_explored < 1000000:
+            return f"{states_explored/1000:.1f}k"
         else:
-            return f"{self.states_explored/1000000:.1f}M"
+            return f"{states_explored/1000000:.1f}M"
         
-    def timed_input(prompt, timeout):
+    def timed_input(self, prompt, timeout):
         """Function to get input with timeout constraint from human player"""
         result=[None] # using a list to store input for thread
 
@@ -562,7 +1264,10 @@ class MiniChess:
 
     def play(self):
         print("Welcome to Mini Chess! Enter moves as 'B2 B3'. Type 'exit' to quit.")
-        self.board_snapshots.append(f"Turn 0 (White):\n{self.get_board_string(self.current_game_state['board'])}\n")
+        if self.game_parameters.get("trace_format", "text") == "binary":
+            self.trace_writer = TraceWriter(self.game_parameters, self.initial_board, self.game_parameters.get("snapshot_interval", 10))
+        else:
+            self.board_snapshots.append(f"Turn 0 (White):\n{self.get_board_string(self.current_game_state['board'])}\n")
         
         play_mode = self.game_parameters["play_mode"]
         white_is_ai = play_mode in ["AI-H", "AI-AI"]
@@ -590,25 +1295,39 @@ class MiniChess:
                 print(f"Depth reached: {stats['depth']}")
                 print(f"Heuristic score: {stats['heuristic_score']}")
                 print(f"Search score: {stats['score']}")
+                print(f"Principal variation: {', '.join(stats['pv'])}")
+                if stats['book']:
+                    print("Book move: played from the opening book without searching")
+                if stats['ponder_hit']:
+                    print("Ponder hit: continued from the search done on the opponent's time")
                 
                 # Format and display state exploration info
-                total_states = self.format_total_states()
-                states_by_depth, states_by_depth_percent = self.format_states_by_depth()
+                total_states = self.format_total_states(stats['states_explored'])
+                states_by_depth, states_by_depth_percent = self.format_states_by_depth(stats['states_by_depth'])
                 
                 print(f"States explored: {total_states}")
-                print(f"States by depth: {states_by_depth}")
-                print(f"States by depth (%): {states_by_depth_percent}")
+                if stats['states_by_depth']:  # Empty when instrumentation is off
+                    print(f"States by depth: {states_by_depth}")
+                    print(f"States by depth (%): {states_by_depth_percent}")
                 print(f"Average branching factor: {stats['avg_branching']:.2f}")
+                print(f"Transposition table: hit rate {stats['tt_hit_rate'] * 100:.1f}%, fill {stats['tt_fill'] * 100:.1f}%")
+                if "iterations" in stats:
+                    first_move = " ".join(f"{depth}={ratio * 100:.0f}%" for depth, ratio in stats['first_move_cutoff_by_depth'].items())
+                    print(f"Nodes/sec: {stats['nodes_per_second']:.0f}, first-move cutoffs by depth: {first_move}")
                 
-                game_over = self.execute_move(move_str)
+                game_over = self.execute_move(move_str, stats)
             else:
-                # Human turn
-                move = self.timed_input("Enter your move (e.g. 'B2 B3') or type 'exit' to quit(You have {time_limit} seconds): ", time_limit)
+                # Human turn; the AI (if any) ponders its reply meanwhile
+                if self.ponderer is not None and (white_is_ai or black_is_ai):
+                    self.ponderer.start(self.current_game_state)
+                move = self.timed_input(f"Enter your move (e.g. 'B2 B3') or type 'exit' to quit(You have {time_limit} seconds): ", time_limit)
+                if self.ponderer is not None:
+                    self.ponderer.stop()
                 
                 if move is None: #timeout occured
                     print (f"{currentPlayer} lost due to time expiration.")
                     winner = "Black" if currentPlayer == "White" else "White"
-                    save_game_trace(self.game_parameters, self.moves_log, f"{winner} (Timeout)", self.initial_board, self.board_snapshots)
+                    self.save_trace(f"{winner} (Timeout)")
                     break #end the game
 
 
@@ -623,6 +1342,10 @@ class MiniChess:
                 
                 game_over = self.execute_move(move)
 
+        if self.profiler is not None:
+            print(self.profiler.report())
+        self.close()
+
 if __name__ == "__main__":
     game = MiniChess()
     game.play()
\ No newline at end of file
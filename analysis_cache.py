@@ -0,0 +1,219 @@
+"""
+Persistent analysis cache shared by every engine process on the machine.
+
+Deep search results (position key, depth, score, best move) are kept in one
+file mapped into memory by every process that uses it, so positions searched
+again and again from init_board are answered without searching once one
+process has searched them deeply enough (the "cache_depth" game parameter).
+
+The file has a fixed size, chosen when it is created, so it never grows:
+
+    header   b"MCAC", version (B), 3 padding bytes, number of buckets (I), 4 padding bytes
+    buckets  BUCKET_SIZE records of key ^ variant ^ data (Q), data (Q), time stamp (I)
+
+data packs the score (32 bits), the move (16 bits) and the depth (8 bits). The
+search variant is a 64-bit hash of every game parameter that changes scores
+(SCORE_PARAMETERS), so engines with other settings never see each other's
+results. Reads take no lock: a record is only accepted if its first word XOR
+its data gives the key and variant probed, so a record torn by a concurrent
+write is a miss. Writes lock
+the file (fcntl, where available). A full bucket replaces entries older than
+max_age first, then the shallowest one, and keeps deeper fresh results.
+
+python analysis_cache.py stats analysis.mcac
+python analysis_cache.py prune analysis.mcac --max_age_days 7 --min_depth 6
+"""
+
+import os
+import mmap
+import time
+import struct
+import hashlib
+import argparse
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are not locked, torn records are still rejected by the check word
+    fcntl = None
+
+CACHE_MAGIC = b"MCAC"
+CACHE_VERSION = 2
+HEADER = struct.Struct("<4sB3xI4x")
+RECORD = struct.Struct("<QQI")
+BUCKET_SIZE = 4
+BUCKET_BYTES = BUCKET_SIZE * RECORD.size
+# Results shallower than this are not worth a slot
+MIN_CACHED_DEPTH = 4
+# Game parameters that change the score of a position, with their defaults
+SCORE_PARAMETERS = {
+    "heuristic": "e0",
+    "quiescence": True,
+    "quiescence_budget": 256,
+    "delta_margin": 2,
+    "null_move": False,
+    "null_move_reduction": 2,
+    "lmr": False,
+    "lmr_moves": 3,
+    "lmr_min_depth": 3,
+    "futility": False,
+    "futility_margin": 3,
+}
+
+
+def score_settings(game_parameters):
+    """Values of SCORE_PARAMETERS: searches with different settings give different scores."""
+    return tuple((name, game_parameters.get(name, default)) for name, default in SCORE_PARAMETERS.items())
+
+
+def search_variant(game_parameters):
+    """64-bit hash of score_settings, the same in every process."""
+    digest = hashlib.blake2b(repr(score_settings(game_parameters)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _pack(depth, score, move):
+    return (score & 0xFFFFFFFF) | (move or 0) << 32 | depth << 48
+
+
+def _unpack(data):
+    score = data & 0xFFFFFFFF
+    if score >= 1 << 31:
+        score -= 1 << 32
+    return (data >> 48) & 0xFF, score, (data >> 32) & 0xFFFF or None
+
+
+class AnalysisCache:
+    """Memory-mapped table of search results, shared between processes."""
+
+    def __init__(self, path, size_mb=64, max_age_days=30):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.hits = 0
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._locked():
+            if os.fstat(self.fd).st_size < HEADER.size:
+                buckets = max(1, int(size_mb * 1024 * 1024) // BUCKET_BYTES)
+                os.ftruncate(self.fd, HEADER.size + buckets * BUCKET_BYTES)
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                os.write(self.fd, HEADER.pack(CACHE_MAGIC, CACHE_VERSION, buckets))
+        self.data = mmap.mmap(self.fd, 0)
+        magic, version, self.buckets = HEADER.unpack_from(self.data)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            raise ValueError(f"{path} is not a version {CACHE_VERSION} analysis cache")
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def _bucket(self, key):
+        return HEADER.size + (key % self.buckets) * BUCKET_BYTES
+
+    def probe(self, key, variant):
+        """(depth, score, move) stored for the position key and search variant, or None."""
+        offset = self._bucket(key)
+        for number in range(BUCKET_SIZE):
+            check, data, _ = RECORD.unpack_from(self.data, offset + number * RECORD.size)
+            if data and check ^ data == key ^ variant:
+                self.hits += 1
+                return _unpack(data)
+        return None
+
+    def store(self, key, variant, depth, score, move):
+        """Add a result, replacing a shallower one for the same position (see the module docstring)."""
+        if depth < MIN_CACHED_DEPTH:
+            return
+        now = int(time.time())
+        offset = self._bucket(key)
+        data = _pack(min(depth, 255), score, move)
+        check = key ^ variant ^ data
+        with self._locked():
+            victim = None
+            victim_rank = None
+            for number in range(BUCKET_SIZE):
+                record_offset = offset + number * RECORD.size
+                old_check, old_data, stamp = RECORD.unpack_from(self.data, record_offset)
+                if not old_data:
+                    rank = (-1, 0)
+                else:
+                    old_depth = _unpack(old_data)[0]
+                    expired = now - stamp > self.max_age
+                    if old_check ^ old_data == key ^ variant:
+                        if old_depth > depth and not expired:
+                            return
+                        victim = record_offset
+                        break
+                    # Expired entries go first, then the shallowest, then the oldest
+                    rank = (-1 if expired else old_depth, stamp)
+                if victim_rank is None or rank < victim_rank:
+                    victim, victim_rank = record_offset, rank
+            else:
+                if victim_rank[0] > depth:
+                    return
+            RECORD.pack_into(self.data, victim, check, data, now & 0xFFFFFFFF)
+
+    def records(self):
+        """Yield (offset, depth, stamp) of every valid record."""
+        for offset in range(HEADER.size, HEADER.size + self.buckets * BUCKET_BYTES, RECORD.size):
+            _, data, stamp = RECORD.unpack_from(self.data, offset)
+            if data:
+                yield offset, _unpack(data)[0], stamp
+
+    def prune(self, max_age=None, min_depth=0):
+        """Remove records older than max_age seconds or shallower than min_depth; returns how many."""
+        now = time.time()
+        removed = 0
+        with self._locked():
+            for offset, depth, stamp in list(self.records()):
+                if depth < min_depth or (max_age is not None and now - stamp > max_age):
+                    RECORD.pack_into(self.data, offset, 0, 0, 0)
+                    removed += 1
+        return removed
+
+    def summary(self):
+        """Records in use, by depth, and the age of the oldest one in days."""
+        depths = {}
+        oldest = None
+        count = 0
+        for _, depth, stamp in self.records():
+            count += 1
+            depths[depth] = depths.get(depth, 0) + 1
+            oldest = stamp if oldest is None else min(oldest, stamp)
+        return {
+            "records": count,
+            "capacity": self.buckets * BUCKET_SIZE,
+            "by_depth": dict(sorted(depths.items())),
+            "oldest_days": (time.time() - oldest) / 86400 if oldest is not None else 0.0,
+        }
+
+    def close(self):
+        self.data.close()
+        os.close(self.fd)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or prune a Mini Chess analysis cache")
+    parser.add_argument("command", choices=["stats", "prune"])
+    parser.add_argument("cache", help="Cache file")
+    parser.add_argument("--max_age_days", type=float, default=None, help="prune: remove entries older than this")
+    parser.add_argument("--min_depth", type=int, default=0, help="prune: remove entries shallower than this")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.cache):
+        parser.error(f"{args.cache} does not exist")
+    cache = AnalysisCache(args.cache)
+    if args.command == "prune":
+        max_age = args.max_age_days * 86400 if args.max_age_days is not None else None
+        print(f"Removed {cache.prune(max_age, args.min_depth)} entries")
+    summary = cache.summary()
+    print(f"{summary['records']} / {summary['capacity']} entries, oldest {summary['oldest_days']:.1f} days")
+    for depth, count in summary["by_depth"].items():
+        print(f"  depth {depth}: {count}")
+    cache.close()
@@ -0,0 +1,102 @@
+"""
+Vectorized e0/e1/e2 evaluation of many positions at once with NumPy.
+
+Boards are encoded as (N, 5, 5) int8 arrays: 0 is an empty square, White
+pieces are 1..5 (pawn, Knight, Bishop, Queen, King) and Black pieces the same
+codes negated. Scores come from the same piece-square tables as the search
+(evaluation.py), so they match e0_heuristic/e1_heuristic/e2_heuristic exactly.
+"""
+
+import numpy as np
+
+from bitboard import PAWN, QUEEN, PIECE_LETTERS, COLOR_LETTERS, SQUARE_COORDS
+from evaluation import TABLES
+
+HEURISTICS = ("e0", "e1", "e2")
+
+# Code for each piece index (colour * 5 + piece type) of bitboard.py
+PIECE_CODES = [index % 5 + 1 if index < 5 else -(index % 5 + 1) for index in range(10)]
+_SQUARES = np.arange(25)
+
+
+def _lookup(table):
+    """LOOKUP[code + 5, square] = table value of that piece on that square."""
+    lookup = np.zeros((11, 25), dtype=np.int32)
+    for index, code in enumerate(PIECE_CODES):
+        lookup[code + 5] = table[index]
+    return lookup
+
+
+LOOKUPS = {name: _lookup(table) for name, table in TABLES.items()}
+
+
+def encode_board(board):
+    """Encode a list-of-strings board as a (5, 5) int8 array."""
+    encoded = np.zeros((5, 5), dtype=np.int8)
+    for row in range(5):
+        for col in range(5):
+            piece = board[row][col]
+            if piece != '.':
+                encoded[row, col] = PIECE_CODES[COLOR_LETTERS.index(piece[0]) * 5 + PIECE_LETTERS.index(piece[1])]
+    return encoded
+
+
+def encode_game_states(game_states):
+    """Encode a sequence of MiniChess game_state dicts as an (N, 5, 5) int8 array."""
+    encoded = np.zeros((len(game_states), 5, 5), dtype=np.int8)
+    for i, game_state in enumerate(game_states):
+        encoded[i] = encode_board(game_state["board"])
+    return encoded
+
+
+def encode_position(position):
+    """Encode a BitboardPosition as a (5, 5) int8 array."""
+    encoded = np.zeros(25, dtype=np.int8)
+    for index, code in enumerate(PIECE_CODES):
+        bb = position.pieces[index]
+        while bb:
+            low = bb & -bb
+            encoded[low.bit_length() - 1] = code
+            bb ^= low
+    return encoded.reshape(5, 5)
+
+
+def decode_board(encoded):
+    """Convert one encoded (5, 5) board back into the list-of-strings format."""
+    board = [['.'] * 5 for _ in range(5)]
+    for sq, code in enumerate(np.asarray(encoded).reshape(25)):
+        if code:
+            row, col = SQUARE_COORDS[sq]
+            board[row][col] = COLOR_LETTERS[0 if code > 0 else 1] + PIECE_LETTERS[abs(int(code)) - 1]
+    return board
+
+
+def evaluate_batch(boards, heuristic="e0"):
+    """Score an (N, 5, 5) array of encoded boards with one heuristic; returns an (N,) int array."""
+    squares = np.asarray(boards).reshape(-1, 25).astype(np.intp)
+    return LOOKUPS[heuristic][squares + 5, _SQUARES].sum(axis=1)
+
+
+def evaluate_all(boards):
+    """Score an (N, 5, 5) array of encoded boards with e0, e1 and e2."""
+    return {name: evaluate_batch(boards, name) for name in HEURISTICS}
+
+
+def score_children(position, moves, heuristic="e0"):
+    """
+    Scores of every child of position (one per packed move) in one vectorized
+    call, used by minimax at frontier nodes. position.score must come from the
+    same heuristic.
+    """
+    board = encode_position(position).reshape(25).astype(np.intp)
+    moves = np.asarray(moves, dtype=np.intp)
+    start = moves & 31
+    end = moves >> 5
+    moved = board[start]
+    captured = board[end]
+    # Pawn promotion: White pawns promote on row 0, Black pawns on row 4
+    pawn = PAWN + 1
+    queen = QUEEN + 1
+    placed = np.where((moved == pawn) & (end < 5), queen, np.where((moved == -pawn) & (end >= 20), -queen, moved))
+    lookup = LOOKUPS[heuristic]
+    return position.score + lookup[placed + 5, end] - lookup[moved + 5, start] - lookup[captured + 5, end]
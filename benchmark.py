@@ -0,0 +1,215 @@
+"""
+Reproducible search benchmark: speed, time to depth and cutoff efficiency.
+
+Every configuration searches every position of POSITIONS with a fresh engine
+(empty transposition table and move ordering history), so the node counts do
+not depend on the machine or on the order of the runs. Configurations cover
+alpha-beta on and off, the e0, e1 and e2 heuristics, and two budgets: a fixed
+depth (iterative deepening up to --depth) and a fixed number of nodes
+(--nodes, searched as deep as it allows). Time limits play no part.
+
+For each configuration and position the report gives the total nodes, the
+seconds and nodes per second, the time at which each depth was completed and
+the effective branching factor (the geometric mean of the growth in nodes
+from one iteration to the next). Results are written as JSON; with
+--baseline, the totals are compared with a report saved earlier and the
+command exits with status 1 when a configuration got slower than the
+tolerance allows or searched a different number of nodes (the search changed).
+A default run takes a few hundredths of a second per configuration, where
+the speed varies by well over 10% from run to run, hence the 30% default
+tolerance; raise --depth and --nodes to compare speeds more closely.
+
+python benchmark.py -o baseline.json
+python benchmark.py --baseline baseline.json
+python benchmark.py -d 6 -n 200000 --baseline deep_baseline.json --tolerance 0.1
+python benchmark.py -c ab-e0-depth -c ab-e2-nodes -p start -p middlegame
+"""
+
+import sys
+import json
+import time
+import platform
+import argparse
+import itertools
+
+from game_io import default_game_parameters
+from perft import parse_board
+
+BENCHMARK_VERSION = 1
+# name: moves from init_board, or (board, turn) as for perft.py --board
+POSITIONS = {
+    "start": [],
+    "pawns": ["B2 B3", "C4 C3", "B3 B4"],
+    "knights": ["B1 C3", "D5 E3", "C3 B5", "E3 D1"],
+    "middlegame": ["B1 C3", "D5 C3", "E1 D2", "B5 B3", "D2 E2", "C3 B1", "C1 E3", "B1 D2", "D1 B1", "A5 B4"],
+    "endgame": ("bK . bB . . . . bp . . . . . . . . wp wQ . . . . . . wK", "white"),
+}
+HEURISTICS = ("e0", "e1", "e2")
+# Totals compared with the baseline: (name, whether it is a speed rather than an exact count)
+COMPARED = (("nodes", False), ("nodes_per_second", True))
+DEFAULT_TOLERANCE = 0.3
+
+
+def configurations(depth, nodes):
+    """{name: game parameter overrides} for every combination."""
+    configs = {}
+    for alpha_beta, heuristic, budget in itertools.product((True, False), HEURISTICS, ("depth", "nodes")):
+        name = f"{'ab' if alpha_beta else 'minimax'}-{heuristic}-{budget}"
+        configs[name] = {
+            "alpha_beta": alpha_beta,
+            "heuristic": heuristic,
+            "depth_limit": depth if budget == "depth" else None,
+            "node_limit": nodes if budget == "nodes" else 0,
+        }
+    return configs
+
+
+def position_state(game, name):
+    """game_state of one of POSITIONS."""
+    spec = POSITIONS[name]
+    if isinstance(spec, tuple):
+        return parse_board(*spec)
+    game_state = game.init_board()
+    for move_str in spec:
+        move = game.parse_input(move_str)
+        if move is None or move not in game.valid_moves(game_state):
+            raise ValueError(f"Illegal move {move_str!r} in benchmark position {name!r}")
+        game_state, game_over, _ = game.make_move(game_state, move)
+        if game_over:
+            raise ValueError(f"Benchmark position {name!r} ends the game")
+    return game_state
+
+
+def effective_branching_factor(iterations):
+    """Geometric mean of nodes(d) / nodes(d - 1) over successive completed iterations."""
+    if len(iterations) < 2 or iterations[0]["nodes"] == 0:
+        return 0.0
+    first, last = iterations[0], iterations[-1]
+    return (last["nodes"] / first["nodes"]) ** (1 / (last["depth"] - first["depth"]))
+
+
+def run_search(overrides, position_name):
+    """Search one position with a fresh engine; returns its measurements."""
+    from MiniChessSkeletonCode import MiniChess
+    parameters = default_game_parameters(
+        alpha_beta=overrides["alpha_beta"], heuristic=overrides["heuristic"], node_limit=overrides["node_limit"],
+        time_limit=float('inf'), ponder=False, workers=1, book="", analysis_cache="", tablebase_dir="",
+        instrument=True, stats_file="", profile="off")
+    engine = MiniChess(parameters)
+    game_state = position_state(engine, position_name)
+    start_time = time.time()
+    completed = engine.search_position(game_state, start_time, float('inf'), depth_limit=overrides["depth_limit"])
+    seconds = time.time() - start_time
+    counters = engine.search_counters()
+    iterations = counters["iterations"]
+    time_to_depth = {}
+    elapsed = 0.0
+    for iteration in iterations:
+        elapsed += iteration["seconds"]
+        time_to_depth[iteration["depth"]] = elapsed
+    depth, score, move = completed[-1] if completed else (0, None, None)
+    return {
+        "nodes": counters["nodes"],
+        "seconds": seconds,
+        "nodes_per_second": counters["nodes"] / seconds if seconds else 0.0,
+        "depth": iterations[-1]["depth"] if iterations else 0,
+        "time_to_depth": time_to_depth,
+        "ebf": effective_branching_factor(iterations),
+        "score": score,
+        "move": engine.move_to_string(move) if move is not None else None,
+    }
+
+
+def run_benchmark(configs, position_names, verbose=True):
+    """{config: {"positions": {name: measurements}, "total": totals}}."""
+    results = {}
+    for config_name, overrides in configs.items():
+        positions = {name: run_search(overrides, name) for name in position_names}
+        nodes = sum(result["nodes"] for result in positions.values())
+        seconds = sum(result["seconds"] for result in positions.values())
+        ebfs = [result["ebf"] for result in positions.values() if result["ebf"]]
+        total = {
+            "nodes": nodes,
+            "seconds": seconds,
+            "nodes_per_second": nodes / seconds if seconds else 0.0,
+            "ebf": sum(ebfs) / len(ebfs) if ebfs else 0.0,
+        }
+        results[config_name] = {"positions": positions, "total": total}
+        if verbose:
+            print(f"{config_name:18} {nodes:>10} nodes {seconds:8.2f} sec {total['nodes_per_second']:>9.0f} nodes/sec "
+                  f"EBF {total['ebf']:.2f}")
+    return results
+
+
+def compare(report, baseline, tolerance):
+    """Lines describing the differences with a baseline report, and whether any is a regression."""
+    lines = []
+    regression = False
+    for config_name, result in report["results"].items():
+        old = baseline.get("results", {}).get(config_name)
+        if old is None:
+            lines.append(f"{config_name:18} not in the baseline")
+            continue
+        changes = []
+        for field, is_speed in COMPARED:
+            new_value, old_value = result["total"][field], old["total"][field]
+            if not is_speed:
+                if new_value != old_value:
+                    changes.append(f"{field} {old_value} -> {new_value} (search changed)")
+                    regression = True
+                continue
+            ratio = new_value / old_value if old_value else 1.0
+            worse = ratio < 1 - tolerance
+            regression = regression or worse
+            changes.append(f"{field} {(ratio - 1) * 100:+.1f}%{' REGRESSION' if worse else ''}")
+        lines.append(f"{config_name:18} " + ", ".join(changes))
+    return lines, regression
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mini Chess search benchmark")
+    parser.add_argument("-d", "--depth", type=int, default=4, help="Depth of the fixed-depth configurations")
+    parser.add_argument("-n", "--nodes", type=int, default=20000, help="Node budget of the fixed-node configurations")
+    parser.add_argument("-c", "--config", action="append", default=None,
+                        help="Run only this configuration, e.g. ab-e1-depth or minimax-e0-nodes (may be repeated)")
+    parser.add_argument("-p", "--position", action="append", default=None, choices=list(POSITIONS),
+                        help="Run only this position (may be repeated)")
+    parser.add_argument("-o", "--output", type=str, default=None, help="Write the JSON report to this file")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON report to compare with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed drop in nodes per second relative to the baseline (0.3 = 30%%)")
+    args = parser.parse_args()
+
+    configs = configurations(args.depth, args.nodes)
+    if args.config:
+        unknown = [name for name in args.config if name not in configs]
+        if unknown:
+            parser.error(f"Unknown configurations {unknown}, choose from {list(configs)}")
+        configs = {name: configs[name] for name in args.config}
+    position_names = args.position or list(POSITIONS)
+
+    report = {
+        "version": BENCHMARK_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "depth": args.depth,
+        "nodes": args.nodes,
+        "positions": position_names,
+        "results": run_benchmark(configs, position_names),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline.get("depth"), baseline.get("nodes"), baseline.get("positions")) != (args.depth, args.nodes, position_names):
+            print("Warning: the baseline was run with other depth, node or position settings")
+        lines, regression = compare(report, baseline, args.tolerance)
+        print(f"Compared with {args.baseline}:")
+        for line in lines:
+            print(f"  {line}")
+        if regression:
+            sys.exit(1)
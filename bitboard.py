@@ -0,0 +1,579 @@
+"""
+Bitboard representation and move generator for Mini Chess.
+
+Squares are numbered 0..24 in the same row-major order as the list-of-strings
+board used by MiniChess (A5 = 0, E5 = 4, ..., E1 = 24), so square = row * 5 + col
+and every board fits in a 25-bit integer.
+
+Moves are packed into a single integer: the start square in the low 5 bits
+and the end square in the next 5 bits. Promotion is implied, since a pawn that
+reaches the last row always becomes a Queen.
+
+A position also carries the game's draw state: the halfmove clock (moves since
+the last capture), the number of moves played and the keys of the positions
+before each move, so the search can see the no-capture and max_turns draws and
+repetitions.
+"""
+
+import random
+
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, QUEEN, KING = range(5)
+
+COLOR_NAMES = ["White", "Black"]
+COLOR_LETTERS = "wb"
+PIECE_LETTERS = "pNBQK"
+
+# Draw after 10 turns (20 moves) without a capture, as in MiniChess.execute_move
+NO_CAPTURE_LIMIT = 20
+# A position can only repeat once both sides have made two moves without a capture
+REPETITION_CLOCK = 4
+
+# e0 material values, indexed by piece type
+PIECE_VALUES = [1, 3, 3, 9, 999]
+
+FULL_BOARD = (1 << 25) - 1
+SQUARE_COORDS = [divmod(sq, 5) for sq in range(25)]
+
+# e0 as a piece-square table (see evaluation.py): MATERIAL_TABLE[piece_index][square]
+MATERIAL_TABLE = [[(1 if index < 5 else -1) * PIECE_VALUES[index % 5]] * 25 for index in range(10)]
+
+
+def square(row, col):
+    """Convert a (row, col) coordinate into a square index."""
+    return row * 5 + col
+
+
+def encode_move(start, end):
+    """Pack a ((row, col), (row, col)) move into an integer."""
+    return (start[0] * 5 + start[1]) | (end[0] * 5 + end[1]) << 5
+
+
+def decode_move(move):
+    """Unpack an integer move into the ((row, col), (row, col)) format used by MiniChess."""
+    return SQUARE_COORDS[move & 31], SQUARE_COORDS[move >> 5]
+
+
+def _step_table(offsets):
+    """Attack table for a piece that jumps by fixed (row, col) offsets."""
+    table = []
+    for sq in range(25):
+        row, col = SQUARE_COORDS[sq]
+        attacks = 0
+        for dr, dc in offsets:
+            r, c = row + dr, col + dc
+            if 0 <= r < 5 and 0 <= c < 5:
+                attacks |= 1 << (r * 5 + c)
+        table.append(attacks)
+    return table
+
+
+def _ray_table(dr, dc):
+    """All squares reachable from each square in one direction on an empty board."""
+    table = []
+    for sq in range(25):
+        row, col = SQUARE_COORDS[sq]
+        ray = 0
+        r, c = row + dr, col + dc
+        while 0 <= r < 5 and 0 <= c < 5:
+            ray |= 1 << (r * 5 + c)
+            r += dr
+            c += dc
+        table.append(ray)
+    return table
+
+
+KING_ATTACKS = _step_table([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)])
+KNIGHT_ATTACKS = _step_table([(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)])
+
+# Indexed by colour: White pawns move up the board (towards row 0), Black pawns down
+PAWN_ATTACKS = [_step_table([(-1, -1), (-1, 1)]), _step_table([(1, -1), (1, 1)])]
+PAWN_PUSHES = [_step_table([(-1, 0)]), _step_table([(1, 0)])]
+PROMOTION_ROWS = [0b11111, 0b11111 << 20]
+
+# Sliding rays as (table, increasing) pairs. For a ray that runs towards higher
+# square numbers the nearest blocker is the lowest set bit, otherwise the highest.
+DIAGONAL_RAYS = [(_ray_table(dr, dc), dr * 5 + dc > 0) for dr, dc in [(-1, -1), (-1, 1), (1, -1), (1, 1)]]
+ORTHOGONAL_RAYS = [(_ray_table(dr, dc), dr * 5 + dc > 0) for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]]
+BISHOP_RAYS = DIAGONAL_RAYS
+QUEEN_RAYS = DIAGONAL_RAYS + ORTHOGONAL_RAYS
+
+
+# Zobrist keys: one random 64-bit number per (piece, square), plus one for Black
+# to move. A fixed seed keeps keys stable between runs and processes.
+_zobrist_random = random.Random(0x5EED)
+ZOBRIST_PIECES = [[_zobrist_random.getrandbits(64) for sq in range(25)] for index in range(10)]
+ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+
+# Piece index by board name: "wp" -> 0, ..., "bK" -> 9
+PIECE_INDEX = {COLOR_LETTERS[index // 5] + PIECE_LETTERS[index % 5]: index for index in range(10)}
+
+
+def board_key(board, turn):
+    """Zobrist key of a game_state board (list of lists of strings) with turn ('white' or 'black') to move."""
+    key = ZOBRIST_BLACK_TO_MOVE if turn == 'black' else 0
+    for row in range(5):
+        for col in range(5):
+            piece = board[row][col]
+            if piece != '.':
+                key ^= ZOBRIST_PIECES[PIECE_INDEX[piece]][row * 5 + col]
+    return key
+
+
+def moved_key(key, piece, target, placed, start, end):
+    """
+    Key after piece moves from square start to square end, capturing target
+    ('.' for none) and becoming placed there (a Queen on promotion).
+    """
+    key ^= ZOBRIST_BLACK_TO_MOVE ^ ZOBRIST_PIECES[PIECE_INDEX[piece]][start] ^ ZOBRIST_PIECES[PIECE_INDEX[placed]][end]
+    if target != '.':
+        key ^= ZOBRIST_PIECES[PIECE_INDEX[target]][end]
+    return key
+
+
+def extend_history(history, clock, key):
+    """
+    history[:clock] + [key]. game_state dicts share their history list with the
+    states made from them and only own its first halfmove_clock keys, so the
+    list is extended in place unless another state already extended it.
+    """
+    if len(history) != clock:
+        history = history[:clock]
+    history.append(key)
+    return history
+
+
+def sliding_attacks(sq, occupied, rays):
+    """Squares attacked from sq along the given rays, stopping at the first blocker."""
+    attacks = 0
+    for table, increasing in rays:
+        ray = table[sq]
+        blockers = ray & occupied
+        if blockers:
+            if increasing:
+                first = (blockers & -blockers).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+            ray ^= table[first]
+        attacks |= ray
+    return attacks
+
+
+def _add_moves(moves, start, targets):
+    while targets:
+        low = targets & -targets
+        moves.append(start | (low.bit_length() - 1) << 5)
+        targets ^= low
+
+
+class BitboardPosition:
+    """A Mini Chess position stored as one 25-bit integer per piece type and colour."""
+
+    __slots__ = ("pieces", "turn", "table", "occupied", "key", "score", "halfmove_clock", "ply", "history")
+
+    def __init__(self, pieces=None, turn=WHITE, table=None, halfmove_clock=0, ply=0, history=()):
+        # pieces[colour * 5 + piece_type] is the bitboard for that piece
+        self.pieces = list(pieces) if pieces is not None else [0] * 10
+        self.turn = turn
+        # Moves since the last capture, moves played in the game, keys of the positions before each move
+        self.halfmove_clock = halfmove_clock
+        self.ply = ply
+        self.history = list(history)
+        # Piece-square evaluation table, kept up to date in self.score by apply_move
+        self.table = table if table is not None else MATERIAL_TABLE
+        self.occupied = [0, 0]
+        for color in (WHITE, BLACK):
+            for piece_type in range(5):
+                self.occupied[color] |= self.pieces[color * 5 + piece_type]
+        self.key = self.compute_key()
+        self.score = self.compute_score()
+
+    @classmethod
+    def from_game_state(cls, game_state, table=None):
+        """Build a position from a MiniChess game_state dict (with its draw state, if it has one) or a CompactPosition."""
+        if not isinstance(game_state, dict):
+            return game_state.to_bitboard(table)
+        pieces = [0] * 10
+        for row in range(5):
+            for col in range(5):
+                piece = game_state["board"][row][col]
+                if piece == '.':
+                    continue
+                index = COLOR_LETTERS.index(piece[0]) * 5 + PIECE_LETTERS.index(piece[1])
+                pieces[index] |= 1 << (row * 5 + col)
+        clock = game_state.get("halfmove_clock", 0)
+        return cls(pieces, WHITE if game_state["turn"] == 'white' else BLACK, table,
+                   clock, game_state.get("turns", 0), game_state.get("history", ())[:clock])
+
+    def to_game_state(self):
+        """Convert back into a MiniChess game_state dict."""
+        board = [['.'] * 5 for _ in range(5)]
+        for index in range(10):
+            bb = self.pieces[index]
+            name = COLOR_LETTERS[index // 5] + PIECE_LETTERS[index % 5]
+            while bb:
+                low = bb & -bb
+                row, col = SQUARE_COORDS[low.bit_length() - 1]
+                board[row][col] = name
+                bb ^= low
+        return {"board": board, "turn": 'white' if self.turn == WHITE else 'black'}
+
+    def compute_key(self):
+        """Zobrist key computed from scratch; apply_move keeps self.key up to date incrementally."""
+        key = ZOBRIST_BLACK_TO_MOVE if self.turn == BLACK else 0
+        for index in range(10):
+            bb = self.pieces[index]
+            while bb:
+                low = bb & -bb
+                key ^= ZOBRIST_PIECES[index][low.bit_length() - 1]
+                bb ^= low
+        return key
+
+    def compute_score(self):
+        """Evaluation from scratch with self.table; apply_move keeps self.score up to date incrementally."""
+        score = 0
+        for index in range(10):
+            values = self.table[index]
+            bb = self.pieces[index]
+            while bb:
+                low = bb & -bb
+                score += values[low.bit_length() - 1]
+                bb ^= low
+        return score
+
+    def set_table(self, table):
+        """Switch to another piece-square evaluation table."""
+        self.table = table
+        self.score = self.compute_score()
+
+    def copy(self):
+        return BitboardPosition(self.pieces, self.turn, self.table, self.halfmove_clock, self.ply, self.history)
+
+    def piece_at(self, sq):
+        """Index into self.pieces of the piece on sq, or -1 if the square is empty."""
+        bit = 1 << sq
+        for index in range(10):
+            if self.pieces[index] & bit:
+                return index
+        return -1
+
+    def generate_moves(self):
+        """All moves for the side to move, with the same rules as MiniChess.valid_moves."""
+        moves = []
+        us = self.turn
+        own = self.occupied[us]
+        enemy = self.occupied[us ^ 1]
+        occupied = own | enemy
+        not_own = ~own & FULL_BOARD
+        pieces = self.pieces
+        base = us * 5
+
+        pushes = PAWN_PUSHES[us]
+        captures = PAWN_ATTACKS[us]
+        bb = pieces[base + PAWN]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, (pushes[sq] & ~occupied) | (captures[sq] & enemy))
+            bb ^= low
+
+        bb = pieces[base + KNIGHT]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, KNIGHT_ATTACKS[sq] & not_own)
+            bb ^= low
+
+        bb = pieces[base + BISHOP]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, sliding_attacks(sq, occupied, BISHOP_RAYS) & not_own)
+            bb ^= low
+
+        bb = pieces[base + QUEEN]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, sliding_attacks(sq, occupied, QUEEN_RAYS) & not_own)
+            bb ^= low
+
+        bb = pieces[base + KING]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, KING_ATTACKS[sq] & not_own)
+            bb ^= low
+
+        return moves
+
+    def generate_captures(self):
+        """Captures and promotions only (a subset of generate_moves), for the quiescence search."""
+        moves = []
+        us = self.turn
+        own = self.occupied[us]
+        enemy = self.occupied[us ^ 1]
+        occupied = own | enemy
+        pieces = self.pieces
+        base = us * 5
+
+        pushes = PAWN_PUSHES[us]
+        captures = PAWN_ATTACKS[us]
+        promotions = PROMOTION_ROWS[us] & ~occupied
+        bb = pieces[base + PAWN]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, (pushes[sq] & promotions) | (captures[sq] & enemy))
+            bb ^= low
+
+        bb = pieces[base + KNIGHT]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, KNIGHT_ATTACKS[sq] & enemy)
+            bb ^= low
+
+        bb = pieces[base + BISHOP]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, sliding_attacks(sq, occupied, BISHOP_RAYS) & enemy)
+            bb ^= low
+
+        bb = pieces[base + QUEEN]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, sliding_attacks(sq, occupied, QUEEN_RAYS) & enemy)
+            bb ^= low
+
+        bb = pieces[base + KING]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, KING_ATTACKS[sq] & enemy)
+            bb ^= low
+
+        return moves
+
+    def generate_quiets(self):
+        """Moves to empty squares that are not promotions: generate_moves minus generate_captures."""
+        moves = []
+        us = self.turn
+        own = self.occupied[us]
+        occupied = own | self.occupied[us ^ 1]
+        empty = ~occupied & FULL_BOARD
+        pieces = self.pieces
+        base = us * 5
+
+        pushes = PAWN_PUSHES[us]
+        targets = empty & ~PROMOTION_ROWS[us]
+        bb = pieces[base + PAWN]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, pushes[sq] & targets)
+            bb ^= low
+
+        bb = pieces[base + KNIGHT]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, KNIGHT_ATTACKS[sq] & empty)
+            bb ^= low
+
+        bb = pieces[base + BISHOP]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, sliding_attacks(sq, occupied, BISHOP_RAYS) & empty)
+            bb ^= low
+
+        bb = pieces[base + QUEEN]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, sliding_attacks(sq, occupied, QUEEN_RAYS) & empty)
+            bb ^= low
+
+        bb = pieces[base + KING]
+        while bb:
+            low = bb & -bb
+            sq = low.bit_length() - 1
+            _add_moves(moves, sq, KING_ATTACKS[sq] & empty)
+            bb ^= low
+
+        return moves
+
+    def least_valuable_attacker(self, sq, color, occupied):
+        """(piece type, square bit) of the cheapest piece of color attacking sq, or None; occupied masks removed pieces."""
+        pieces = self.pieces
+        base = color * 5
+        attackers = PAWN_ATTACKS[color ^ 1][sq] & pieces[base + PAWN] & occupied
+        if attackers:
+            return PAWN, attackers & -attackers
+        attackers = KNIGHT_ATTACKS[sq] & pieces[base + KNIGHT] & occupied
+        if attackers:
+            return KNIGHT, attackers & -attackers
+        diagonal = sliding_attacks(sq, occupied, DIAGONAL_RAYS)
+        attackers = diagonal & pieces[base + BISHOP] & occupied
+        if attackers:
+            return BISHOP, attackers & -attackers
+        attackers = (diagonal | sliding_attacks(sq, occupied, ORTHOGONAL_RAYS)) & pieces[base + QUEEN] & occupied
+        if attackers:
+            return QUEEN, attackers & -attackers
+        attackers = KING_ATTACKS[sq] & pieces[base + KING] & occupied
+        if attackers:
+            return KING, attackers & -attackers
+        return None
+
+    def static_exchange(self, move):
+        """
+        Material won by the side to move (in PIECE_VALUES) if both sides keep
+        recapturing on the move's target square with their least valuable piece
+        and may stop whenever continuing would lose material.
+        """
+        start = move & 31
+        end = move >> 5
+        end_bit = 1 << end
+        us = self.turn
+        victim = self.piece_at(end)
+        on_square = self.piece_at(start) % 5
+        gains = [PIECE_VALUES[victim % 5] if victim >= 0 else 0]
+        if on_square == PAWN and end_bit & PROMOTION_ROWS[us]:
+            gains[0] += PIECE_VALUES[QUEEN] - PIECE_VALUES[PAWN]
+            on_square = QUEEN
+        occupied = (self.occupied[0] | self.occupied[1]) ^ (1 << start)
+        side = us ^ 1
+        while True:
+            attacker = self.least_valuable_attacker(end, side, occupied)
+            if attacker is None:
+                break
+            piece_type, bit = attacker
+            gains.append(PIECE_VALUES[on_square] - gains[-1])
+            occupied ^= bit
+            on_square = QUEEN if piece_type == PAWN and end_bit & PROMOTION_ROWS[side] else piece_type
+            side ^= 1
+        while len(gains) > 1:
+            last = gains.pop()
+            gains[-1] = -max(-gains[-1], last)
+        return gains[0]
+
+    def is_draw(self, max_turns=None):
+        """
+        True if the game is drawn here: the no-capture limit or max_turns has
+        been reached, or the position already occurred since the last capture.
+        A repetition is not a rule of the game, but the search scores it as a
+        draw since the side that repeated could not make progress.
+        """
+        clock = self.halfmove_clock
+        if clock >= NO_CAPTURE_LIMIT or (max_turns is not None and self.ply >= max_turns):
+            return True
+        return clock >= REPETITION_CLOCK and self.key in self.history[-clock:]
+
+    def plies_to_draw(self, max_turns=None):
+        """Moves left before the no-capture or max_turns draw, if no capture resets the clock."""
+        plies = NO_CAPTURE_LIMIT - self.halfmove_clock
+        if max_turns is not None:
+            plies = min(plies, max_turns - self.ply)
+        return plies
+
+    def captures_king(self, move):
+        """True if the move lands on the opponent's King, which ends the game."""
+        return bool(self.pieces[(self.turn ^ 1) * 5 + KING] >> (move >> 5) & 1)
+
+    def apply_move(self, move):
+        """
+        Play a move in place and return the undo record (move, moved piece,
+        captured piece or -1, promoted, side to move, key, score, halfmove clock).
+        """
+        start = move & 31
+        end = move >> 5
+        us = self.turn
+        them = us ^ 1
+        pieces = self.pieces
+        occupied = self.occupied
+        start_bit = 1 << start
+        end_bit = 1 << end
+
+        table = self.table
+        old_key = self.key
+        key = old_key ^ ZOBRIST_BLACK_TO_MOVE
+        old_score = self.score
+
+        captured = -1
+        if occupied[them] & end_bit:
+            for captured in range(them * 5, them * 5 + 5):
+                if pieces[captured] & end_bit:
+                    break
+            pieces[captured] ^= end_bit
+            occupied[them] ^= end_bit
+            key ^= ZOBRIST_PIECES[captured][end]
+            self.score -= table[captured][end]
+
+        for moved in range(us * 5, us * 5 + 5):
+            if pieces[moved] & start_bit:
+                break
+        pieces[moved] ^= start_bit
+        # Pawn promotion
+        promoted = moved == us * 5 + PAWN and bool(end_bit & PROMOTION_ROWS[us])
+        placed = us * 5 + QUEEN if promoted else moved
+        pieces[placed] |= end_bit
+        occupied[us] ^= start_bit | end_bit
+        self.turn = them
+        self.key = key ^ ZOBRIST_PIECES[moved][start] ^ ZOBRIST_PIECES[placed][end]
+        self.score += table[placed][end] - table[moved][start]
+
+        clock = self.halfmove_clock
+        self.halfmove_clock = 0 if captured >= 0 else clock + 1
+        self.ply += 1
+        self.history.append(old_key)
+
+        return move, moved, captured, promoted, us, old_key, old_score, clock
+
+    def undo_move(self, undo):
+        """Take back a move played with apply_move."""
+        move, moved, captured, promoted, us, key, score, clock = undo
+        start_bit = 1 << (move & 31)
+        end_bit = 1 << (move >> 5)
+        pieces = self.pieces
+        pieces[us * 5 + QUEEN if promoted else moved] ^= end_bit
+        pieces[moved] |= start_bit
+        self.occupied[us] ^= start_bit | end_bit
+        if captured >= 0:
+            pieces[captured] |= end_bit
+            self.occupied[us ^ 1] |= end_bit
+        self.turn = us
+        self.key = key
+        self.score = score
+        self.halfmove_clock = clock
+        self.ply -= 1
+        self.history.pop()
+
+    def apply_null_move(self):
+        """Pass the turn (null-move pruning); returns what undo_null_move needs."""
+        self.turn ^= 1
+        self.key ^= ZOBRIST_BLACK_TO_MOVE
+        return self.turn ^ 1
+
+    def undo_null_move(self, turn):
+        self.turn = turn
+        self.key ^= ZOBRIST_BLACK_TO_MOVE
+
+    def has_non_pawn_material(self, color):
+        """True if color has a Knight, Bishop or Queen (King-and-pawn endings are prone to zugzwang)."""
+        base = color * 5
+        return bool(self.pieces[base + KNIGHT] | self.pieces[base + BISHOP] | self.pieces[base + QUEEN])
+
+    def make_move(self, move):
+        """
+        Return (new_position, game_over, winner) like MiniChess.make_move.
+        Capturing a King ends the game and leaves the board untouched.
+        """
+        new_position = self.copy()
+        # Check for win condition (king captured)
+        if self.captures_king(move):
+            return new_position, True, COLOR_NAMES[self.turn]
+        new_position.apply_move(move)
+        return new_position, False, None
@@ -0,0 +1,230 @@
+"""
+Compact slotted position, an alternative to the game_state dict.
+
+A game_state dict stores the board as a list of lists of strings such as "wK",
+so every access is a dict lookup and every colour test a string comparison.
+A CompactPosition keeps:
+
+    cells           bytearray(25), row-major like the board (square = row * 5 + col):
+                    0 for empty, colour * 5 + piece type + 1 otherwise (as in game_trace.py)
+    white_to_move   bool
+    piece_lists     squares of each piece, indexed like bitboard.py (colour * 5 + piece type)
+    kings           square of each colour's King (-1 once captured)
+    key             Zobrist key (the same as BitboardPosition.key)
+
+plus the same draw state as the dict (halfmove_clock, turns, history).
+
+Every MiniChess method that takes a game_state also accepts a CompactPosition:
+valid_moves, make_move and the heuristics use the fast paths below and the
+others go through to_game_state, the adapter back to the dict used by
+execute_move and display_board.
+
+    position = CompactPosition.from_game_state(game.init_board())
+    moves = game.valid_moves(position)
+    position, game_over, winner = game.make_move(position, moves[0])
+"""
+
+from bitboard import (WHITE, BLACK, PAWN, KNIGHT, QUEEN, KING, COLOR_LETTERS, PIECE_LETTERS, SQUARE_COORDS,
+                      MATERIAL_TABLE, ZOBRIST_PIECES, ZOBRIST_BLACK_TO_MOVE, BitboardPosition)
+
+EMPTY = 0
+PIECE_NAMES = ['.'] + [color + piece for color in COLOR_LETTERS for piece in PIECE_LETTERS]
+
+# Target squares in the order of MiniChess.king_moves / knight_moves / queen_moves / bishop_moves,
+# so valid_moves lists the moves in the same order for both representations
+KING_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+KNIGHT_OFFSETS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+BISHOP_OFFSETS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+def _step_targets(offsets):
+    return [[(row + dr) * 5 + col + dc for dr, dc in offsets if 0 <= row + dr < 5 and 0 <= col + dc < 5]
+            for row, col in SQUARE_COORDS]
+
+
+def _rays(offsets):
+    rays = []
+    for row, col in SQUARE_COORDS:
+        square_rays = []
+        for dr, dc in offsets:
+            ray = []
+            r, c = row + dr, col + dc
+            while 0 <= r < 5 and 0 <= c < 5:
+                ray.append(r * 5 + c)
+                r += dr
+                c += dc
+            if ray:
+                square_rays.append(ray)
+        rays.append(square_rays)
+    return rays
+
+
+KING_TARGETS = _step_targets(KING_OFFSETS)
+KNIGHT_TARGETS = _step_targets(KNIGHT_OFFSETS)
+QUEEN_LINES = _rays(KING_OFFSETS)
+BISHOP_LINES = _rays(BISHOP_OFFSETS)
+
+
+class CompactPosition:
+    """A Mini Chess position in a 25-byte mailbox with cached piece lists."""
+
+    __slots__ = ("cells", "white_to_move", "piece_lists", "kings", "key", "halfmove_clock", "turns", "history")
+
+    def __init__(self, cells, white_to_move=True, halfmove_clock=0, turns=0, history=()):
+        self.cells = bytearray(cells)
+        self.white_to_move = white_to_move
+        self.halfmove_clock = halfmove_clock
+        self.turns = turns
+        self.history = list(history)
+        self.piece_lists = [[] for _ in range(10)]
+        self.kings = [-1, -1]
+        key = 0 if white_to_move else ZOBRIST_BLACK_TO_MOVE
+        for sq, code in enumerate(self.cells):
+            if code:
+                self.piece_lists[code - 1].append(sq)
+                key ^= ZOBRIST_PIECES[code - 1][sq]
+                if (code - 1) % 5 == KING:
+                    self.kings[(code - 1) // 5] = sq
+        self.key = key
+
+    @classmethod
+    def from_game_state(cls, game_state):
+        """Build a position from a MiniChess game_state dict."""
+        cells = [PIECE_NAMES.index(piece) for row in game_state["board"] for piece in row]
+        clock = game_state.get("halfmove_clock", 0)
+        return cls(cells, game_state["turn"] == 'white', clock,
+                   game_state.get("turns", 0), game_state.get("history", ())[:clock])
+
+    def to_game_state(self):
+        """Convert back into a MiniChess game_state dict."""
+        return {
+            "board": self.board(),
+            "turn": 'white' if self.white_to_move else 'black',
+            "halfmove_clock": self.halfmove_clock,
+            "turns": self.turns,
+            "history": list(self.history),
+        }
+
+    def board(self):
+        """The board as a list of lists of strings, like game_state["board"]."""
+        names = [PIECE_NAMES[code] for code in self.cells]
+        return [names[row * 5:row * 5 + 5] for row in range(5)]
+
+    def to_bitboard(self, table=None):
+        """BitboardPosition for the search, with the same draw state."""
+        pieces = [0] * 10
+        for index, squares in enumerate(self.piece_lists):
+            for sq in squares:
+                pieces[index] |= 1 << sq
+        return BitboardPosition(pieces, WHITE if self.white_to_move else BLACK, table,
+                                self.halfmove_clock, self.turns, self.history)
+
+    def copy(self):
+        position = CompactPosition.__new__(CompactPosition)
+        position.cells = bytearray(self.cells)
+        position.white_to_move = self.white_to_move
+        position.piece_lists = [list(squares) for squares in self.piece_lists]
+        position.kings = list(self.kings)
+        position.key = self.key
+        position.halfmove_clock = self.halfmove_clock
+        position.turns = self.turns
+        position.history = list(self.history)
+        return position
+
+    def evaluate(self, table=MATERIAL_TABLE):
+        """Score with a piece-square table from evaluation.TABLES (White positive)."""
+        score = 0
+        for index, squares in enumerate(self.piece_lists):
+            values = table[index]
+            for sq in squares:
+                score += values[sq]
+        return score
+
+    def generate_moves(self):
+        """Moves as ((row, col), (row, col)), in the same order as MiniChess.valid_moves."""
+        moves = []
+        cells = self.cells
+        us = WHITE if self.white_to_move else BLACK
+        # Codes of our pieces are us * 5 + 1 .. us * 5 + 5
+        low, high = us * 5 + 1, us * 5 + 5
+        forward = -5 if us == WHITE else 5
+        for sq in range(25):
+            code = cells[sq]
+            if not low <= code <= high:
+                continue
+            piece_type = code - low
+            start = SQUARE_COORDS[sq]
+            if piece_type == PAWN:
+                target = sq + forward
+                if 0 <= target < 25:
+                    if not cells[target]:
+                        moves.append((start, SQUARE_COORDS[target]))
+                    col = sq % 5
+                    for capture, ok in ((target - 1, col > 0), (target + 1, col < 4)):
+                        if ok and cells[capture] and not low <= cells[capture] <= high:
+                            moves.append((start, SQUARE_COORDS[capture]))
+            elif piece_type == KNIGHT or piece_type == KING:
+                for target in (KNIGHT_TARGETS if piece_type == KNIGHT else KING_TARGETS)[sq]:
+                    if not low <= cells[target] <= high:
+                        moves.append((start, SQUARE_COORDS[target]))
+            else:
+                for ray in (QUEEN_LINES if piece_type == QUEEN else BISHOP_LINES)[sq]:
+                    for target in ray:
+                        occupant = cells[target]
+                        if not occupant:
+                            moves.append((start, SQUARE_COORDS[target]))
+                            continue
+                        if not low <= occupant <= high:
+                            moves.append((start, SQUARE_COORDS[target]))
+                        break
+        return moves
+
+    def make_move(self, move):
+        """
+        Return (new_position, game_over, winner) like MiniChess.make_move.
+        Capturing a King ends the game and leaves the board untouched.
+        """
+        (start_row, start_col), (end_row, end_col) = move
+        start = start_row * 5 + start_col
+        end = end_row * 5 + end_col
+        new_position = self.copy()
+        cells = new_position.cells
+        code = cells[start]
+        captured = cells[end]
+
+        # Check for win condition (king captured)
+        if captured and (captured - 1) % 5 == KING:
+            return new_position, True, 'White' if self.white_to_move else 'Black'
+
+        piece_lists = new_position.piece_lists
+        key = self.key ^ ZOBRIST_BLACK_TO_MOVE
+        if captured:
+            piece_lists[captured - 1].remove(end)
+            key ^= ZOBRIST_PIECES[captured - 1][end]
+        piece_lists[code - 1].remove(start)
+        key ^= ZOBRIST_PIECES[code - 1][start]
+        # Pawn promotion
+        if (code - 1) % 5 == PAWN and end_row == (0 if self.white_to_move else 4):
+            code += QUEEN - PAWN
+        piece_lists[code - 1].append(end)
+        key ^= ZOBRIST_PIECES[code - 1][end]
+        if (code - 1) % 5 == KING:
+            new_position.kings[(code - 1) // 5] = end
+        cells[start] = EMPTY
+        cells[end] = code
+        new_position.white_to_move = not self.white_to_move
+        new_position.key = key
+
+        new_position.turns += 1
+        if captured:
+            new_position.halfmove_clock = 0
+            new_position.history = []
+        else:
+            new_position.halfmove_clock += 1
+            new_position.history.append(self.key)
+        return new_position, False, None
+
+
+def to_game_state(state):
+    """Adapter for code written against the dict: a CompactPosition as a game_state dict, a dict unchanged."""
+    return state.to_game_state() if isinstance(state, CompactPosition) else state
@@ -0,0 +1,249 @@
+"""
+Persistent engine process speaking a line protocol on stdin/stdout (UCI-style).
+
+One MiniChess engine lives for the whole process, so its transposition table,
+move ordering history and tablebases stay warm from move to move and from game
+to game. A harness starts the process once and drives many games through it:
+
+    newgame                               start position; the caches are kept
+    position startpos [moves B2B3 C4C3 ...]
+    position board <25 squares> white|black [moves ...]
+                                          squares row by row from A5 (wp, bK, ...), '.' for empty
+    go [time S] [depth D] [nodes N] [infinite]
+                                          search in the background; prints info lines
+                                          and "bestmove B2B3" (or "bestmove none")
+    stop                                  end the search now and print its bestmove
+    setoption <name> <value>              any game parameter (see game_io.py)
+    isready                               answers "readyok" (at once, even during a search)
+    display                               print the board
+    quit
+
+Moves are written without the space of the console format ("B2B3" for
+"B2 B3"). Scores are from White's point of view, as everywhere else. go
+without limits uses the time_limit parameter. Changing an option that affects
+scores (analysis_cache.SCORE_PARAMETERS) clears the transposition table; any
+other option keeps it. newgame, position, go and setoption are refused with an
+error while a search runs: send stop first, or wait for its bestmove.
+The info line describes the last completed iteration; its pv starts with the
+move played, which may come from a deeper iteration that was cut short.
+
+python engine_protocol.py -o heuristic=e1 -o hash_size=64
+"""
+
+import sys
+import time
+import argparse
+import threading
+
+from game_io import default_game_parameters, parse_parameter
+from time_manager import TimeManager
+from compact_position import PIECE_NAMES
+from analysis_cache import search_variant
+
+# Commands refused while a search is running, since they change what it searches
+SEARCH_STATE_COMMANDS = ("newgame", "position", "go", "setoption")
+
+
+def move_token(move_str):
+    """'B2 B3' -> 'B2B3'."""
+    return move_str.replace(" ", "")
+
+
+def token_move_string(token):
+    """'b2b3' -> 'B2 B3'."""
+    token = token.upper()
+    return f"{token[:2]} {token[2:]}"
+
+
+class EngineProtocol:
+    """Command loop around one long-lived MiniChess engine."""
+
+    def __init__(self, game_parameters, output=sys.stdout):
+        from MiniChessSkeletonCode import MiniChess
+        self.MiniChess = MiniChess
+        # The protocol owns the clock: no pondering and a single search process
+        self.game_parameters = dict(game_parameters, ponder=False, workers=1, stats_file="")
+        self.engine = MiniChess(self.game_parameters)
+        self.game_state = self.engine.init_board()
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.search_thread = None
+        self.timer = None
+
+    def send(self, line):
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def handle(self, line):
+        """Run one command line; returns False on quit."""
+        words = line.split()
+        if not words:
+            return True
+        command, arguments = words[0], words[1:]
+        if command == "quit":
+            self.stop()
+            return False
+        if command == "stop":
+            self.stop()
+            return True
+        if command == "isready":
+            self.send("readyok")
+            return True
+        if command in SEARCH_STATE_COMMANDS and self.searching():
+            self.send(f"error {command} while searching, send stop first")
+            return True
+        try:
+            if command == "newgame":
+                self.game_state = self.engine.init_board()
+            elif command == "position":
+                self.set_position(arguments)
+            elif command == "go":
+                self.go(arguments)
+            elif command == "setoption":
+                self.set_option(arguments)
+            elif command in ("display", "d"):
+                self.send(self.engine.get_board_string(self.game_state["board"]))
+                self.send(f"turn {self.game_state['turn']}")
+            else:
+                self.send(f"error unknown command {command!r}")
+        except ValueError as error:
+            self.send(f"error {error}")
+        return True
+
+    def set_position(self, arguments):
+        if arguments[:1] == ["startpos"]:
+            game_state = self.engine.init_board()
+            rest = arguments[1:]
+        elif arguments[:1] == ["board"] and len(arguments) >= 27:
+            squares = arguments[1:26]
+            unknown = [square for square in squares if square not in PIECE_NAMES]
+            if unknown:
+                raise ValueError(f"Unknown piece {unknown[0]!r}")
+            if arguments[26] not in ("white", "black"):
+                raise ValueError(f"Expected white or black, got {arguments[26]!r}")
+            game_state = self.engine.init_board()
+            game_state["board"] = [squares[row * 5:row * 5 + 5] for row in range(5)]
+            game_state["turn"] = arguments[26]
+            rest = arguments[27:]
+        else:
+            raise ValueError("Expected position startpos|board <25 squares> <turn> [moves ...]")
+
+        if rest and rest[0] == "moves":
+            for token in rest[1:]:
+                move = self.engine.parse_input(token_move_string(token))
+                if move is None or move not in self.engine.valid_moves(game_state):
+                    raise ValueError(f"Illegal move {token!r}")
+                game_state, game_over, _ = self.engine.make_move(game_state, move)
+                if game_over:
+                    raise ValueError(f"The game is over after {token!r}")
+        self.game_state = game_state
+
+    def set_option(self, arguments):
+        if len(arguments) != 2:
+            raise ValueError("Expected setoption <name> <value>")
+        name, value = arguments
+        parameters = dict(self.game_parameters)
+        parameters[name] = parse_parameter(parameters, name, value)
+        # A new engine for the new settings, keeping the caches that are still valid
+        old = self.engine
+        engine = self.MiniChess(parameters)
+        if parameters["hash_size"] == self.game_parameters["hash_size"]:
+            engine.transposition_table = old.transposition_table
+            if search_variant(parameters) != search_variant(self.game_parameters) and engine.transposition_table is not None:
+                engine.transposition_table.clear()
+        if parameters["move_ordering"] and old.move_orderer is not None:
+            engine.move_orderer = old.move_orderer
+        if parameters["tablebase_dir"] == self.game_parameters["tablebase_dir"]:
+            engine.tablebases = old.tablebases
+        old.close()
+        self.engine = engine
+        self.game_parameters = parameters
+
+    def go(self, arguments):
+        limits = {"time": None, "depth": None, "nodes": 0}
+        infinite = False
+        words = iter(arguments)
+        for word in words:
+            if word == "infinite":
+                infinite = True
+            elif word in limits:
+                value = next(words, None)
+                if value is None:
+                    raise ValueError(f"Missing value after {word!r}")
+                limits[word] = float(value) if word == "time" else int(value)
+            else:
+                raise ValueError(f"Unknown go argument {word!r}")
+
+        if infinite or (limits["time"] is None and (limits["depth"] or limits["nodes"])):
+            time_limit = float('inf')
+        else:
+            time_limit = limits["time"] if limits["time"] is not None else self.game_parameters["time_limit"]
+        start_time = time.time()
+        self.timer = TimeManager(time_limit, start_time, node_limit=limits["nodes"])
+        self.search_thread = threading.Thread(target=self.search, daemon=True,
+                                              args=(self.game_state, start_time, time_limit, limits["depth"], self.timer))
+        self.search_thread.start()
+
+    def search(self, game_state, start_time, time_limit, depth_limit, timer):
+        """Runs in the search thread: always ends with a bestmove line, even if the search fails."""
+        bestmove = "none"
+        try:
+            bestmove = self.report_search(game_state, start_time, time_limit, depth_limit, timer)
+        except Exception as error:
+            self.send(f"error search failed: {error!r}")
+        finally:
+            self.send(f"bestmove {bestmove}")
+
+    def report_search(self, game_state, start_time, time_limit, depth_limit, timer):
+        """Search, print the info lines and return the bestmove token."""
+        engine = self.engine
+        engine.principal_variation = []
+        completed = engine.search_position(game_state, start_time, time_limit, depth_limit=depth_limit, timer=timer)
+        seconds = time.time() - start_time
+        nodes = timer.nodes
+        finished = [iteration for iteration in completed if iteration[0] <= engine.completed_depth]
+        for depth, score, _ in finished[:-1]:
+            self.send(f"info depth {depth} score {score}")
+        if not completed or completed[-1][2] is None:
+            return "none"
+        move = completed[-1][2]
+        depth, score, _ = finished[-1] if finished else completed[-1]
+        line = engine.principal_variation if engine.principal_variation[:1] == [move] else [move]
+        pv = " ".join(move_token(engine.move_to_string(pv_move)) for pv_move in line)
+        self.send(f"info depth {depth} score {score} nodes {nodes} time {seconds:.3f} "
+                  f"nps {nodes / seconds if seconds else 0:.0f} pv {pv}")
+        return move_token(engine.move_to_string(move))
+
+    def searching(self):
+        return self.search_thread is not None and self.search_thread.is_alive()
+
+    def wait(self):
+        if self.search_thread is not None:
+            self.search_thread.join()
+            self.search_thread = None
+
+    def stop(self):
+        if self.search_thread is not None:
+            self.timer.stop()
+            self.wait()
+
+    def run(self, lines=sys.stdin):
+        for line in lines:
+            if not self.handle(line):
+                break
+        self.stop()
+        self.engine.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mini Chess engine with a line protocol on stdin/stdout")
+    parser.add_argument("-o", "--option", action="append", default=[],
+                        help="Game parameter as key=value (see game_io.py), may be repeated")
+    args = parser.parse_args()
+
+    parameters = default_game_parameters(play_mode="AI-AI")
+    for option in args.option:
+        key, _, value = option.partition("=")
+        parameters[key] = parse_parameter(parameters, key, value)
+    EngineProtocol(parameters).run()
@@ -0,0 +1,66 @@
+"""
+Piece-square tables for the e0, e1 and e2 heuristics.
+
+Every heuristic is a sum of independent per-piece, per-square terms, so each
+one is stored as a table TABLES[name][piece_index][square] with White's terms
+positive and Black's negative (piece_index is colour * 5 + piece type, as in
+bitboard.py). A position can then keep its evaluation up to date with a few
+lookups per move instead of rescanning the board at every leaf.
+"""
+
+from bitboard import PAWN, KNIGHT, BISHOP, QUEEN, KING, PIECE_VALUES, PIECE_LETTERS, COLOR_LETTERS, SQUARE_COORDS, MATERIAL_TABLE
+
+# e1 positional weight map (encourages central control)
+E1_POSITION_WEIGHTS = [
+    [3, 4, 5, 4, 3],
+    [4, 6, 8, 6, 4],
+    [5, 8, 10, 8, 5],
+    [4, 6, 8, 6, 4],
+    [3, 4, 5, 4, 3]
+]
+
+
+def _build_table(positional):
+    """Material plus positional(color, piece_type, row, col), signed for White/Black."""
+    table = []
+    for color in range(2):
+        owner = 1 if color == 0 else -1
+        for piece_type in range(5):
+            table.append([owner * (PIECE_VALUES[piece_type] + positional(color, piece_type, row, col))
+                          for row, col in SQUARE_COORDS])
+    return table
+
+
+def _e1_positional(color, piece_type, row, col):
+    return E1_POSITION_WEIGHTS[row][col]
+
+
+def _e2_positional(color, piece_type, row, col):
+    if piece_type == KING:  # King prefers edges
+        return 1 if row in [0, 4] or col in [0, 4] else -1
+    if piece_type == PAWN:  # Pawns prefer advancing but avoid last row
+        return row if color == 0 else 4 - row
+    if piece_type in [KNIGHT, BISHOP]:  # Knights/Bishops prefer the center
+        return 2 - abs(2 - row) - abs(2 - col)
+    if piece_type == QUEEN:  # Queen prefers mobility
+        return 5 - abs(2 - row) - abs(2 - col)
+    return 0
+
+
+TABLES = {
+    "e0": MATERIAL_TABLE,
+    "e1": _build_table(_e1_positional),
+    "e2": _build_table(_e2_positional),
+}
+
+
+def evaluate_board(board, heuristic="e0"):
+    """Evaluate a list-of-strings board with one pass over the squares."""
+    table = TABLES[heuristic]
+    score = 0
+    for row in range(5):
+        for col in range(5):
+            piece = board[row][col]
+            if piece != '.':
+                score += table[COLOR_LETTERS.index(piece[0]) * 5 + PIECE_LETTERS.index(piece[1])][row * 5 + col]
+    return score
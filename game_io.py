@@ -1,8 +1,73 @@
 import argparse
 import os
 import sys
+import time
+import itertools
 from io import StringIO
 
+def parse_bool(value):
+    """argparse type for True/False flags (bool('False') would be True)."""
+    if value.lower() in ("true", "1", "yes"):
+        return True
+    if value.lower() in ("false", "0", "no"):
+        return False
+    raise argparse.ArgumentTypeError(f"Expected True or False, got {value!r}")
+
+def default_game_parameters(**overrides):
+    """Game parameters with the command-line defaults, for running the engine without argparse."""
+    parameters = {
+        "time_limit": 5,
+        "max_turns": 100,
+        "alpha_beta": True,
+        "play_mode": "AI-AI",
+        "heuristic": "e0",
+        "hash_size": 16,
+        "move_ordering": True,
+        "batch_eval": False,
+        "workers": 1,
+        "tablebase_dir": "tablebases",
+        "node_limit": 0,
+        "trace_format": "text",
+        "snapshot_interval": 10,
+        "instrument": True,
+        "profile": "off",
+        "stats_file": "",
+        "ponder": True,
+        "quiescence": True,
+        "quiescence_budget": 256,
+        "delta_margin": 2,
+        "search": "minimax",
+        "aspiration_window": 3,
+        "null_move": False,
+        "null_move_reduction": 2,
+        "lmr": False,
+        "lmr_moves": 3,
+        "lmr_min_depth": 3,
+        "futility": False,
+        "futility_margin": 3,
+        "staged_moves": True,
+        "analysis_cache": "",
+        "analysis_cache_mb": 64,
+        "cache_depth": 8,
+        "book": "opening_book.mcb",
+        "initial_board": [],
+    }
+    parameters.update(overrides)
+    return parameters
+
+def parse_parameter(parameters, key, value):
+    """Convert the string value of a "key=value" setting to the type of the game parameter's current value."""
+    if key not in parameters:
+        raise ValueError(f"Unknown game parameter {key!r}")
+    default = parameters[key]
+    if isinstance(default, bool):
+        return parse_bool(value)
+    if key == "time_limit":
+        return float(value)
+    if isinstance(default, int):
+        return int(value)
+    return value
+
 def get_game_parameters():
     parser = argparse.ArgumentParser(description="Mini Chess Game Description")
     parser.add_argument("-t", "--time", type=int, required=True, help="Maximum time allowed per move (in seconds)")
@@ -12,6 +77,64 @@ def get_game_parameters():
                         help='Play mode: "H-H" (Human vs. Human), "H-AI" (Human vs. AI), etc.')
     parser.add_argument("-e", "--heuristic", type=str, choices=["e0", "e1", "e2"], required=False, default="e0",
                         help="Heuristic function to use: e0, e1, or e2")
+    parser.add_argument("-s", "--hash_size", type=int, required=False, default=16,
+                        help="Transposition table size in MB (0 disables it)")
+    parser.add_argument("-o", "--move_ordering", type=parse_bool, required=False, default=True,
+                        help="Order moves (hash move, MVV-LVA, killers, history)? (True/False)")
+    parser.add_argument("-b", "--batch_eval", type=parse_bool, required=False, default=False,
+                        help="Score frontier nodes with vectorized NumPy evaluation? (True/False)")
+    parser.add_argument("-w", "--workers", "--threads", type=int, required=False, default=1,
+                        help="Number of processes for the parallel root search (1 searches in this process)")
+    parser.add_argument("--tablebases", type=str, required=False, default="tablebases",
+                        help="Directory of endgame tablebases built with tablebase.py")
+    parser.add_argument("-n", "--node_limit", type=int, required=False, default=0,
+                        help="Maximum nodes searched per move (0 for no limit)")
+    parser.add_argument("--trace_format", type=str, choices=["text", "binary"], required=False, default="text",
+                        help="Game trace written at the end of the game (text) or streamed move by move (binary)")
+    parser.add_argument("--snapshot_interval", type=int, required=False, default=10,
+                        help="Moves between board snapshots in binary traces (0 for none)")
+    parser.add_argument("--instrument", type=parse_bool, required=False, default=True,
+                        help="Collect per-depth search statistics? (True/False)")
+    parser.add_argument("--profile", type=str, choices=["off", "cprofile", "sampling"], required=False, default="off",
+                        help="Profile every AI move with cProfile or a sampling profiler")
+    parser.add_argument("--stats_file", type=str, required=False, default="",
+                        help="Append a JSON line of search statistics per AI move to this file")
+    parser.add_argument("--ponder", type=parse_bool, required=False, default=True,
+                        help="Search on the human's time in H-AI and AI-H games? (True/False)")
+    parser.add_argument("-q", "--quiescence", type=parse_bool, required=False, default=True,
+                        help="Extend leaves through captures and promotions? (True/False)")
+    parser.add_argument("--quiescence_budget", type=int, required=False, default=256,
+                        help="Maximum quiescence nodes below one leaf (0 for no limit)")
+    parser.add_argument("--delta_margin", type=int, required=False, default=2,
+                        help="Delta pruning margin of the quiescence search, in heuristic points")
+    parser.add_argument("--search", type=str, choices=["minimax", "pvs"], required=False, default="minimax",
+                        help="Search algorithm: minimax with alpha-beta, or negamax principal variation search (needs alpha-beta)")
+    parser.add_argument("--aspiration_window", type=int, required=False, default=3,
+                        help="Half-width of the PVS aspiration window around the previous score (0 for full windows)")
+    parser.add_argument("--null_move", type=parse_bool, required=False, default=False,
+                        help="Null-move pruning (not in King-and-pawn endings)? (True/False)")
+    parser.add_argument("--null_move_reduction", type=int, required=False, default=2,
+                        help="Depth reduction R of the null-move search")
+    parser.add_argument("--lmr", type=parse_bool, required=False, default=False,
+                        help="Late move reductions for quiet moves ordered late? (True/False)")
+    parser.add_argument("--lmr_moves", type=int, required=False, default=3,
+                        help="Moves searched at full depth before late move reductions start")
+    parser.add_argument("--lmr_min_depth", type=int, required=False, default=3,
+                        help="Minimum remaining depth for late move reductions")
+    parser.add_argument("--futility", type=parse_bool, required=False, default=False,
+                        help="Futility pruning of quiet moves one and two plies above the leaves? (True/False)")
+    parser.add_argument("--futility_margin", type=int, required=False, default=3,
+                        help="Futility margin per remaining ply, in heuristic points")
+    parser.add_argument("--staged_moves", type=parse_bool, required=False, default=True,
+                        help="Generate moves in stages (captures first, quiet moves only if needed)? (True/False)")
+    parser.add_argument("--analysis_cache", type=str, required=False, default="",
+                        help="File of the analysis cache shared by engine processes (empty for none)")
+    parser.add_argument("--analysis_cache_mb", type=int, required=False, default=64,
+                        help="Size of a new analysis cache file in MB")
+    parser.add_argument("--cache_depth", type=int, required=False, default=8,
+                        help="Minimum depth of a cached result that is played without searching")
+    parser.add_argument("--book", type=str, required=False, default="opening_book.mcb",
+                        help="Opening book built with opening_book.py (used if the file exists, empty for none)")
 
     args = parser.parse_args()
 
@@ -26,14 +149,52 @@ def get_game_parameters():
         "alpha_beta": args.alpha_beta,
         "play_mode": args.play_mode,
         "heuristic": args.heuristic,
+        "hash_size": args.hash_size,
+        "move_ordering": args.move_ordering,
+        "batch_eval": args.batch_eval,
+        "workers": args.workers,
+        "tablebase_dir": args.tablebases,
+        "node_limit": args.node_limit,
+        "trace_format": args.trace_format,
+        "snapshot_interval": args.snapshot_interval,
+        "instrument": args.instrument,
+        "profile": args.profile,
+        "stats_file": args.stats_file,
+        "ponder": args.ponder,
+        "quiescence": args.quiescence,
+        "quiescence_budget": args.quiescence_budget,
+        "delta_margin": args.delta_margin,
+        "search": args.search,
+        "aspiration_window": args.aspiration_window,
+        "null_move": args.null_move,
+        "null_move_reduction": args.null_move_reduction,
+        "lmr": args.lmr,
+        "lmr_moves": args.lmr_moves,
+        "lmr_min_depth": args.lmr_min_depth,
+        "futility": args.futility,
+        "futility_margin": args.futility_margin,
+        "staged_moves": args.staged_moves,
+        "analysis_cache": args.analysis_cache,
+        "analysis_cache_mb": args.analysis_cache_mb,
+        "cache_depth": args.cache_depth,
+        "book": args.book,
         "initial_board": [],
     }
 
-def save_game_trace(game_parameters, moves_log, winner, initial_board=None, board_snapshots=None, ai_statistics=None):
-    output_folder = "game_traces"
-    os.makedirs(output_folder, exist_ok=True)
+# Traces written by this process, numbered so that several games per second get different names
+_trace_numbers = itertools.count(1)
+
+def trace_filename(game_parameters, folder="game_traces", extension=".mct"):
+    """Unique trace file name: the usual parameters plus the start time, process id and a game number."""
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return (f"{folder}/gameTrace-{game_parameters['alpha_beta']}-{game_parameters['time_limit']}-"
+            f"{game_parameters['max_turns']}-{stamp}-{os.getpid()}-{next(_trace_numbers)}{extension}")
 
-    filename = f"{output_folder}/gameTrace-{game_parameters['alpha_beta']}-{game_parameters['time_limit']}-{game_parameters['max_turns']}.txt"
+def save_game_trace(game_parameters, moves_log, winner, initial_board=None, board_snapshots=None, ai_statistics=None, filename=None):
+    if filename is None:
+        output_folder = "game_traces"
+        os.makedirs(output_folder, exist_ok=True)
+        filename = trace_filename(game_parameters, output_folder, ".txt")
 
     try:
         with open(filename, "w") as f:
@@ -0,0 +1,206 @@
+"""
+Streaming binary game traces.
+
+A TraceWriter appends one small record per move to the trace file as the game
+is played and flushes it, so memory use does not grow with max_turns and a
+crash keeps every move played so far. The file layout is
+
+    header    b"MCGT", version (B), snapshot interval (H), parameters JSON length (H),
+              parameters JSON, initial board (25 bytes)
+    move      tag 0, turn (I), flags (B), packed move (H), search score (i),
+              heuristic score (i), seconds (f), nodes (I)
+    snapshot  tag 1, turn (I), board (25 bytes), written every `snapshot_interval` moves
+    result    tag 2, turns (I), winner length (H), winner (UTF-8)
+
+Moves are packed as in bitboard.py (start | end << 5) and boards are stored as
+one byte per square: 0 for empty, colour * 5 + piece type + 1 otherwise.
+Flag bit 0 is set for a Black move and bit 1 when the move has search
+statistics.
+
+File names include the start time, process id and a game number, so parallel games never
+overwrite each other. convert_to_text writes the same text trace as
+save_game_trace:
+
+python game_trace.py game_traces/gameTrace-True-5-100-20261018-101500-1234-1.mct
+"""
+
+import os
+import json
+import struct
+import argparse
+
+from bitboard import COLOR_LETTERS, PIECE_LETTERS, encode_move, decode_move
+from game_io import save_game_trace, trace_filename
+
+TRACE_MAGIC = b"MCGT"
+TRACE_VERSION = 1
+HEADER_FORMAT = struct.Struct("<4sBHH")
+MOVE_RECORD = struct.Struct("<BIBHiifI")
+SNAPSHOT_RECORD = struct.Struct("<BI25s")
+RESULT_RECORD = struct.Struct("<BIH")
+MOVE_TAG, SNAPSHOT_TAG, RESULT_TAG = 0, 1, 2
+BLACK_FLAG, STATS_FLAG = 1, 2
+
+# Game parameters written to the header (the ones shown in the text trace)
+TRACE_PARAMETERS = ("time_limit", "max_turns", "alpha_beta", "play_mode", "heuristic")
+
+
+def encode_board(board):
+    """List-of-strings board -> 25 bytes."""
+    return bytes(0 if piece == '.' else COLOR_LETTERS.index(piece[0]) * 5 + PIECE_LETTERS.index(piece[1]) + 1
+                 for row in board for piece in row)
+
+
+def decode_board(data):
+    """25 bytes -> list-of-strings board."""
+    pieces = ['.' if code == 0 else COLOR_LETTERS[(code - 1) // 5] + PIECE_LETTERS[(code - 1) % 5] for code in data]
+    return [pieces[row * 5:row * 5 + 5] for row in range(5)]
+
+
+class TraceWriter:
+    """Appends the moves of one game to a binary trace file as they are played."""
+
+    def __init__(self, game_parameters, initial_board, snapshot_interval=10, folder="game_traces", filename=None):
+        os.makedirs(folder, exist_ok=True)
+        self.filename = filename or trace_filename(game_parameters, folder)
+        self.snapshot_interval = snapshot_interval
+        self.turns = 0
+        self.file = open(self.filename, "xb")
+        parameters = json.dumps({name: game_parameters.get(name) for name in TRACE_PARAMETERS}).encode()
+        self.file.write(HEADER_FORMAT.pack(TRACE_MAGIC, TRACE_VERSION, snapshot_interval, len(parameters)))
+        self.file.write(parameters)
+        self.file.write(encode_board(initial_board))
+        self.file.flush()
+
+    def record_move(self, turn, player, move, board=None, ai_stats=None):
+        """
+        Append a move ((start, end) coordinates) played by "white" or "black".
+        `board` is the board after the move, used for the periodic snapshots.
+        """
+        flags = BLACK_FLAG if player == "black" else 0
+        score = heuristic_score = nodes = 0
+        seconds = 0.0
+        if ai_stats:
+            flags |= STATS_FLAG
+            score = ai_stats["score"] or 0
+            heuristic_score = ai_stats["heuristic_score"]
+            seconds = ai_stats["time"]
+            nodes = ai_stats.get("nodes", 0)
+        self.file.write(MOVE_RECORD.pack(MOVE_TAG, turn, flags, encode_move(*move), score, heuristic_score, seconds, nodes))
+        self.turns = turn
+        if board is not None and self.snapshot_interval and turn % self.snapshot_interval == 0:
+            self.file.write(SNAPSHOT_RECORD.pack(SNAPSHOT_TAG, turn, encode_board(board)))
+        self.file.flush()
+
+    def finish(self, winner):
+        """Write the result and close the file."""
+        encoded = winner.encode()
+        self.file.write(RESULT_RECORD.pack(RESULT_TAG, self.turns, len(encoded)) + encoded)
+        self.file.close()
+
+
+def read_trace(filename):
+    """
+    Read a binary trace. Returns a dict with the parameters, initial board, moves
+    (dicts with turn, player, start, end and, if present, score, heuristic_score,
+    time and nodes), snapshots ({turn: board}) and the winner (None if the game
+    did not finish).
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+    magic, version, snapshot_interval, length = HEADER_FORMAT.unpack_from(data)
+    if magic != TRACE_MAGIC or version != TRACE_VERSION:
+        raise ValueError(f"{filename} is not a version {TRACE_VERSION} game trace")
+    offset = HEADER_FORMAT.size
+    parameters = json.loads(data[offset:offset + length])
+    offset += length
+    trace = {
+        "parameters": parameters,
+        "snapshot_interval": snapshot_interval,
+        "initial_board": decode_board(data[offset:offset + 25]),
+        "moves": [],
+        "snapshots": {},
+        "winner": None,
+        "turns": 0,
+    }
+    offset += 25
+
+    while offset < len(data):
+        tag = data[offset]
+        if tag == MOVE_TAG and offset + MOVE_RECORD.size <= len(data):
+            _, turn, flags, move, score, heuristic_score, seconds, nodes = MOVE_RECORD.unpack_from(data, offset)
+            start, end = decode_move(move)
+            entry = {"turn": turn, "player": "black" if flags & BLACK_FLAG else "white", "start": start, "end": end}
+            if flags & STATS_FLAG:
+                entry.update(score=score, heuristic_score=heuristic_score, time=seconds, nodes=nodes)
+            trace["moves"].append(entry)
+            trace["turns"] = turn
+            offset += MOVE_RECORD.size
+        elif tag == SNAPSHOT_TAG and offset + SNAPSHOT_RECORD.size <= len(data):
+            _, turn, board = SNAPSHOT_RECORD.unpack_from(data, offset)
+            trace["snapshots"][turn] = decode_board(board)
+            offset += SNAPSHOT_RECORD.size
+        elif tag == RESULT_TAG and offset + RESULT_RECORD.size <= len(data):
+            _, turns, length = RESULT_RECORD.unpack_from(data, offset)
+            offset += RESULT_RECORD.size
+            trace["winner"] = data[offset:offset + length].decode()
+            trace["turns"] = turns
+            offset += length
+        else:  # Truncated record at the end of a crashed game
+            break
+    return trace
+
+
+def square_name(coord):
+    row, col = coord
+    return f"{chr(col + ord('A'))}{5 - row}"
+
+
+def board_text(board):
+    """Same layout as MiniChess.get_board_string."""
+    return "\n".join(" ".join(piece.rjust(3) for piece in row) for row in board)
+
+
+def convert_to_text(filename, text_filename=None):
+    """Write a binary trace in the text format of save_game_trace; returns the text file name."""
+    trace = read_trace(filename)
+    board = [row.copy() for row in trace["initial_board"]]
+    moves_log = []
+    board_snapshots = [f"Turn 0 (White):\n{board_text(board)}\n"]
+
+    for entry in trace["moves"]:
+        player = entry["player"].capitalize()
+        move_str = f"{square_name(entry['start'])} {square_name(entry['end'])}"
+        move_log = f"Turn {entry['turn']} ({player}): move from {move_str}"
+        if "score" in entry:
+            move_log += f" | time for this action: {entry['time']:.3f} sec"
+            move_log += f" | heuristic score: {entry['heuristic_score']}"
+            move_log += f" | alpha-beta search score: {entry['score']}"
+        moves_log.append(move_log)
+
+        # A King capture ends the game before the board changes (as in execute_move)
+        (start_row, start_col), (end_row, end_col) = entry["start"], entry["end"]
+        if board[end_row][end_col] in ["bK", "wK"]:
+            continue
+        piece = board[start_row][start_col]
+        if (piece == "wp" and end_row == 0) or (piece == "bp" and end_row == 4):
+            piece = piece[0] + "Q"
+        board[start_row][start_col] = '.'
+        board[end_row][end_col] = piece
+        board_snapshots.append(f"Turn {entry['turn']} ({player}):\n{board_text(board)}\n")
+
+    if text_filename is None:
+        text_filename = os.path.splitext(filename)[0] + ".txt"
+    winner = trace["winner"] if trace["winner"] is not None else "Unfinished"
+    save_game_trace(trace["parameters"], moves_log, winner, trace["initial_board"], board_snapshots, filename=text_filename)
+    return text_filename
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert binary Mini Chess game traces to the text format")
+    parser.add_argument("traces", nargs="+", help="Binary trace files (.mct)")
+    parser.add_argument("-o", "--output", type=str, default=None, help="Text file name (only with a single trace)")
+    args = parser.parse_args()
+
+    for trace_file in args.traces:
+        convert_to_text(trace_file, args.output if len(args.traces) == 1 else None)
@@ -0,0 +1,191 @@
+"""
+Search instrumentation: per-depth counters, per-iteration timings, profilers
+and a JSON report per move.
+
+With the "instrument" game parameter set to False the engine keeps no
+SearchStats at all and minimax only pays for a `stats is not None` test per
+node. Otherwise SearchStats counts, for every depth:
+
+    nodes               nodes visited (the states_by_depth of play)
+    expanded            nodes whose moves were searched
+    cutoffs             expanded nodes that failed high (beta cutoff)
+    first_move_cutoffs  cutoffs caused by the first move searched
+
+cutoffs / expanded is the cutoff rate and first_move_cutoffs / cutoffs tells
+how good the move ordering is (close to 1 is ideal). Every completed iteration
+of the iterative deepening is recorded with its depth, nodes and time.
+
+The "profile" game parameter wraps each get_ai_move call in cProfile
+("cprofile") or in a small sampling profiler ("sampling") that looks at the
+searching thread's stack every millisecond.
+"""
+
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+
+from time_manager import MAX_SEARCH_DEPTH
+
+
+class SearchStats:
+    """Counters of one search, filled in by MiniChess.minimax."""
+
+    def __init__(self):
+        self.new_search()
+
+    def new_search(self):
+        size = MAX_SEARCH_DEPTH + 2
+        self.nodes = [0] * size
+        self.expanded = [0] * size
+        self.cutoffs = [0] * size
+        self.first_move_cutoffs = [0] * size
+        self.iterations = []
+
+    def begin_iteration(self):
+        """The per-depth node counts describe the current iteration only, as states_by_depth always did."""
+        self.nodes = [0] * len(self.nodes)
+
+    def end_iteration(self, depth, nodes, seconds):
+        self.iterations.append({
+            "depth": depth,
+            "nodes": nodes,
+            "seconds": seconds,
+            "nodes_per_second": nodes / seconds if seconds else 0.0,
+        })
+
+    def cutoff(self, depth, move_number):
+        self.cutoffs[depth] += 1
+        if move_number == 0:
+            self.first_move_cutoffs[depth] += 1
+
+    def nodes_by_depth(self):
+        return {depth: count for depth, count in enumerate(self.nodes) if count}
+
+    def counters(self):
+        """Per-depth dicts and iterations, in a form that can be summed across worker processes."""
+        return {
+            "expanded_by_depth": {depth: count for depth, count in enumerate(self.expanded) if count},
+            "cutoffs_by_depth": {depth: count for depth, count in enumerate(self.cutoffs) if count},
+            "first_move_cutoffs_by_depth": {depth: count for depth, count in enumerate(self.first_move_cutoffs) if count},
+            "iterations": list(self.iterations),
+        }
+
+
+def cutoff_rates(counters):
+    """{depth: (cutoff rate, first-move cutoff ratio)} from search counters."""
+    rates = {}
+    for depth, expanded in sorted(counters.get("expanded_by_depth", {}).items()):
+        cutoffs = counters["cutoffs_by_depth"].get(depth, 0)
+        first = counters["first_move_cutoffs_by_depth"].get(depth, 0)
+        rates[depth] = (cutoffs / expanded if expanded else 0.0, first / cutoffs if cutoffs else 0.0)
+    return rates
+
+
+def move_report(move_str, stats):
+    """JSON-serialisable summary of one get_ai_move call."""
+    report = {"move": move_str}
+    for name, value in stats.items():
+        if name == "profile":
+            continue
+        if isinstance(value, dict):
+            value = {str(key): item for key, item in value.items()}
+        report[name] = value
+    return report
+
+
+def write_move_report(filename, move_str, stats):
+    """Append the move report as one line of JSON (JSON Lines)."""
+    with open(filename, "a") as f:
+        f.write(json.dumps(move_report(move_str, stats)) + "\n")
+
+
+class SamplingProfiler:
+    """Counts the functions on one thread's stack at a fixed interval."""
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.samples = 0
+        self.own = {}        # function -> samples where it was running
+        self.inclusive = {}  # function -> samples where it was on the stack
+        self._running = False
+        self._thread = None
+
+    def start(self, thread_id=None):
+        self._target = thread_id if thread_id is not None else threading.get_ident()
+        self._running = True
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._thread.join()
+
+    def _sample(self):
+        while self._running:
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self.samples += 1
+                seen = set()
+                top = True
+                while frame is not None:
+                    code = frame.f_code
+                    name = f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+                    if top:
+                        self.own[name] = self.own.get(name, 0) + 1
+                        top = False
+                    if name not in seen:
+                        self.inclusive[name] = self.inclusive.get(name, 0) + 1
+                        seen.add(name)
+                    frame = frame.f_back
+            time.sleep(self.interval)
+
+    def report(self, limit=15):
+        lines = [f"{self.samples} samples"]
+        for name, count in sorted(self.own.items(), key=lambda item: -item[1])[:limit]:
+            lines.append(f"{count / max(1, self.samples) * 100:5.1f}% own  "
+                         f"{self.inclusive.get(name, 0) / max(1, self.samples) * 100:5.1f}% total  {name}")
+        return "\n".join(lines)
+
+
+class MoveProfiler:
+    """Profiles every get_ai_move call of a game with cProfile or the sampling profiler."""
+
+    def __init__(self, mode):
+        if mode not in ("cprofile", "sampling"):
+            raise ValueError(f"Unknown profile mode {mode!r}")
+        self.mode = mode
+        self.profile = cProfile.Profile() if mode == "cprofile" else SamplingProfiler()
+
+    def call(self, function, *args):
+        """Run function(*args) under the profiler; the results add up over calls."""
+        if self.mode == "cprofile":
+            self.profile.enable()
+            try:
+                return function(*args)
+            finally:
+                self.profile.disable()
+        sampler = self.profile
+        sampler.start()
+        try:
+            return function(*args)
+        finally:
+            sampler.stop()
+
+    def report(self, limit=15):
+        if self.mode == "sampling":
+            return self.profile.report(limit)
+        from io import StringIO
+        output = StringIO()
+        pstats.Stats(self.profile, stream=output).sort_stats("cumulative").print_stats(limit)
+        return output.getvalue()
+
+    def dump(self, filename):
+        """Save cProfile results for pstats/snakeviz, or the sampling report as text."""
+        if self.mode == "cprofile":
+            self.profile.dump_stats(filename)
+        else:
+            with open(filename, "w") as f:
+                f.write(self.report(limit=100) + "\n")
@@ -0,0 +1,141 @@
+"""
+Move ordering for the alpha-beta search.
+
+Moves are tried in this order: the hash move (best move stored in the
+transposition table, usually the previous iteration's choice), captures by
+most valuable victim / least valuable attacker, the killer moves for the
+current ply, then quiet moves by their history score.
+
+staged_moves yields the same kind of order lazily, one stage at a time: King
+captures (which end the game), the hash move, the other captures, promotions,
+then quiet moves. A stage is only generated once the search has asked for
+every move of the previous ones, so a node that cuts off early never builds
+its quiet moves.
+"""
+
+from bitboard import PAWN, KNIGHT, BISHOP, QUEEN, KING
+
+HASH_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 29
+KILLER_SCORE = 1 << 28
+# History scores are halved once any of them passes this, so they stay below the killers
+HISTORY_LIMIT = 1 << 20
+
+# Ordering rank of each piece type as a victim or attacker (Knight and Bishop are both worth 3)
+_RANKS = {PAWN: 0, KNIGHT: 1, BISHOP: 1, QUEEN: 2, KING: 3}
+MVV_LVA = [[_RANKS[victim] * 10 + 4 - _RANKS[attacker] for attacker in range(5)] for victim in range(5)]
+
+
+class MoveOrderer:
+    """Killer and history tables plus the sort used by minimax."""
+
+    def __init__(self, killers_per_ply=2):
+        self.killers_per_ply = killers_per_ply
+        self.killers = []
+        # history[colour][move], indexed by the packed move from bitboard.py
+        self.history = [[0] * 1024, [0] * 1024]
+        # Moves of the nodes below the root whose quiet moves staged_moves generated (branching statistics)
+        self.generated_moves = 0
+        self.generated_nodes = 0
+
+    def reset_counts(self):
+        self.generated_moves = 0
+        self.generated_nodes = 0
+
+    def new_search(self):
+        """Forget killers and age the history table before a new search."""
+        self.killers = []
+        self.reset_counts()
+        for table in self.history:
+            for move in range(1024):
+                table[move] >>= 1
+
+    def order_moves(self, position, moves, ply, hash_move=None):
+        """Sort moves in place, best candidates first."""
+        us = position.turn
+        pieces = position.pieces
+        enemy = position.occupied[us ^ 1]
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history[us]
+        scores = {}
+        for move in moves:
+            if move == hash_move:
+                scores[move] = HASH_MOVE_SCORE
+            elif enemy >> (move >> 5) & 1:
+                scores[move] = CAPTURE_SCORE + MVV_LVA[_piece_type(pieces, us ^ 1, move >> 5)][_piece_type(pieces, us, move & 31)]
+            elif move in killers:
+                scores[move] = KILLER_SCORE - killers.index(move)
+            else:
+                scores[move] = history[move]
+        moves.sort(key=scores.__getitem__, reverse=True)
+
+    def staged_moves(self, position, ply, hash_move=None):
+        """Yield the moves of position stage by stage, best candidates first within each stage."""
+        us = position.turn
+        pieces = position.pieces
+        own = position.occupied[us]
+        enemy = position.occupied[us ^ 1]
+        king = pieces[(us ^ 1) * 5 + KING]
+
+        tactical = position.generate_captures()
+        for move in tactical:
+            if king >> (move >> 5) & 1:
+                yield move
+
+        # The table stores the full key, so the hash move belongs to this position; check it anyway
+        if (hash_move is not None and own >> (hash_move & 31) & 1 and not own >> (hash_move >> 5) & 1
+                and not king >> (hash_move >> 5) & 1):
+            yield hash_move
+        else:
+            hash_move = None
+
+        captures = []
+        promotions = []
+        for move in tactical:
+            if move == hash_move or king >> (move >> 5) & 1:
+                continue
+            if enemy >> (move >> 5) & 1:
+                captures.append((MVV_LVA[_piece_type(pieces, us ^ 1, move >> 5)][_piece_type(pieces, us, move & 31)], move))
+            else:
+                promotions.append(move)
+        captures.sort(reverse=True)
+        for _, move in captures:
+            yield move
+        for move in promotions:
+            yield move
+
+        quiets = position.generate_quiets()
+        # Every move of the node is known once the quiet moves are generated: count them for free
+        if ply > 0:
+            self.generated_moves += len(tactical) + len(quiets)
+            self.generated_nodes += 1
+        if hash_move is not None and hash_move in quiets:
+            quiets.remove(hash_move)
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history[us]
+        quiets.sort(key=lambda move: KILLER_SCORE - killers.index(move) if move in killers else history[move], reverse=True)
+        yield from quiets
+
+    def record_cutoff(self, color, move, ply, remaining_depth):
+        """Remember a quiet move that caused a beta cutoff."""
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.killers_per_ply:]
+
+        history = self.history[color]
+        history[move] += remaining_depth * remaining_depth
+        if history[move] > HISTORY_LIMIT:
+            for table in self.history:
+                for index in range(1024):
+                    table[index] >>= 1
+
+
+def _piece_type(pieces, color, sq):
+    bit = 1 << sq
+    for piece_type in range(5):
+        if pieces[color * 5 + piece_type] & bit:
+            return piece_type
+    return PAWN
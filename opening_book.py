@@ -0,0 +1,149 @@
+"""
+Opening book for the fixed init_board start position.
+
+build_book walks the opening tree from init_board: every root move of a
+position is searched to a fixed depth, the moves within `margin` of the best
+score become book moves (weighted by how close they are), and the `width` best
+of them are followed up to `plies` moves deep. The book is written as a
+compact binary file:
+
+    header   b"MCOB", version (B), search depth (B), heuristic (B), padding, number of entries (I)
+    entries  position key (Q), packed move (H), weight (H), score (i), sorted by key
+
+Keys and moves are those of bitboard.py, and scores are from White's point of
+view. An engine with the "book" game parameter set to an existing book plays
+from it without searching (weighted random choice between the book moves)
+until the game leaves the book.
+
+python opening_book.py build -p 6 -d 6 -w 2 -m 1 -o opening_book.mcb
+python opening_book.py show opening_book.mcb
+"""
+
+import time
+import random
+import struct
+import argparse
+from array import array
+from bisect import bisect_left, bisect_right
+
+from bitboard import BitboardPosition, WHITE, decode_move
+from game_io import default_game_parameters
+
+BOOK_MAGIC = b"MCOB"
+BOOK_VERSION = 1
+HEADER = struct.Struct("<4sBBBxI")
+ENTRY = struct.Struct("<QHHi")
+HEURISTICS = ("e0", "e1", "e2")
+DEFAULT_BOOK = "opening_book.mcb"
+
+
+class OpeningBook:
+    """Book moves by position key, read from a file written by write_book."""
+
+    def __init__(self, path, seed=None):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, self.depth, heuristic, count = HEADER.unpack_from(data)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            raise ValueError(f"{path} is not a version {BOOK_VERSION} opening book")
+        self.heuristic = HEURISTICS[heuristic]
+        self.keys = array('Q')
+        self.entries = []
+        for number in range(count):
+            key, move, weight, score = ENTRY.unpack_from(data, HEADER.size + number * ENTRY.size)
+            self.keys.append(key)
+            self.entries.append((move, weight, score))
+        self.rng = random.Random(seed)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def moves(self, key):
+        """[(move, weight, score)] stored for a position key."""
+        return self.entries[bisect_left(self.keys, key):bisect_right(self.keys, key)]
+
+    def choose(self, position):
+        """(score, move) picked at random in proportion to the weights, or None out of book."""
+        candidates = [entry for entry in self.moves(position.key) if entry[0] in position.generate_moves()]
+        if not candidates:
+            return None
+        move, _, score = self.rng.choices(candidates, weights=[weight for _, weight, _ in candidates])[0]
+        return score, move
+
+
+def write_book(path, book, depth, heuristic):
+    """book: {key: [(move, weight, score)]}."""
+    entries = sorted((key, move, weight, score) for key, moves in book.items() for move, weight, score in moves)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(BOOK_MAGIC, BOOK_VERSION, depth, HEURISTICS.index(heuristic), len(entries)))
+        for entry in entries:
+            f.write(ENTRY.pack(*entry))
+    return len(entries)
+
+
+def build_book(plies=6, depth=6, width=2, margin=1, game_parameters=None, verbose=True):
+    """Search the opening tree from init_board; returns {key: [(move, weight, score)]}."""
+    from MiniChessSkeletonCode import MiniChess
+    parameters = dict(game_parameters or default_game_parameters(), ponder=False, workers=1, book="", analysis_cache="")
+    engine = MiniChess(parameters)
+    book = {}
+
+    def expand(game_state, ply):
+        position = BitboardPosition.from_game_state(game_state)
+        if ply >= plies or position.key in book:
+            return
+        sign = 1 if position.turn == WHITE else -1
+        scored = []
+        for move in position.generate_moves():
+            if position.captures_king(move):
+                scored = [(1000 * sign, move)]
+                break
+            completed = engine.search_position(game_state, time.time(), float('inf'), root_moves=[move], depth_limit=depth)
+            scored.append((completed[-1][1], move))
+        if not scored:
+            return
+        best = max(sign * score for score, _ in scored)
+        book_moves = []
+        for score, move in sorted(scored, key=lambda entry: -sign * entry[0]):
+            loss = best - sign * score
+            if loss <= margin:
+                book_moves.append((move, margin - loss + 1, score))
+        book[position.key] = book_moves
+        if verbose:
+            line = ", ".join(f"{engine.move_to_string(move)} ({score})" for move, _, score in book_moves)
+            print(f"ply {ply}: {len(book)} positions, book moves {line}")
+        for move, _, _ in book_moves[:width]:
+            child, game_over, _ = engine.make_move(game_state, decode_move(move))
+            if not game_over:
+                expand(child, ply + 1)
+
+    expand(engine.init_board(), 0)
+    return book
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or inspect a Mini Chess opening book")
+    parser.add_argument("command", choices=["build", "show"])
+    parser.add_argument("book", nargs="?", default=DEFAULT_BOOK, help="Book file")
+    parser.add_argument("-p", "--plies", type=int, default=6, help="build: plies from the start position")
+    parser.add_argument("-d", "--depth", type=int, default=6, help="build: search depth of every root move")
+    parser.add_argument("-w", "--width", type=int, default=2, help="build: book moves followed per position")
+    parser.add_argument("-m", "--margin", type=int, default=1, help="build: keep moves this close to the best score")
+    parser.add_argument("-e", "--heuristic", type=str, choices=HEURISTICS, default="e0", help="build: heuristic")
+    parser.add_argument("-o", "--output", type=str, default=None, help="build: book file (default: the book argument)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.time()
+        book = build_book(args.plies, args.depth, args.width, args.margin,
+                          default_game_parameters(heuristic=args.heuristic))
+        count = write_book(args.output or args.book, book, args.depth, args.heuristic)
+        print(f"{len(book)} positions, {count} moves written to {args.output or args.book} in {time.time() - start:.1f} sec")
+    else:
+        from MiniChessSkeletonCode import MiniChess
+        opening_book = OpeningBook(args.book)
+        game = MiniChess(default_game_parameters(book=""))
+        position = BitboardPosition.from_game_state(game.init_board())
+        print(f"{len(opening_book)} moves, depth {opening_book.depth}, heuristic {opening_book.heuristic}")
+        for move, weight, score in opening_book.moves(position.key):
+            print(f"  {game.move_to_string(move)}  weight {weight}  score {score}")
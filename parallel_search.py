@@ -0,0 +1,160 @@
+"""
+Parallel root search for get_ai_move.
+
+The root moves are dealt round-robin to a pool of worker processes. Each
+worker runs the usual iterative deepening over its share of the moves with its
+own transposition table, which stays warm between the moves of a game. The
+workers' answers are compared at the deepest depth that all of them completed.
+
+Run this module directly to measure the speedup against the single-process
+search:
+
+python parallel_search.py -w 4 -d 6
+"""
+
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import BitboardPosition, WHITE
+from game_io import default_game_parameters
+
+# MiniChess instance of a worker process, kept between searches
+_worker_engine = None
+
+
+def _search_root_moves(game_parameters, game_state, root_moves, start_time, max_time, depth_limit):
+    global _worker_engine
+    worker_parameters = dict(game_parameters, workers=1)
+    if _worker_engine is None or _worker_engine.game_parameters != worker_parameters:
+        from MiniChessSkeletonCode import MiniChess
+        _worker_engine = MiniChess(worker_parameters)
+    completed = _worker_engine.search_position(game_state, start_time, max_time, root_moves, depth_limit)
+    return completed, _worker_engine.search_counters()
+
+
+def merge_counters(counters_list):
+    """Sum the search_counters() of several workers."""
+    merged = {
+        "states_explored": 0,
+        "states_by_depth": {},
+        "total_branching_factor": 0,
+        "total_branching_samples": 0,
+        "tt_probes": 0,
+        "tt_hits": 0,
+        "tt_fill": 0.0,
+        "tb_hits": 0,
+        "nodes": 0,
+        "quiescence_nodes": 0,
+        "null_move_cutoffs": 0,
+        "reduced_moves": 0,
+        "reduction_re_searches": 0,
+        "futile_moves": 0,
+        "draw_cutoffs": 0,
+    }
+    by_depth = ["states_by_depth"]
+    if "iterations" in counters_list[0]:
+        # Instrumented workers (see instrumentation.py)
+        by_depth += ["expanded_by_depth", "cutoffs_by_depth", "first_move_cutoffs_by_depth"]
+        merged.update({name: {} for name in by_depth})
+        merged["iterations"] = []
+    for counters in counters_list:
+        for name in ("states_explored", "total_branching_factor", "total_branching_samples", "tt_probes", "tt_hits", "tb_hits", "nodes", "quiescence_nodes",
+                     "null_move_cutoffs", "reduced_moves", "reduction_re_searches", "futile_moves", "draw_cutoffs"):
+            merged[name] += counters[name]
+        for name in by_depth:
+            for depth, count in counters[name].items():
+                merged[name][depth] = merged[name].get(depth, 0) + count
+        merged["tt_fill"] += counters["tt_fill"] / len(counters_list)
+        # Iterations run side by side: nodes add up, the slowest worker sets the time
+        for number, iteration in enumerate(counters.get("iterations", [])):
+            if number == len(merged["iterations"]):
+                merged["iterations"].append(dict(iteration))
+            else:
+                total = merged["iterations"][number]
+                total["nodes"] += iteration["nodes"]
+                total["seconds"] = max(total["seconds"], iteration["seconds"])
+                total["nodes_per_second"] = total["nodes"] / total["seconds"] if total["seconds"] else 0.0
+    return merged
+
+
+def parallel_root_search(engine, game_state, start_time, max_time, workers, depth_limit=None):
+    """
+    Search game_state with its root moves split across `workers` processes.
+    Returns (score, move, depth, merged counters) like the single-process search.
+    """
+    if engine.worker_pool is None:
+        engine.worker_pool = ProcessPoolExecutor(max_workers=workers)
+
+    # Order the root moves first so that the likely best ones are spread across workers
+    position = BitboardPosition.from_game_state(game_state)
+    moves = position.generate_moves()
+    if engine.move_orderer is not None:
+        engine.move_orderer.order_moves(position, moves, 0)
+    shares = [moves[i::workers] for i in range(workers) if moves[i::workers]]
+
+    futures = [engine.worker_pool.submit(_search_root_moves, engine.game_parameters, game_state, share, start_time, max_time, depth_limit)
+               for share in shares]
+    results = [future.result() for future in futures]
+    counters = merge_counters([worker_counters for _, worker_counters in results])
+
+    # A worker that did not finish depth 1 in time has no score for its moves
+    finished = [completed for completed, _ in results if completed]
+    if not finished:
+        return None, None, 0, counters
+    depth = min(completed[-1][0] for completed in finished)
+    candidates = [completed[depth - 1] for completed in finished]
+    choose = max if position.turn == WHITE else min
+    _, score, move = choose(candidates, key=lambda entry: entry[1])
+    return score, move, depth, counters
+
+
+def compare_speedup(game_parameters, game_state, depth, workers):
+    """Time to search game_state to `depth` with one process and with `workers` processes."""
+    from MiniChessSkeletonCode import MiniChess
+    single = MiniChess(dict(game_parameters, workers=1))
+    parallel = MiniChess(dict(game_parameters, workers=workers))
+
+    # Warm up both engines at depth 1 so process startup and imports are not counted
+    single.search_position(game_state, time.time(), float('inf'), depth_limit=1)
+    parallel_root_search(parallel, game_state, time.time(), float('inf'), workers, 1)
+
+    start = time.time()
+    completed = single.search_position(game_state, start, float('inf'), depth_limit=depth)
+    single_time = time.time() - start
+    single_nodes = single.search_counters()["states_explored"]
+
+    start = time.time()
+    score, move, _, counters = parallel_root_search(parallel, game_state, start, float('inf'), workers, depth)
+    parallel_time = time.time() - start
+    parallel.close()
+
+    return {
+        "depth": depth,
+        "workers": workers,
+        "single_time": single_time,
+        "parallel_time": parallel_time,
+        "speedup": single_time / parallel_time if parallel_time else 0.0,
+        "single_score": completed[-1][1],
+        "parallel_score": score,
+        "single_states": single_nodes,
+        "parallel_states": counters["states_explored"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the parallel root search with the single-process search")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("-d", "--depth", type=int, default=5, help="Search depth to time")
+    parser.add_argument("-e", "--heuristic", type=str, choices=["e0", "e1", "e2"], default="e0",
+                        help="Heuristic function to use: e0, e1, or e2")
+    args = parser.parse_args()
+
+    from MiniChessSkeletonCode import MiniChess
+    parameters = default_game_parameters(heuristic=args.heuristic)
+    initial_state = MiniChess(parameters).init_board()
+    result = compare_speedup(parameters, initial_state, args.depth, args.workers)
+    print(f"Depth {result['depth']}: single process {result['single_time']:.3f} sec, "
+          f"{result['workers']} workers {result['parallel_time']:.3f} sec, speedup {result['speedup']:.2f}x")
+    print(f"Scores: single {result['single_score']}, parallel {result['parallel_score']}")
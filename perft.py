@@ -0,0 +1,133 @@
+"""
+Perft: count the move sequences of a given length, to check and time a move generator.
+
+Three backends are available: "bitboard" (bitboard.py, used by the search),
+"list" (MiniChess.valid_moves / make_move on the list-of-strings board) and
+"compact" (the same methods on a CompactPosition, see compact_position.py). A move
+that captures a King ends the game, so no sequence continues past it. The draw
+rules are not applied.
+
+python perft.py -d 5                       # bitboard backend, compared with REFERENCE_COUNTS
+python perft.py -d 4 -b list --divide      # counts per root move with the list backend
+python perft.py -d 5 -b compact            # MiniChess methods on a CompactPosition
+python perft.py -d 3 --board "bK . . . . . . . . . . . wQ . . . . . . . . . . . wK" --turn black
+"""
+
+import time
+import argparse
+
+from bitboard import BitboardPosition, decode_move
+from game_io import default_game_parameters
+from compact_position import CompactPosition
+
+# Perft counts from the standard init_board position (White to move)
+REFERENCE_COUNTS = {
+    1: 13,
+    2: 170,
+    3: 2452,
+    4: 34813,
+    5: 532546,
+    6: 8082547,
+    7: 127864758,
+}
+
+
+def perft_bitboard(position, depth):
+    """Number of move sequences of length depth from a BitboardPosition."""
+    moves = position.generate_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        if position.captures_king(move):
+            continue
+        undo = position.apply_move(move)
+        nodes += perft_bitboard(position, depth - 1)
+        position.undo_move(undo)
+    return nodes
+
+
+def perft_list(game, game_state, depth):
+    """Number of move sequences of length depth using MiniChess.valid_moves and make_move."""
+    moves = game.valid_moves(game_state)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        new_state, game_over, _ = game.make_move(game_state, move)
+        if not game_over:
+            nodes += perft_list(game, new_state, depth - 1)
+    return nodes
+
+
+def divide(game, game_state, depth, backend="bitboard"):
+    """Perft count below each root move, as a {move string: count} dict."""
+    results = {}
+    if backend == "compact":
+        game_state = CompactPosition.from_game_state(game_state)
+    if backend == "bitboard":
+        position = BitboardPosition.from_game_state(game_state)
+        for move in position.generate_moves():
+            start, end = decode_move(move)
+            if depth == 1 or position.captures_king(move):
+                count = 1 if depth == 1 else 0
+            else:
+                undo = position.apply_move(move)
+                count = perft_bitboard(position, depth - 1)
+                position.undo_move(undo)
+            results[f"{game.coordinate_to_string(start)} {game.coordinate_to_string(end)}"] = count
+    else:
+        for start, end in game.valid_moves(game_state):
+            new_state, game_over, _ = game.make_move(game_state, (start, end))
+            if depth == 1 or game_over:
+                count = 1 if depth == 1 else 0
+            else:
+                count = perft_list(game, new_state, depth - 1)
+            results[f"{game.coordinate_to_string(start)} {game.coordinate_to_string(end)}"] = count
+    return results
+
+
+def perft(game, game_state, depth, backend="bitboard"):
+    """Run perft and return (count, seconds)."""
+    if backend == "compact":
+        game_state = CompactPosition.from_game_state(game_state)
+    start_time = time.time()
+    if backend == "bitboard":
+        count = perft_bitboard(BitboardPosition.from_game_state(game_state), depth)
+    else:
+        count = perft_list(game, game_state, depth)
+    return count, time.time() - start_time
+
+
+def parse_board(text, turn):
+    """Build a game_state from 25 space-separated squares (row by row from A5, '.' for empty)."""
+    squares = text.split()
+    if len(squares) != 25:
+        raise ValueError(f"Expected 25 squares, got {len(squares)}")
+    return {"board": [squares[row * 5:row * 5 + 5] for row in range(5)], "turn": turn}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mini Chess move generator perft")
+    parser.add_argument("-d", "--depth", type=int, default=4, help="Number of plies")
+    parser.add_argument("-b", "--backend", type=str, choices=["bitboard", "list", "compact"], default="bitboard",
+                        help="Move generator to run")
+    parser.add_argument("--divide", action="store_true", help="Show the count below each root move")
+    parser.add_argument("--board", type=str, default=None, help="25 squares row by row from A5 (default: init_board)")
+    parser.add_argument("--turn", type=str, choices=["white", "black"], default="white", help="Side to move with --board")
+    args = parser.parse_args()
+
+    from MiniChessSkeletonCode import MiniChess
+    game = MiniChess(default_game_parameters())
+    game_state = parse_board(args.board, args.turn) if args.board else game.init_board()
+
+    if args.divide:
+        for move, count in divide(game, game_state, args.depth, args.backend).items():
+            print(f"{move}: {count}")
+
+    for depth in range(1, args.depth + 1):
+        count, seconds = perft(game, game_state, depth, args.backend)
+        line = f"perft({depth}) = {count}  {seconds:.3f} sec  {count / seconds if seconds else 0:.0f} nodes/sec"
+        if not args.board and depth in REFERENCE_COUNTS:
+            line += "  OK" if count == REFERENCE_COUNTS[depth] else f"  MISMATCH (expected {REFERENCE_COUNTS[depth]})"
+        print(line)
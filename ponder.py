@@ -0,0 +1,78 @@
+"""
+Pondering: searching on the human's time.
+
+While the human thinks about a move, a background thread searches the
+position the engine expects to reach: the human's position after the move
+predicted by the transposition table (the hash move stored for the human's
+position, if it is legal there). The search has no deadline and fills the engine's
+transposition table as it goes. Once the human's move arrives, stop() ends it
+at the next node and joins the thread, so the engine is never used by two
+threads at once.
+
+If the human played the predicted move, get_ai_move starts from the pondered
+iterations instead of depth 1 and uses its own time to go deeper. Any other
+move still finds the transposition table warm from the shared subtrees.
+"""
+
+import time
+import threading
+
+from bitboard import BitboardPosition, decode_move
+from time_manager import TimeManager
+from compact_position import to_game_state
+
+
+class Ponderer:
+    """Background search of one predicted position for a MiniChess engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.thread = None
+        self.timer = None
+        self.ponder_state = None
+        self.completed = []
+
+    def predicted_move(self, game_state):
+        """Hash move stored for the human's position, as ((row, col), (row, col)), or None."""
+        table = self.engine.transposition_table
+        if table is None:
+            return None
+        entry = table.probe(BitboardPosition.from_game_state(game_state).key)
+        if entry is None or entry[3] is None:
+            return None
+        move = decode_move(entry[3])
+        return move if move in self.engine.valid_moves(game_state) else None
+
+    def start(self, game_state):
+        """Start pondering the position after the human's predicted move in game_state."""
+        self.stop()
+        move = self.predicted_move(game_state)
+        if move is None:
+            return False
+        self.ponder_state, game_over, _ = self.engine.make_move(game_state, move)
+        if game_over:
+            return False
+        self.completed = []
+        self.timer = TimeManager(float('inf'))
+        self.thread = threading.Thread(target=self._search, daemon=True)
+        self.thread.start()
+        return True
+
+    def _search(self):
+        self.completed = self.engine.search_position(self.ponder_state, time.time(), float('inf'), timer=self.timer)
+
+    def stop(self):
+        """Stop the background search and wait for it to return."""
+        if self.thread is not None:
+            self.timer.stop()
+            self.thread.join()
+            self.thread = None
+
+    def result_for(self, game_state):
+        """The pondered iterations if game_state is the predicted position, else None (call after stop())."""
+        if self.ponder_state is None or not self.completed:
+            return None
+        game_state, ponder_state = to_game_state(game_state), to_game_state(self.ponder_state)
+        if game_state["turn"] != ponder_state["turn"] or game_state["board"] != ponder_state["board"]:
+            return None
+        return self.completed
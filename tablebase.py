@@ -0,0 +1,416 @@
+"""
+Retrograde endgame tablebases for positions with few pieces.
+
+A table covers one piece set (both Kings plus a few other pieces) and stores,
+for every placement of those pieces and each side to move, whether the side to
+move wins, loses or draws, and in how many plies the King capture happens. It
+is built by retrograde analysis with the move rules of bitboard.py:
+
+1. One forward pass finds immediate King captures and the results of moves
+   that leave the table (captures and promotions), which are looked up in the
+   already built smaller tables.
+2. Results then spread backwards by distance: every predecessor of a lost
+   position is won, and a position whose moves all reach won positions is lost.
+3. Whatever is left unresolved is a draw.
+
+The 10-turn no-capture rule is not part of the tables, so a long win may be a
+draw in an actual game. probe and best_move take the number of moves left
+before a draw (BitboardPosition.plies_to_draw) and only answer when the King
+capture comes in time; otherwise the search has to find out.
+
+Each table is stored as its own file in a compact format that is read through
+mmap: a 16-byte header (b"MCTB", version, number of pieces, piece indices)
+followed by one byte per position. 0 is a draw (or an impossible placement),
+1..127 a win in that many plies, 128 + n a loss in n plies.
+
+python tablebase.py -n 4           # every table with up to 4 pieces
+python tablebase.py -s wQ bN       # King+Queen vs King+Knight and the tables it needs
+"""
+
+import os
+import mmap
+import argparse
+import itertools
+
+from bitboard import (WHITE, BLACK, PAWN, KNIGHT, QUEEN, KING, COLOR_LETTERS, PIECE_LETTERS, KING_ATTACKS,
+                      KNIGHT_ATTACKS, PAWN_ATTACKS, PAWN_PUSHES, PROMOTION_ROWS, BISHOP_RAYS, QUEEN_RAYS,
+                      sliding_attacks)
+
+MAGIC = b"MCTB"
+VERSION = 1
+HEADER_SIZE = 16
+LOSS = 128
+MAX_DISTANCE = 127
+DEFAULT_DIRECTORY = "tablebases"
+
+WHITE_KING = WHITE * 5 + KING
+BLACK_KING = BLACK * 5 + KING
+
+# Pieces a table can hold besides the Kings, by bitboard piece index
+EXTRA_PIECES = [index for index in range(10) if index % 5 != KING]
+
+
+def piece_set(extra_pieces):
+    """Canonical piece set (sorted bitboard piece indices) for the Kings plus extra_pieces."""
+    return tuple(sorted([WHITE_KING, BLACK_KING] + list(extra_pieces)))
+
+
+def parse_piece(name):
+    """'wQ' -> bitboard piece index."""
+    return COLOR_LETTERS.index(name[0]) * 5 + PIECE_LETTERS.index(name[1])
+
+
+def set_name(pieces):
+    """File name stem for a piece set, e.g. 'KQvKN'."""
+    sides = []
+    for color in (WHITE, BLACK):
+        letters = [PIECE_LETTERS[index % 5] for index in sorted(pieces, reverse=True) if index // 5 == color]
+        sides.append("".join(letters))
+    return "v".join(sides)
+
+
+def table_size(pieces):
+    return 2 * 25 ** len(pieces)
+
+
+def position_index(squares, turn):
+    index = turn
+    for sq in squares:
+        index = index * 25 + sq
+    return index
+
+
+def decode_index(index, count):
+    squares = [0] * count
+    for i in range(count - 1, -1, -1):
+        index, squares[i] = divmod(index, 25)
+    return squares, index
+
+
+def _attacks(piece, sq, occupied):
+    piece_type = piece % 5
+    if piece_type == KING:
+        return KING_ATTACKS[sq]
+    if piece_type == KNIGHT:
+        return KNIGHT_ATTACKS[sq]
+    if piece_type == QUEEN:
+        return sliding_attacks(sq, occupied, QUEEN_RAYS)
+    return sliding_attacks(sq, occupied, BISHOP_RAYS)
+
+
+def _reachable(pieces, squares, turn):
+    """False for placements that cannot occur: two pieces on a square, or a pawn on its last row."""
+    if len(set(squares)) != len(squares):
+        return False
+    for piece, sq in zip(pieces, squares):
+        if piece % 5 == PAWN and (1 << sq) & PROMOTION_ROWS[piece // 5]:
+            return False
+    return True
+
+
+def _child_index(pieces, squares, mover, target, captured, promoted):
+    """Piece set and index of the position after an exit move (a capture or a promotion)."""
+    placed = []
+    for i, (piece, sq) in enumerate(zip(pieces, squares)):
+        if i == mover:
+            placed.append((piece - PAWN + QUEEN if promoted else piece, target))
+        elif i != captured:
+            placed.append((piece, sq))
+    placed.sort()
+    child_pieces = tuple(piece for piece, _ in placed)
+    return child_pieces, position_index([sq for _, sq in placed], pieces[mover] // 5 ^ 1)
+
+
+def required_sets(pieces):
+    """Every piece set reachable from pieces by captures and promotions, pieces included."""
+    found = set()
+    pending = [tuple(pieces)]
+    while pending:
+        current = pending.pop()
+        if current in found:
+            continue
+        found.add(current)
+        for i, piece in enumerate(current):
+            if piece % 5 != KING:
+                pending.append(current[:i] + current[i + 1:])
+            if piece % 5 == PAWN:
+                pending.append(tuple(sorted(current[:i] + (piece - PAWN + QUEEN,) + current[i + 1:])))
+    # Smaller sets first; for equal sizes, sets with fewer pawns (promotion targets) first
+    return sorted(found, key=lambda p: (len(p), sum(1 for piece in p if piece % 5 == PAWN), p))
+
+
+def generate_table(pieces, solved):
+    """
+    Build the table for one piece set. solved maps already built piece sets to
+    their data (any object supporting indexing by position index).
+    """
+    count = len(pieces)
+    size = table_size(pieces)
+    values = bytearray(size)
+    resolved = bytearray(size)
+    counters = bytearray(size)
+    exit_loss = bytearray(size)
+    blocked = bytearray(size)
+    buckets = {}
+
+    # Forward pass: immediate King captures and moves that leave the table
+    index = 0
+    for turn in (WHITE, BLACK):
+        for squares in itertools.product(range(25), repeat=count):
+            if not _reachable(pieces, squares, turn):
+                resolved[index] = 1
+                index += 1
+                continue
+            own = enemy = 0
+            for piece, sq in zip(pieces, squares):
+                if piece // 5 == turn:
+                    own |= 1 << sq
+                else:
+                    enemy |= 1 << sq
+            occupied = own | enemy
+            moves = 0
+            win = 0
+            for mover, (piece, sq) in enumerate(zip(pieces, squares)):
+                if piece // 5 != turn:
+                    continue
+                if piece % 5 == PAWN:
+                    targets = (PAWN_PUSHES[turn][sq] & ~occupied) | (PAWN_ATTACKS[turn][sq] & enemy)
+                else:
+                    targets = _attacks(piece, sq, occupied) & ~own
+                while targets:
+                    low = targets & -targets
+                    targets ^= low
+                    target = low.bit_length() - 1
+                    moves += 1
+                    promoted = piece % 5 == PAWN and bool(low & PROMOTION_ROWS[turn])
+                    captured = -1
+                    if enemy & low:
+                        captured = squares.index(target)
+                        if pieces[captured] % 5 == KING:
+                            # Keep counting: predecessors may be processed before this position is
+                            win = 1
+                            continue
+                    if captured < 0 and not promoted:
+                        counters[index] += 1
+                        continue
+                    child_pieces, child = _child_index(pieces, squares, mover, target, captured, promoted)
+                    value = solved[child_pieces][child]
+                    if value == 0:
+                        blocked[index] = 1
+                    elif value < LOSS:
+                        exit_loss[index] = max(exit_loss[index], value + 1)
+                    else:
+                        blocked[index] = 1
+                        distance = value - LOSS + 1
+                        win = distance if not win else min(win, distance)
+            if win:
+                buckets.setdefault(win, []).append((index, True))
+            elif moves == 0:
+                resolved[index] = 1  # No moves at all: a draw
+            elif counters[index] == 0 and not blocked[index]:
+                buckets.setdefault(exit_loss[index], []).append((index, False))
+            index += 1
+
+    # Retrograde pass, in order of increasing distance
+    distance = 1
+    while buckets:
+        for index, is_win in buckets.pop(distance, []):
+            if resolved[index]:
+                continue
+            resolved[index] = 1
+            values[index] = distance if is_win else LOSS + distance
+            for previous in _predecessors(pieces, index, count):
+                if resolved[previous]:
+                    continue
+                if not is_win:
+                    # Moving into a lost position wins
+                    buckets.setdefault(distance + 1, []).append((previous, True))
+                else:
+                    counters[previous] -= 1
+                    if counters[previous] == 0 and not blocked[previous]:
+                        buckets.setdefault(max(distance + 1, exit_loss[previous]), []).append((previous, False))
+        distance += 1
+        if distance > MAX_DISTANCE and buckets:
+            raise ValueError(f"{set_name(pieces)}: distance to King capture exceeds {MAX_DISTANCE} plies")
+    return values
+
+
+def _predecessors(pieces, index, count):
+    """Positions of the same piece set from which one non-capturing, non-promoting move reaches index."""
+    squares, turn = decode_index(index, count)
+    mover_color = turn ^ 1
+    occupied = 0
+    for sq in squares:
+        occupied |= 1 << sq
+    empty = ~occupied
+    previous = []
+    for i, (piece, sq) in enumerate(zip(pieces, squares)):
+        if piece // 5 != mover_color:
+            continue
+        if piece % 5 == PAWN:
+            # Step the pawn back one row
+            source = sq + 5 if mover_color == WHITE else sq - 5
+            sources = 1 << source if 0 <= source < 25 and not occupied >> source & 1 else 0
+        else:
+            sources = _attacks(piece, sq, occupied) & empty
+        while sources:
+            low = sources & -sources
+            sources ^= low
+            squares[i] = low.bit_length() - 1
+            previous.append(position_index(squares, mover_color))
+        squares[i] = sq
+    return previous
+
+
+def write_table(path, pieces, values):
+    header = MAGIC + bytes([VERSION, len(pieces)]) + bytes(pieces)
+    with open(path, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.write(values)
+
+
+class Tablebases:
+    """Memory-mapped tables from a directory, probed by the search."""
+
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        self.tables = {}
+        self.max_pieces = 0
+        self.probes = 0
+        self.hits = 0
+        if not os.path.isdir(directory):
+            return
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".tb"):
+                continue
+            with open(os.path.join(directory, name), "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            header = data[:HEADER_SIZE]
+            if header[:4] != MAGIC or header[4] != VERSION:
+                continue
+            count = header[5]
+            pieces = tuple(header[6:6 + count])
+            self.tables[pieces] = data
+            self.max_pieces = max(self.max_pieces, count)
+
+    def __len__(self):
+        return len(self.tables)
+
+    def new_search(self):
+        self.probes = 0
+        self.hits = 0
+
+    def lookup(self, position):
+        """Raw table value for a BitboardPosition, or None if its piece set has no table."""
+        pieces = []
+        squares = []
+        for index in range(10):
+            bb = position.pieces[index]
+            while bb:
+                low = bb & -bb
+                pieces.append(index)
+                squares.append(low.bit_length() - 1)
+                bb ^= low
+        data = self.tables.get(tuple(pieces))
+        if data is None:
+            return None
+        return data[HEADER_SIZE + position_index(squares, position.turn)]
+
+    def probe(self, position, plies_left=None):
+        """
+        Exact score of a position from White's point of view (1000 / -1000 for
+        a King capture either way, 0 for a draw), or None if it is not covered
+        or the King capture takes more than plies_left moves.
+        """
+        if (position.occupied[0] | position.occupied[1]).bit_count() > self.max_pieces:
+            return None
+        self.probes += 1
+        value = self.lookup(position)
+        if value is None:
+            return None
+        if value == 0:
+            self.hits += 1
+            return 0
+        if plies_left is not None and value % LOSS > plies_left:
+            return None
+        self.hits += 1
+        side_to_move_wins = value < LOSS
+        return 1000 if side_to_move_wins == (position.turn == WHITE) else -1000
+
+    def best_move(self, position, plies_left=None):
+        """
+        (score, move) that keeps the tablebase result of a covered root position:
+        the fastest King capture when winning, the slowest loss when losing.
+        Returns None if the position or one of its children is not covered, or
+        the King capture takes more than plies_left moves.
+        """
+        if (position.occupied[0] | position.occupied[1]).bit_count() > self.max_pieces:
+            return None
+        value = self.lookup(position)
+        if value is None or (plies_left is not None and value % LOSS > plies_left):
+            return None
+        best = None
+        for move in position.generate_moves():
+            if position.captures_king(move):
+                return (1000 if position.turn == WHITE else -1000), move
+            undo = position.apply_move(move)
+            value = self.lookup(position)
+            position.undo_move(undo)
+            if value is None:
+                return None
+            # Rank from the mover's side: opponent losses (fast first), draws, opponent wins (slow first)
+            if value >= LOSS:
+                rank = (2, -(value - LOSS))
+            elif value == 0:
+                rank = (1, 0)
+            else:
+                rank = (0, value)
+            if best is None or rank > best[0]:
+                best = (rank, move)
+        if best is None:
+            return None
+        outcome = best[0][0]
+        if outcome == 1:
+            score = 0
+        else:
+            score = 1000 if (outcome == 2) == (position.turn == WHITE) else -1000
+        return score, best[1]
+
+
+def generate(piece_sets, directory=DEFAULT_DIRECTORY, verbose=True):
+    """Build the tables for piece_sets and everything they depend on, skipping existing files."""
+    os.makedirs(directory, exist_ok=True)
+    needed = set()
+    for pieces in piece_sets:
+        needed.update(required_sets(pieces))
+    solved = {}
+    for pieces in sorted(needed, key=lambda p: (len(p), sum(1 for piece in p if piece % 5 == PAWN), p)):
+        path = os.path.join(directory, set_name(pieces) + ".tb")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                solved[pieces] = f.read()[HEADER_SIZE:]
+            continue
+        values = generate_table(pieces, solved)
+        write_table(path, pieces, values)
+        solved[pieces] = values
+        if verbose:
+            wins = sum(1 for value in values if 0 < value < LOSS)
+            losses = sum(1 for value in values if value > LOSS)
+            print(f"{set_name(pieces)}: {len(values)} positions, {wins} wins, {losses} losses, written to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate Mini Chess endgame tablebases")
+    parser.add_argument("-n", "--max_pieces", type=int, default=3,
+                        help="Build every table with up to this many pieces, Kings included")
+    parser.add_argument("-s", "--set", nargs="+", default=None,
+                        help="Build one piece set instead, given by its non-King pieces (e.g. wQ bN)")
+    parser.add_argument("-d", "--directory", type=str, default=DEFAULT_DIRECTORY, help="Output directory")
+    args = parser.parse_args()
+
+    if args.set:
+        sets = [piece_set(parse_piece(name) for name in args.set)]
+    else:
+        sets = [piece_set(extra)
+                for count in range(args.max_pieces - 1)
+                for extra in itertools.combinations_with_replacement(EXTRA_PIECES, count)]
+    generate(sets, args.directory)
@@ -0,0 +1,44 @@
+import os
+import sys
+import random
+
+import pytest
+
+# The modules live at the top of the repository, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_io import default_game_parameters
+
+# No opening book, tablebases, analysis cache or pondering unless a test asks for them
+TEST_PARAMETERS = dict(book="", tablebase_dir="", analysis_cache="", ponder=False)
+
+
+@pytest.fixture
+def make_game():
+    """make_game(**overrides): a fresh engine with the default game parameters and overrides."""
+    from MiniChessSkeletonCode import MiniChess
+
+    def make(**overrides):
+        return MiniChess(default_game_parameters(**dict(TEST_PARAMETERS, **overrides)))
+    return make
+
+
+@pytest.fixture
+def game(make_game):
+    return make_game()
+
+
+@pytest.fixture
+def random_states(game):
+    """random_states(count, seed): states of random games from init_board, which is included."""
+    def sample(count, seed):
+        rng = random.Random(seed)
+        states = []
+        game_state = game.init_board()
+        while len(states) < count:
+            states.append(game_state)
+            game_state, game_over, _ = game.make_move(game_state, rng.choice(game.valid_moves(game_state)))
+            if game_over:
+                game_state = game.init_board()
+        return states
+    return sample
@@ -0,0 +1,117 @@
+import os
+
+import pytest
+
+from analysis_cache import AnalysisCache, BUCKET_SIZE, MIN_CACHED_DEPTH, SCORE_PARAMETERS, search_variant
+from game_io import default_game_parameters
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "analysis.mcac"), size_mb=0.01)
+    yield cache
+    cache.close()
+
+
+def test_store_and_probe(cache):
+    assert cache.probe(42, 0) is None
+    cache.store(42, 0, 8, -15, 300)
+    assert cache.probe(42, 0) == (8, -15, 300)
+    assert cache.hits == 1
+    # Another search variant scores positions differently
+    assert cache.probe(42, 1) is None
+
+
+def test_shallow_results_are_not_stored(cache):
+    cache.store(42, 0, MIN_CACHED_DEPTH - 1, 3, 33)
+    assert cache.probe(42, 0) is None
+
+
+def test_deeper_result_is_kept(cache):
+    cache.store(42, 0, 9, 1, 33)
+    cache.store(42, 0, 6, 2, 34)
+    assert cache.probe(42, 0) == (9, 1, 33)
+    cache.store(42, 0, 10, 3, 35)
+    assert cache.probe(42, 0) == (10, 3, 35)
+
+
+def test_full_bucket_replaces_the_shallowest(cache):
+    keys = [7 + number * cache.buckets for number in range(BUCKET_SIZE)]
+    for depth, key in enumerate(keys, MIN_CACHED_DEPTH + 1):
+        cache.store(key, 0, depth, 0, 1)
+    cache.store(7 + BUCKET_SIZE * cache.buckets, 0, MIN_CACHED_DEPTH + 3, 0, 1)
+    assert cache.probe(keys[0], 0) is None
+    assert all(cache.probe(key, 0) is not None for key in keys[1:])
+
+
+def test_shared_between_instances(tmp_path):
+    path = str(tmp_path / "shared.mcac")
+    writer = AnalysisCache(path, size_mb=0.01)
+    reader = AnalysisCache(path, size_mb=64)  # the size of an existing file is kept
+    writer.store(99, 2, 7, 12, 400)
+    assert reader.probe(99, 2) == (7, 12, 400)
+    assert reader.buckets == writer.buckets
+    writer.close()
+    reader.close()
+
+
+def test_prune_and_summary(cache):
+    cache.store(1, 0, 5, 0, 1)
+    cache.store(2, 0, 9, 0, 1)
+    summary = cache.summary()
+    assert summary["records"] == 2
+    assert summary["by_depth"] == {5: 1, 9: 1}
+    assert cache.prune(min_depth=6) == 1
+    assert cache.probe(1, 0) is None and cache.probe(2, 0) is not None
+    # Every record is older than -1 seconds
+    assert cache.prune(max_age=-1) == 1
+    assert cache.summary()["records"] == 0
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.mcac"
+    path.write_bytes(b"NOPE" + bytes(60))
+    with pytest.raises(ValueError):
+        AnalysisCache(str(path))
+
+
+def test_search_variant():
+    variants = {search_variant(default_game_parameters(heuristic=heuristic, quiescence=quiescence))
+                for heuristic in ("e0", "e1", "e2") for quiescence in (True, False)}
+    assert len(variants) == 6
+    default = search_variant(default_game_parameters())
+    for name, value in SCORE_PARAMETERS.items():
+        changed = not value if isinstance(value, bool) else "e1" if name == "heuristic" else value + 1
+        assert search_variant(default_game_parameters(**{name: changed})) != default, name
+    # Settings that do not change scores keep the variant
+    assert search_variant(default_game_parameters(time_limit=1, hash_size=0)) == default
+
+
+def test_engine_answers_from_the_cache(tmp_path):
+    from MiniChessSkeletonCode import MiniChess
+    path = str(tmp_path / "engine.mcac")
+    parameters = default_game_parameters(book="", tablebase_dir="", ponder=False, analysis_cache=path, cache_depth=4)
+    first = MiniChess(parameters)
+    searched = first.search_position(first.init_board(), 0, float('inf'), depth_limit=4)
+    assert not first.cache_hit
+    second = MiniChess(parameters)
+    cached = second.search_position(second.init_board(), 0, float('inf'), depth_limit=4)
+    assert second.cache_hit
+    assert cached == [searched[-1]]
+    assert os.path.getsize(path) > 0
+
+
+def test_other_pruning_settings_miss_the_cache(tmp_path):
+    from MiniChessSkeletonCode import MiniChess
+    path = str(tmp_path / "engine.mcac")
+    parameters = default_game_parameters(book="", tablebase_dir="", ponder=False, analysis_cache=path, cache_depth=4)
+    first = MiniChess(parameters)
+    first.search_position(first.init_board(), 0, float('inf'), depth_limit=4)
+    pruned = MiniChess(dict(parameters, null_move=True, futility=True))
+    pruned.search_position(pruned.init_board(), 0, float('inf'), depth_limit=4)
+    assert not pruned.cache_hit
+    again = MiniChess(dict(parameters, null_move=True, futility=True))
+    again.search_position(again.init_board(), 0, float('inf'), depth_limit=4)
+    assert again.cache_hit
+    for engine in (first, pruned, again):
+        engine.analysis_cache.close()
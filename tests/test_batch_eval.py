@@ -0,0 +1,54 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch_eval import HEURISTICS, encode_game_states, evaluate_batch, score_children
+from bitboard import BitboardPosition
+from evaluation import TABLES, evaluate_board
+from perft import parse_board
+
+
+@pytest.mark.parametrize("heuristic", HEURISTICS)
+def test_batch_matches_scalar_evaluation(heuristic, random_states):
+    states = random_states(50, seed=3)
+    scores = evaluate_batch(encode_game_states(states), heuristic)
+    assert list(scores) == [evaluate_board(state["board"], heuristic) for state in states]
+
+
+@pytest.mark.parametrize("heuristic", HEURISTICS)
+def test_children_scores_match_apply_move(heuristic, random_states):
+    for game_state in random_states(20, seed=4):
+        position = BitboardPosition.from_game_state(game_state, TABLES[heuristic])
+        moves = [move for move in position.generate_moves() if not position.captures_king(move)]
+        expected = []
+        for move in moves:
+            undo = position.apply_move(move)
+            expected.append(position.score)
+            position.undo_move(undo)
+        assert list(score_children(position, moves, heuristic)) == expected
+
+
+def test_frontier_batch_scores_draws_like_the_scalar_search(make_game):
+    game_state = parse_board("bK . . . . . . . . . . . . . . . . wQ . . . . . . wK", "white")
+    # Every leaf of a 2-ply search reaches max_turns
+    game_state.update(halfmove_clock=0, turns=8, history=[])
+    results = []
+    for batch in (False, True):
+        game = make_game(batch_eval=batch, quiescence=False, max_turns=10)
+        results.append(game.search_position(game_state, 0, float('inf'), depth_limit=2)[-1][1])
+    assert results == [0, 0]
+
+
+def test_frontier_nodes_are_counted_by_depth(make_game):
+    for batch in (False, True):
+        game = make_game(batch_eval=batch, quiescence=False)
+        game.search_position(game.init_board(), 0, float('inf'), depth_limit=3)
+        by_depth = game.search_counters()["states_by_depth"]
+        # Batched children are nodes of the last depth like the others
+        assert sorted(by_depth) == [0, 1, 2, 3]
+        assert sum(by_depth.values()) == game.states_explored
+
+
+def test_frontier_without_max_turns(make_game):
+    game = make_game(batch_eval=True, quiescence=False, max_turns=None)
+    assert game.search_position(game.init_board(), 0, float('inf'), depth_limit=2)[-1][2] is not None
@@ -0,0 +1,47 @@
+from benchmark import DEFAULT_TOLERANCE, compare, configurations, effective_branching_factor, position_state, POSITIONS
+
+
+def report(**totals):
+    return {"results": {name: {"total": {"nodes": nodes, "nodes_per_second": nps}}
+                        for name, (nodes, nps) in totals.items()}}
+
+
+def test_compare_within_tolerance():
+    lines, regression = compare(report(a=(1000, 9000.0)), report(a=(1000, 10000.0)), 0.2)
+    assert not regression
+    assert lines == ["a                  nodes_per_second -10.0%"]
+
+
+def test_compare_slower_is_a_regression():
+    lines, regression = compare(report(a=(1000, 6000.0)), report(a=(1000, 10000.0)), DEFAULT_TOLERANCE)
+    assert regression
+    assert lines[0].endswith("nodes_per_second -40.0% REGRESSION")
+    # The default tolerance absorbs the timing noise of short runs
+    assert not compare(report(a=(1000, 8000.0)), report(a=(1000, 10000.0)), DEFAULT_TOLERANCE)[1]
+
+
+def test_compare_node_counts_must_match():
+    lines, regression = compare(report(a=(1001, 20000.0)), report(a=(1000, 10000.0)), DEFAULT_TOLERANCE)
+    assert regression
+    assert "nodes 1000 -> 1001 (search changed)" in lines[0]
+
+
+def test_compare_new_configuration():
+    lines, regression = compare(report(a=(1, 1.0), b=(1, 1.0)), report(a=(1, 1.0)), DEFAULT_TOLERANCE)
+    assert not regression
+    assert lines[1] == "b                  not in the baseline"
+
+
+def test_effective_branching_factor():
+    iterations = [{"depth": 1, "nodes": 10}, {"depth": 2, "nodes": 40}, {"depth": 3, "nodes": 160}]
+    assert effective_branching_factor(iterations) == 4
+    assert effective_branching_factor(iterations[:1]) == 0.0
+
+
+def test_positions_and_configurations(game):
+    for name in POSITIONS:
+        assert game.valid_moves(position_state(game, name))
+    configs = configurations(4, 1000)
+    assert len(configs) == 12
+    assert configs["ab-e1-depth"] == {"alpha_beta": True, "heuristic": "e1", "depth_limit": 4, "node_limit": 0}
+    assert configs["minimax-e0-nodes"]["node_limit"] == 1000
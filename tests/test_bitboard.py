@@ -0,0 +1,70 @@
+from bitboard import BitboardPosition, decode_move, encode_move
+
+
+def test_move_encoding_round_trip():
+    for start in range(25):
+        for end in range(25):
+            coords = (divmod(start, 5), divmod(end, 5))
+            assert decode_move(encode_move(*coords)) == coords
+
+
+def test_game_state_round_trip(random_states):
+    for game_state in random_states(50, seed=1):
+        converted = BitboardPosition.from_game_state(game_state).to_game_state()
+        assert converted["board"] == game_state["board"]
+        assert converted["turn"] == game_state["turn"]
+
+
+def test_moves_match_valid_moves(game, random_states):
+    for game_state in random_states(300, seed=2):
+        position = BitboardPosition.from_game_state(game_state)
+        moves = [decode_move(move) for move in position.generate_moves()]
+        assert sorted(moves) == sorted(game.valid_moves(game_state))
+
+
+def test_captures_and_quiets_split_the_moves(random_states):
+    for game_state in random_states(200, seed=3):
+        position = BitboardPosition.from_game_state(game_state)
+        captures = position.generate_captures()
+        quiets = position.generate_quiets()
+        assert sorted(captures + quiets) == sorted(position.generate_moves())
+        assert not set(captures) & set(quiets)
+
+
+def test_apply_and_undo_restore_the_position(random_states):
+    for game_state in random_states(100, seed=4):
+        position = BitboardPosition.from_game_state(game_state)
+        before = (list(position.pieces), position.turn, list(position.occupied), position.key, position.score,
+                  position.halfmove_clock, position.ply, list(position.history))
+        for move in position.generate_moves():
+            if position.captures_king(move):
+                continue
+            undo = position.apply_move(move)
+            # The incremental key and score match a position built from scratch
+            assert position.key == position.compute_key()
+            assert position.score == position.compute_score()
+            position.undo_move(undo)
+            assert (list(position.pieces), position.turn, list(position.occupied), position.key, position.score,
+                    position.halfmove_clock, position.ply, list(position.history)) == before
+
+
+def test_apply_move_matches_make_move(game, random_states):
+    for game_state in random_states(100, seed=5):
+        position = BitboardPosition.from_game_state(game_state)
+        for move in position.generate_moves():
+            if position.captures_king(move):
+                continue
+            expected, _, _ = game.make_move(game_state, decode_move(move))
+            undo = position.apply_move(move)
+            assert position.to_game_state()["board"] == expected["board"]
+            assert position.key == BitboardPosition.from_game_state(expected).key
+            position.undo_move(undo)
+
+
+def test_null_move_round_trip(game):
+    position = BitboardPosition.from_game_state(game.init_board())
+    key = position.key
+    turn = position.apply_null_move()
+    assert position.key != key
+    position.undo_null_move(turn)
+    assert position.key == key
@@ -0,0 +1,59 @@
+import random
+
+from bitboard import BitboardPosition
+from compact_position import CompactPosition, to_game_state
+from evaluation import TABLES
+
+
+def test_round_trip_through_the_dict(game):
+    game_state = game.init_board()
+    position = CompactPosition.from_game_state(game_state)
+    assert to_game_state(position) == game_state
+    assert to_game_state(game_state) is game_state
+
+
+def test_games_match_the_dict(game):
+    rng = random.Random(7)
+    for _ in range(30):
+        game_state = game.init_board()
+        position = CompactPosition.from_game_state(game_state)
+        for _ in range(40):
+            moves = game.valid_moves(game_state)
+            # Same moves in the same order
+            assert game.valid_moves(position) == moves
+            for heuristic in ("e0", "e1", "e2"):
+                method = getattr(game, f"{heuristic}_heuristic")
+                assert method(position) == method(game_state)
+            move = rng.choice(moves)
+            game_state, over, winner = game.make_move(game_state, move)
+            position, compact_over, compact_winner = game.make_move(position, move)
+            assert (over, winner) == (compact_over, compact_winner)
+            if over:
+                break
+            assert position.board() == game_state["board"]
+            bitboard = BitboardPosition.from_game_state(game_state)
+            assert position.key == bitboard.key
+            assert (position.halfmove_clock, position.turns) == (game_state["halfmove_clock"], game_state["turns"])
+            assert position.to_bitboard().history == bitboard.history
+
+
+def test_to_bitboard_keeps_the_evaluation_table(game):
+    position = CompactPosition.from_game_state(game.init_board())
+    bitboard = position.to_bitboard(TABLES["e2"])
+    assert bitboard.score == position.evaluate(TABLES["e2"])
+    assert BitboardPosition.from_game_state(position).key == position.key
+
+
+def test_copy_is_independent(game):
+    position = CompactPosition.from_game_state(game.init_board())
+    child, _, _ = position.make_move(((3, 1), (2, 1)))
+    assert position.board() == game.init_board()["board"]
+    assert child.history == [position.key]
+    assert child.piece_lists is not position.piece_lists
+
+
+def test_search_accepts_a_compact_position(game):
+    position = CompactPosition.from_game_state(game.init_board())
+    from_compact = game.search_position(position, 0, float('inf'), depth_limit=3)
+    from_dict = game.search_position(game.init_board(), 0, float('inf'), depth_limit=3)
+    assert from_compact[-1][:2] == from_dict[-1][:2]
@@ -0,0 +1,76 @@
+from bitboard import BitboardPosition, NO_CAPTURE_LIMIT, board_key
+from perft import parse_board
+
+SHUFFLE = ["E1 E2", "A5 A4", "E2 E1", "A4 A5"]
+
+
+def play(game, game_state, moves):
+    for move_str in moves:
+        game_state, game_over, _ = game.make_move(game_state, game.parse_input(move_str))
+        assert not game_over
+    return game_state
+
+
+def kings_and_pawns(game):
+    game_state = game.init_board()
+    game_state["board"] = parse_board("bK . . . . . . bp . . . . . . . . wp . . . . . . . wK", "white")["board"]
+    return game_state
+
+
+def test_start_position_is_not_a_draw(game):
+    assert not BitboardPosition.from_game_state(game.init_board()).is_draw(100)
+
+
+def test_repetition_is_a_draw(game):
+    game_state = play(game, kings_and_pawns(game), SHUFFLE)
+    position = BitboardPosition.from_game_state(game_state)
+    assert position.halfmove_clock == 4
+    assert position.is_draw(100)
+
+
+def test_no_capture_limit(game):
+    game_state = kings_and_pawns(game)
+    game_state["halfmove_clock"] = NO_CAPTURE_LIMIT - 1
+    game_state["history"] = list(range(NO_CAPTURE_LIMIT - 1))
+    assert not BitboardPosition.from_game_state(game_state).is_draw(100)
+    game_state = play(game, game_state, SHUFFLE[:1])
+    assert BitboardPosition.from_game_state(game_state).is_draw(100)
+
+
+def test_max_turns(game):
+    game_state = play(game, kings_and_pawns(game), SHUFFLE[:2])
+    position = BitboardPosition.from_game_state(game_state)
+    assert not position.is_draw(3)
+    assert position.is_draw(2)
+    assert position.plies_to_draw(3) == 1
+
+
+def test_capture_resets_the_clock(game):
+    game_state = play(game, game.init_board(), ["B2 B3", "C4 B3"])
+    assert game_state["halfmove_clock"] == 0
+    assert game_state["history"] == []
+    assert game_state["turns"] == 2
+
+
+def test_dict_key_is_updated_incrementally(game):
+    game_state = play(game, game.init_board(), ["B2 B3", "C4 B3", "C2 B3", "D5 C3", "D1 D2"])
+    assert game_state["key"] == board_key(game_state["board"], game_state["turn"])
+    assert game_state["key"] == BitboardPosition.from_game_state(game_state).key
+
+
+def test_sibling_states_keep_their_own_history(game):
+    parent = play(game, kings_and_pawns(game), SHUFFLE[:2])
+    first = play(game, parent, ["E2 E1"])
+    second = play(game, parent, ["E2 D1"])
+    assert BitboardPosition.from_game_state(parent).history == BitboardPosition.from_game_state(first).history[:2]
+    assert BitboardPosition.from_game_state(first).history[:2] == BitboardPosition.from_game_state(second).history[:2]
+    assert len(BitboardPosition.from_game_state(second).history) == 3
+    # The first branch still sees its own repetition
+    assert BitboardPosition.from_game_state(play(game, first, SHUFFLE[3:])).is_draw(100)
+
+
+def test_search_scores_a_forced_draw_as_zero(game):
+    game_state = play(game, kings_and_pawns(game), SHUFFLE[:2])
+    game.max_turns = 3
+    completed = game.search_position(game_state, 0, float('inf'), depth_limit=4)
+    assert completed[-1][1] == 0
@@ -0,0 +1,121 @@
+import io
+import threading
+
+import pytest
+
+from engine_protocol import EngineProtocol, move_token, token_move_string
+from game_io import default_game_parameters
+
+
+@pytest.fixture
+def protocol():
+    parameters = default_game_parameters(book="", analysis_cache="", tablebase_dir="", time_limit=5)
+    return EngineProtocol(parameters, output=io.StringIO())
+
+
+def run(protocol, *lines):
+    """Send command lines, wait for the search and return the new output lines."""
+    start = protocol.output.tell()
+    for line in lines:
+        protocol.handle(line)
+    protocol.wait()
+    protocol.output.seek(start)
+    output = protocol.output.read().splitlines()
+    protocol.output.seek(0, io.SEEK_END)
+    return output
+
+
+def test_move_tokens():
+    assert move_token("B2 B3") == "B2B3"
+    assert token_move_string("b2b3") == "B2 B3"
+
+
+def test_isready_and_unknown_command(protocol):
+    assert run(protocol, "isready") == ["readyok"]
+    assert run(protocol, "frobnicate")[0].startswith("error unknown command")
+
+
+def test_position_moves(protocol):
+    run(protocol, "position startpos moves B2B3 C4B3")
+    assert protocol.game_state["turn"] == "white"
+    assert protocol.game_state["board"][2][1] == "bp"
+
+
+def test_illegal_position_is_rejected(protocol):
+    assert run(protocol, "position startpos moves B2B4")[0].startswith("error Illegal move")
+    board = "bK bQ bB bN . . . bp bp . . . . . . . wp wp . . . xN wB wQ wK"
+    assert run(protocol, f"position board {board} white") == ["error Unknown piece 'xN'"]
+    # The previous position is kept
+    assert protocol.game_state["board"][4][1] == "wN"
+
+
+def test_go_depth_reports_completed_iterations(protocol):
+    output = run(protocol, "position startpos", "go depth 3")
+    assert output[-1].startswith("bestmove ")
+    info = output[-2].split()
+    assert info[:3] == ["info", "depth", "3"]
+    # The principal variation starts with the move played
+    assert info[info.index("pv") + 1] == output[-1].split()[1]
+
+
+def test_go_nodes_pv_matches_bestmove(protocol):
+    output = run(protocol, "position startpos", "go nodes 3000")
+    bestmove = output[-1].split()[1]
+    info = output[-2].split()
+    assert info[info.index("pv") + 1] == bestmove
+    assert int(info[2]) == protocol.engine.completed_depth
+
+
+def test_failed_search_still_sends_bestmove(protocol, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(protocol.engine, "search_position", fail)
+    output = run(protocol, "go depth 2")
+    assert output[0].startswith("error search failed")
+    assert output[-1] == "bestmove none"
+
+
+def test_setoption_keeps_or_clears_the_table(protocol):
+    run(protocol, "go depth 3")
+    table = protocol.engine.transposition_table
+    run(protocol, "setoption time_limit 2")
+    assert protocol.engine.transposition_table is table
+    assert table.fill() > 0
+    # Every option that changes scores clears it
+    for option in ("quiescence False", "null_move True", "futility True", "delta_margin 5", "heuristic e1"):
+        run(protocol, "go depth 3")
+        assert table.fill() > 0
+        run(protocol, f"setoption {option}")
+        assert protocol.engine.transposition_table is table
+        assert table.fill() == 0, option
+    assert run(protocol, "setoption nonsense 1")[0].startswith("error")
+
+
+def test_setoption_closes_the_old_analysis_cache(protocol, tmp_path):
+    run(protocol, f"setoption analysis_cache {tmp_path / 'protocol.mcac'}")
+    cache = protocol.engine.analysis_cache
+    run(protocol, "setoption heuristic e2")
+    assert cache.data.closed
+    assert not protocol.engine.analysis_cache.data.closed
+
+
+def test_isready_and_stop_during_infinite_search(protocol):
+    protocol.handle("go infinite")
+    protocol.handle("isready")
+    protocol.handle("position startpos moves B2B3")
+    protocol.handle("stop")
+    output = protocol.output.getvalue().splitlines()
+    assert output[0] == "readyok"
+    assert output[1] == "error position while searching, send stop first"
+    assert output[-1].startswith("bestmove ")
+    assert protocol.game_state["turn"] == "white"
+
+
+def test_run_does_not_block_on_isready(protocol):
+    thread = threading.Thread(target=protocol.run, args=(iter(["go infinite", "isready", "stop", "quit"]),), daemon=True)
+    thread.start()
+    thread.join(30)
+    assert not thread.is_alive()
+    output = protocol.output.getvalue().splitlines()
+    assert "readyok" in output
+    assert output[-1].startswith("bestmove ")
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from bitboard import BitboardPosition
+from evaluation import TABLES, E1_POSITION_WEIGHTS, evaluate_board
+
+VALUES = {"p": 1, "N": 3, "B": 3, "Q": 9, "K": 999}
+
+
+def material(board):
+    """e0 as written in the assignment."""
+    return sum((1 if piece[0] == "w" else -1) * VALUES[piece[1]] for row in board for piece in row if piece != '.')
+
+
+@pytest.mark.parametrize("heuristic", ["e0", "e1", "e2"])
+def test_incremental_score_matches_full_evaluation(game, heuristic):
+    rng = random.Random(heuristic)
+    for _ in range(20):
+        position = BitboardPosition.from_game_state(game.init_board(), TABLES[heuristic])
+        undos = []
+        for _ in range(30):
+            moves = [move for move in position.generate_moves() if not position.captures_king(move)]
+            if not moves:
+                break
+            undos.append(position.apply_move(rng.choice(moves)))
+            assert position.score == evaluate_board(position.to_game_state()["board"], heuristic)
+        # Unwinding gets back to the start score
+        for undo in reversed(undos):
+            position.undo_move(undo)
+        assert position.score == evaluate_board(game.init_board()["board"], heuristic)
+
+
+def test_e0_is_material(game):
+    rng = random.Random(0)
+    game_state = game.init_board()
+    for _ in range(200):
+        assert game.e0_heuristic(game_state) == material(game_state["board"])
+        game_state, game_over, _ = game.make_move(game_state, rng.choice(game.valid_moves(game_state)))
+        if game_over:
+            game_state = game.init_board()
+
+
+def test_e1_adds_the_position_weights(game):
+    board = game.init_board()["board"]
+    positional = sum((1 if piece[0] == "w" else -1) * E1_POSITION_WEIGHTS[row][col]
+                     for row in range(5) for col, piece in enumerate(board[row]) if piece != '.')
+    assert game.e1_heuristic(game.init_board()) == material(board) + positional
+
+
+def test_start_position_is_balanced(game):
+    for heuristic in TABLES:
+        assert evaluate_board(game.init_board()["board"], heuristic) == 0
@@ -0,0 +1,73 @@
+import os
+
+from game_io import default_game_parameters, save_game_trace, trace_filename
+from game_trace import TraceWriter, read_trace, convert_to_text, encode_board, decode_board
+
+MOVES = [((3, 1), (2, 1)), ((1, 2), (2, 1)), ((3, 2), (2, 1))]
+
+
+def initial_board():
+    from MiniChessSkeletonCode import MiniChess
+    return MiniChess(default_game_parameters(book="", tablebase_dir="")).init_board()["board"]
+
+
+def test_board_encoding_round_trip():
+    board = initial_board()
+    assert len(encode_board(board)) == 25
+    assert decode_board(encode_board(board)) == board
+
+
+def test_binary_trace_round_trip(tmp_path):
+    parameters = default_game_parameters()
+    writer = TraceWriter(parameters, initial_board(), snapshot_interval=2, folder=str(tmp_path))
+    stats = {"score": 3, "heuristic_score": -1, "time": 0.25, "nodes": 1234}
+    for turn, move in enumerate(MOVES, 1):
+        writer.record_move(turn, "white" if turn % 2 else "black", move, initial_board(), stats if turn == 1 else None)
+    writer.finish("White")
+
+    trace = read_trace(writer.filename)
+    assert trace["parameters"]["max_turns"] == parameters["max_turns"]
+    assert trace["initial_board"] == initial_board()
+    assert [(entry["start"], entry["end"]) for entry in trace["moves"]] == MOVES
+    assert [entry["player"] for entry in trace["moves"]] == ["white", "black", "white"]
+    assert trace["moves"][0]["score"] == 3 and trace["moves"][0]["nodes"] == 1234
+    assert "score" not in trace["moves"][1]
+    assert list(trace["snapshots"]) == [2]
+    assert trace["winner"] == "White"
+    assert trace["turns"] == 3
+
+
+def test_truncated_trace_keeps_the_moves_written(tmp_path):
+    writer = TraceWriter(default_game_parameters(), initial_board(), folder=str(tmp_path))
+    for turn, move in enumerate(MOVES, 1):
+        writer.record_move(turn, "white" if turn % 2 else "black", move)
+    writer.file.close()
+    with open(writer.filename, "ab") as f:
+        f.write(b"\x00\x01")
+    trace = read_trace(writer.filename)
+    assert len(trace["moves"]) == 3
+    assert trace["winner"] is None
+
+
+def test_convert_to_text(tmp_path):
+    writer = TraceWriter(default_game_parameters(), initial_board(), folder=str(tmp_path))
+    writer.record_move(1, "white", MOVES[0])
+    writer.finish("Draw")
+    text_filename = convert_to_text(writer.filename)
+    with open(text_filename) as f:
+        text = f.read()
+    assert "Turn 1 (White): move from B2 B3" in text
+
+
+def test_trace_filenames_are_unique():
+    parameters = default_game_parameters()
+    names = {trace_filename(parameters, "traces", ".txt") for _ in range(5)}
+    assert len(names) == 5
+
+
+def test_text_traces_do_not_overwrite_each_other(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    parameters = default_game_parameters()
+    for winner in ("White", "Black"):
+        save_game_trace(parameters, ["Turn 1 (White): move from B2 B3"], winner, initial_board())
+    assert len(os.listdir(tmp_path / "game_traces")) == 2
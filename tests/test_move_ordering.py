@@ -0,0 +1,67 @@
+import sys
+
+from bitboard import BitboardPosition, WHITE
+from game_io import get_game_parameters
+from move_ordering import MoveOrderer
+from perft import parse_board
+
+# The pawn on C2 and the Knight on A1 can take the Queen on B3, the pawn can also take the pawn on D3
+CAPTURES = "bK . . . . . . . . . . bQ . bp . . . wp . . wN . . . wK"
+PAWN_TAKES_QUEEN = 17 | 11 << 5
+KNIGHT_TAKES_QUEEN = 20 | 11 << 5
+PAWN_TAKES_PAWN = 17 | 13 << 5
+
+
+def position(text=CAPTURES):
+    return BitboardPosition.from_game_state(parse_board(text, "white"))
+
+
+def test_mvv_lva_takes_the_most_valuable_victim_first():
+    captures = [PAWN_TAKES_QUEEN, KNIGHT_TAKES_QUEEN, PAWN_TAKES_PAWN]
+    moves = position().generate_moves()
+    MoveOrderer().order_moves(position(), moves, 0)
+    assert moves[:3] == captures
+    assert list(MoveOrderer().staged_moves(position(), 0))[:3] == captures
+
+
+def test_killer_comes_before_the_other_quiet_moves(game):
+    start = BitboardPosition.from_game_state(game.init_board())
+    orderer = MoveOrderer()
+    quiets = start.generate_quiets()
+    killer = quiets[-1]
+    # Another quiet move has a large history score
+    orderer.history[WHITE][quiets[0]] = 500
+    orderer.record_cutoff(WHITE, killer, 1, 1)
+    staged = list(orderer.staged_moves(start, 1))
+    captures = len(start.generate_captures())
+    assert staged[captures:captures + 2] == [killer, quiets[0]]
+    moves = start.generate_moves()
+    orderer.order_moves(start, moves, 1)
+    assert moves.index(killer) == captures
+    # Killers belong to their ply
+    assert list(orderer.staged_moves(start, 2))[captures] == quiets[0]
+
+
+def test_history_persists_across_searches(game):
+    orderer = game.move_orderer
+    game.search_position(game.init_board(), 0, float('inf'), depth_limit=4)
+    history = [list(table) for table in orderer.history]
+    assert any(any(table) for table in history)
+    assert orderer.killers
+    game.new_search()
+    # Killers are forgotten, the history is only aged
+    assert orderer.killers == []
+    assert orderer.history == [[score >> 1 for score in table] for table in history]
+    assert any(any(table) for table in orderer.history)
+
+
+def test_ordering_can_be_switched_off(make_game, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["MiniChessSkeletonCode.py", "-t", "5", "-m", "100", "-a", "True",
+                                      "-p", "AI-AI", "-o", "False"])
+    assert get_game_parameters()["move_ordering"] is False
+    game = make_game(move_ordering=False)
+    assert game.move_orderer is None
+    ordered = make_game()
+    for engine in (game, ordered):
+        engine.search_position(engine.init_board(), 0, float('inf'), depth_limit=4)
+    assert game.search_counters()["states_explored"] > ordered.search_counters()["states_explored"]
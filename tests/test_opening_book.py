@@ -0,0 +1,68 @@
+import pytest
+
+from bitboard import BitboardPosition, encode_move
+from opening_book import OpeningBook, build_book, write_book, HEADER, ENTRY
+
+B2B3 = encode_move((3, 1), (2, 1))
+C2C3 = encode_move((3, 2), (2, 2))
+
+
+def start_position(game):
+    return BitboardPosition.from_game_state(game.init_board())
+
+
+def test_write_and_look_up(game, tmp_path):
+    start = start_position(game)
+    path = str(tmp_path / "book.mcb")
+    book = {start.key: [(B2B3, 3, 1), (C2C3, 1, 0)], 5: [(B2B3, 1, -2)], 1 << 63: [(C2C3, 1, 4)]}
+    assert write_book(path, book, 5, "e1") == 4
+    assert (tmp_path / "book.mcb").stat().st_size == HEADER.size + 4 * ENTRY.size
+
+    opening_book = OpeningBook(path, seed=1)
+    assert (opening_book.depth, opening_book.heuristic, len(opening_book)) == (5, "e1", 4)
+    assert sorted(opening_book.moves(start.key)) == [(B2B3, 3, 1), (C2C3, 1, 0)]
+    assert opening_book.moves(1 << 63) == [(C2C3, 1, 4)]
+    assert opening_book.moves(6) == []
+
+
+def test_choose_is_weighted_and_legal(game, tmp_path):
+    start = start_position(game)
+    path = str(tmp_path / "book.mcb")
+    # A move that is not legal here is never chosen
+    illegal = encode_move((0, 0), (1, 0))
+    write_book(path, {start.key: [(B2B3, 9, 1), (C2C3, 1, 0), (illegal, 50, 7)]}, 4, "e0")
+    opening_book = OpeningBook(path, seed=2)
+    chosen = [opening_book.choose(start)[1] for _ in range(200)]
+    assert set(chosen) == {B2B3, C2C3}
+    assert chosen.count(B2B3) > chosen.count(C2C3)
+    # Out of book
+    after, _, _ = game.make_move(game.init_board(), ((3, 1), (2, 1)))
+    assert opening_book.choose(BitboardPosition.from_game_state(after)) is None
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.mcb"
+    path.write_bytes(b"NOPE" + bytes(HEADER.size))
+    with pytest.raises(ValueError):
+        OpeningBook(str(path))
+
+
+def test_built_book_is_played_without_searching(game, make_game, tmp_path):
+    book = build_book(plies=2, depth=2, width=1, margin=0, verbose=False)
+    start = start_position(game)
+    assert start.key in book
+    # The first move of the book was followed one ply
+    assert len(book) == 2
+    path = str(tmp_path / "built.mcb")
+    write_book(path, book, 2, "e0")
+
+    engine = make_game(book=path)
+    move_str, stats = engine.choose_ai_move(engine.init_board())
+    assert stats["book"]
+    assert stats["states_explored"] == 0
+    assert stats["depth"] == 2
+    assert engine.parse_input(move_str) in engine.valid_moves(engine.init_board())
+
+    # A book built for another heuristic is not used
+    other = make_game(book=path, heuristic="e2")
+    assert other.opening_book is None
@@ -0,0 +1,61 @@
+import pytest
+
+from parallel_search import merge_counters, parallel_root_search
+
+
+def counters(nodes, by_depth, iterations):
+    return {
+        "states_explored": nodes, "states_by_depth": by_depth, "total_branching_factor": 2 * nodes,
+        "total_branching_samples": nodes // 2, "tt_probes": 10, "tt_hits": 4, "tt_fill": 0.5, "tb_hits": 1,
+        "nodes": nodes, "quiescence_nodes": 3, "null_move_cutoffs": 1, "reduced_moves": 2,
+        "reduction_re_searches": 0, "futile_moves": 5, "draw_cutoffs": 1,
+        "expanded_by_depth": by_depth, "cutoffs_by_depth": {1: 1}, "first_move_cutoffs_by_depth": {1: 1},
+        "iterations": iterations,
+    }
+
+
+def test_merge_counters():
+    first = counters(100, {0: 1, 1: 99}, [{"depth": 1, "nodes": 10, "seconds": 0.5, "nodes_per_second": 20.0}])
+    second = counters(50, {0: 1, 1: 20, 2: 29}, [{"depth": 1, "nodes": 30, "seconds": 1.0, "nodes_per_second": 30.0},
+                                                 {"depth": 2, "nodes": 20, "seconds": 1.0, "nodes_per_second": 20.0}])
+    merged = merge_counters([first, second])
+    assert merged["states_explored"] == 150
+    assert merged["states_by_depth"] == {0: 2, 1: 119, 2: 29}
+    assert merged["cutoffs_by_depth"] == {1: 2}
+    assert merged["tt_probes"] == 20 and merged["futile_moves"] == 10
+    assert merged["tt_fill"] == 0.5
+    # Iterations run side by side: nodes add up, the slower worker sets the time
+    assert merged["iterations"][0] == {"depth": 1, "nodes": 40, "seconds": 1.0, "nodes_per_second": 40.0}
+    assert merged["iterations"][1]["nodes"] == 20
+    # The inputs are left alone
+    assert first["iterations"][0]["nodes"] == 10
+
+
+def test_merge_counters_without_instrumentation():
+    plain = counters(10, {0: 1, 1: 9}, [])
+    for name in ("expanded_by_depth", "cutoffs_by_depth", "first_move_cutoffs_by_depth", "iterations"):
+        del plain[name]
+    merged = merge_counters([plain, plain])
+    assert "iterations" not in merged
+    assert merged["states_by_depth"] == {0: 2, 1: 18}
+
+
+def test_two_workers_find_the_serial_score(make_game, random_states):
+    # Without transposition tables both searches are exact
+    serial = make_game(hash_size=0)
+    parallel = make_game(hash_size=0, workers=2)
+    try:
+        for game_state in random_states(6, seed=41)[2:]:
+            expected = serial.search_position(game_state, 0, float('inf'), depth_limit=3)[-1][1]
+            score, move, depth, merged = parallel_root_search(parallel, game_state, 0, float('inf'), 2, 3)
+            assert (score, depth) == (expected, 3)
+            assert parallel.parse_input(parallel.move_to_string(move)) in parallel.valid_moves(game_state)
+            assert merged["states_explored"] > 0
+        pool = parallel.worker_pool
+        assert pool is not None
+    finally:
+        parallel.close()
+    assert parallel.worker_pool is None
+    # A shut down pool takes no more work
+    with pytest.raises(RuntimeError):
+        pool.submit(int)
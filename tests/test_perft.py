@@ -0,0 +1,35 @@
+import pytest
+
+from perft import REFERENCE_COUNTS, perft, divide, parse_board
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_bitboard_matches_reference_counts(game, depth):
+    count, _ = perft(game, game.init_board(), depth, "bitboard")
+    assert count == REFERENCE_COUNTS[depth]
+
+
+@pytest.mark.parametrize("backend", ["list", "compact"])
+def test_backends_agree(game, backend):
+    count, _ = perft(game, game.init_board(), 3, backend)
+    assert count == REFERENCE_COUNTS[3]
+
+
+def test_divide_sums_to_perft(game):
+    counts = divide(game, game.init_board(), 3)
+    assert len(counts) == REFERENCE_COUNTS[1]
+    assert sum(counts.values()) == REFERENCE_COUNTS[3]
+    assert divide(game, game.init_board(), 3, "list") == counts
+
+
+def test_king_capture_ends_the_sequence(game):
+    # The Queen can take the King at once: that move has nothing below it
+    game_state = parse_board("bK . . . . wQ . . . . . . . . . . . . . . . . . . wK", "white")
+    counts = divide(game, game_state, 2)
+    assert counts["A4 A5"] == 0
+    assert all(count > 0 for move, count in counts.items() if move != "A4 A5")
+
+
+def test_parse_board_rejects_short_boards():
+    with pytest.raises(ValueError):
+        parse_board("bK . wK", "white")
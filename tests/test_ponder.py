@@ -0,0 +1,52 @@
+from bitboard import BitboardPosition, decode_move
+
+
+def after(game, game_state, move):
+    return game.make_move(game_state, move)[0]
+
+
+def ponder_after_engine_move(game):
+    """Let the engine (White) move, then ponder while the human (Black) thinks."""
+    game_state = game.init_board()
+    move_str, _ = game.choose_ai_move(game_state)
+    human_state = after(game, game_state, game.parse_input(move_str))
+    predicted = game.ponderer.predicted_move(human_state)
+    assert predicted is not None
+    assert game.ponderer.start(human_state)
+    # Let the background search complete two iterations
+    while len(game.ponderer.timer.iterations) < 2 and game.ponderer.thread.is_alive():
+        game.ponderer.thread.join(0.01)
+    game.ponderer.stop()
+    return human_state, predicted
+
+
+def test_predicted_move_is_the_hash_move(make_game):
+    game = make_game(ponder=True)
+    game_state = game.init_board()
+    game.search_position(game_state, 0, float('inf'), depth_limit=3)
+    hash_move = game.transposition_table.probe(BitboardPosition.from_game_state(game_state).key)[3]
+    assert game.ponderer.predicted_move(game_state) == decode_move(hash_move)
+    # Without a table there is nothing to predict
+    assert make_game(ponder=True, hash_size=0).ponderer.predicted_move(game_state) is None
+
+
+def test_ponder_hit(make_game):
+    game = make_game(ponder=True, time_limit=0.3)
+    human_state, predicted = ponder_after_engine_move(game)
+    pondered = game.ponderer.completed
+    assert len(pondered) >= 2
+    state = after(game, human_state, predicted)
+    assert game.ponderer.result_for(state) == pondered
+    _, stats = game.choose_ai_move(state)
+    assert stats["ponder_hit"]
+    assert stats["depth"] >= pondered[-1][0]
+
+
+def test_ponder_miss(make_game):
+    game = make_game(ponder=True, time_limit=0.3)
+    human_state, predicted = ponder_after_engine_move(game)
+    other = next(move for move in game.valid_moves(human_state) if move != predicted)
+    state = after(game, human_state, other)
+    assert game.ponderer.result_for(state) is None
+    _, stats = game.choose_ai_move(state)
+    assert not stats["ponder_hit"]
@@ -0,0 +1,69 @@
+import pytest
+
+from bitboard import BitboardPosition, WHITE
+from evaluation import TABLES
+from perft import parse_board
+from transposition import LOWER_BOUND, UPPER_BOUND
+
+KINGS_AND_PAWNS = "bK . . . . . bp bp . . . . . . . . . wp wp . . . . . wK"
+
+
+def search_stats(game, game_state, depth=4):
+    game.new_search()
+    game.search_position(game_state, 0, float('inf'), depth_limit=depth)
+    return game.search_counters()
+
+
+def test_no_null_move_in_king_and_pawn_endings(make_game):
+    game = make_game(null_move=True)
+    game_state = parse_board(KINGS_AND_PAWNS, "white")
+    position = BitboardPosition.from_game_state(game_state)
+    assert not game.null_move_allowed(position, 1, 5)
+    position.turn ^= 1
+    assert not game.null_move_allowed(position, 1, 5)
+    assert search_stats(game, game_state, 5)["null_move_cutoffs"] == 0
+    # A Knight is enough to allow it
+    with_knight = BitboardPosition.from_game_state(parse_board(KINGS_AND_PAWNS.replace(". wK", "wN wK"), "white"))
+    assert game.null_move_allowed(with_knight, 1, 5)
+    assert not game.null_move_allowed(with_knight, 0, 5)
+
+
+@pytest.mark.parametrize("search", ["minimax", "pvs"])
+@pytest.mark.parametrize("switch, counter", [("null_move", "null_move_cutoffs"), ("lmr", "reduced_moves"),
+                                             ("futility", "futile_moves")])
+def test_each_switch_drives_its_counter(make_game, random_states, search, switch, counter):
+    states = random_states(12, seed=31)[4:]
+    off = make_game(search=search)
+    on = make_game(search=search, **{switch: True})
+    assert sum(search_stats(off, game_state)[counter] for game_state in states) == 0
+    assert sum(search_stats(on, game_state)[counter] for game_state in states) > 0
+    # The other techniques stay off
+    others = {"null_move_cutoffs", "reduced_moves", "futile_moves"} - {counter}
+    assert all(search_stats(on, states[0])[name] == 0 for name in others)
+
+
+def test_futile_nodes_store_a_bound_above_the_skipped_moves(make_game, random_states):
+    game = make_game(futility=True, quiescence=False, move_ordering=False)
+    margin, remaining = game.futility_margin, 2
+    checked = 0
+    for game_state in random_states(120, seed=32):
+        position = BitboardPosition.from_game_state(game_state, TABLES["e0"])
+        white = position.turn == WHITE
+        futility_value = position.score + margin * remaining if white else position.score - margin * remaining
+        # A window that makes every quiet move after the first futile
+        alpha, beta = (futility_value, futility_value + 50) if white else (futility_value - 50, futility_value)
+        game.transposition_table.clear()
+        game.pruning_counts["futile_moves"] = 0
+        value, _, _ = game.minimax(position, 1, 1 + remaining, white, alpha, beta)
+        entry = game.transposition_table.probe(position.key)
+        # Nodes without futile moves, or left on a King capture, are of no interest
+        if not game.pruning_counts["futile_moves"] or entry is None:
+            continue
+        _, bound, score, _ = entry
+        if white:
+            assert score >= futility_value and value >= futility_value
+        else:
+            assert score <= futility_value and value <= futility_value
+        # Nodes that failed low are the ones whose bound the skipped moves could exceed
+        checked += bound == (UPPER_BOUND if white else LOWER_BOUND)
+    assert checked > 0
@@ -0,0 +1,55 @@
+from bitboard import BitboardPosition
+from evaluation import TABLES
+
+
+def scores(game, game_state, depth):
+    return [score for _, score, _ in game.search_position(game_state, 0, float('inf'), depth_limit=depth)]
+
+
+def test_pvs_matches_alpha_beta_without_the_table(make_game, random_states):
+    # Without a transposition table both searches are exact at every depth
+    for game_state in random_states(15, seed=21):
+        alpha_beta = make_game(hash_size=0, search="minimax")
+        pvs = make_game(hash_size=0, search="pvs")
+        assert scores(pvs, game_state, 4) == scores(alpha_beta, game_state, 4)
+
+
+def test_aspiration_windows_search_again_on_fail_high_and_fail_low(make_game, random_states):
+    game = make_game(hash_size=0, search="pvs", aspiration_window=1)
+    game_state = random_states(8, seed=22)[-1]
+    exact = scores(game, game_state, 3)[-1]
+    windows = []
+    negamax = game.negamax
+
+    def root_windows(position, depth, max_depth, alpha, beta, *args, **kwargs):
+        if depth == 0:
+            windows.append((alpha, beta))
+        return negamax(position, depth, max_depth, alpha, beta, *args, **kwargs)
+    game.negamax = root_windows
+
+    position = BitboardPosition.from_game_state(game_state, TABLES["e0"])
+    for guess in (exact - 20, exact + 20):
+        windows.clear()
+        score, move, time_exceeded = game.aspiration_search(position, 3, guess)
+        assert not time_exceeded and move is not None
+        assert score == exact
+        # The first window missed the score and was widened until it did not
+        assert len(windows) > 1
+        assert windows[0][1] - windows[0][0] == 2
+        assert windows[-1][1] - windows[-1][0] > 2
+
+
+def test_principal_variation_is_legal(make_game, random_states):
+    for search in ("pvs", "minimax"):
+        game = make_game(search=search)
+        for game_state in random_states(10, seed=23):
+            completed = game.search_position(game_state, 0, float('inf'), depth_limit=4)
+            line = game.principal_variation
+            assert line[0] == completed[-1][2]
+            assert len(line) <= 4
+            position = BitboardPosition.from_game_state(game_state)
+            for move in line:
+                assert move in position.generate_moves()
+                if position.captures_king(move):
+                    break
+                position.apply_move(move)
@@ -0,0 +1,66 @@
+from bitboard import BitboardPosition, PIECE_VALUES, PAWN, KNIGHT, BISHOP, QUEEN
+from evaluation import TABLES
+from perft import parse_board
+
+# White Bishop on B2 takes the black pawn on C3, which the Knight on E4 defends
+EXCHANGE = "bK . . . . . . . . bN . . bp . . . wB . . . {queen} . . . wK"
+B2C3 = 16 | 12 << 5
+
+
+def position(text, turn="white"):
+    return BitboardPosition.from_game_state(parse_board(text, turn), TABLES["e0"])
+
+
+def test_see_undefended_capture():
+    # The Knight on E4 takes the undefended Bishop on C3
+    exchange = position("bK . . . . . . . . bN . . wB . . . . . . . . . . . wK", "black")
+    assert exchange.static_exchange(9 | 12 << 5) == PIECE_VALUES[BISHOP]
+
+
+def test_see_defended_capture():
+    exchange = position(EXCHANGE.format(queen="."))
+    # Bishop for pawn
+    assert exchange.static_exchange(B2C3) == PIECE_VALUES[PAWN] - PIECE_VALUES[BISHOP]
+
+
+def test_see_x_ray():
+    # The Queen on A1 behind the Bishop recaptures through it: pawn and Knight for the Bishop
+    exchange = position(EXCHANGE.format(queen="wQ"))
+    assert exchange.static_exchange(B2C3) == PIECE_VALUES[PAWN] + PIECE_VALUES[KNIGHT] - PIECE_VALUES[BISHOP]
+
+
+def test_see_promotion():
+    # The pawn on B4 promotes on B5 and the King takes the new Queen
+    exchange = position("bK . . . . . wp . . . . . . . . . . . . . . . . . wK")
+    assert exchange.static_exchange(6 | 1 << 5) == -PIECE_VALUES[PAWN]
+    alone = position(". . . . bK . wp . . . . . . . . . . . . . . . . . wK")
+    assert alone.static_exchange(6 | 1 << 5) == PIECE_VALUES[QUEEN] - PIECE_VALUES[PAWN]
+
+
+def test_quiescence_never_falls_below_stand_pat(game, random_states):
+    for game_state in random_states(150, seed=11):
+        state = BitboardPosition.from_game_state(game_state, TABLES["e0"])
+        white = state.turn == 0
+        game.quiescence_left = game.quiescence_budget
+        value, time_exceeded = game.quiescence(state, float('-inf'), float('inf'), white)
+        assert not time_exceeded
+        assert value >= state.score if white else value <= state.score
+
+
+def test_quiescence_budget_is_respected(make_game, random_states):
+    unlimited = make_game(quiescence_budget=0)
+    budget = 3
+    limited = make_game(quiescence_budget=budget)
+    busy = 0
+    for game_state in random_states(150, seed=12):
+        state = BitboardPosition.from_game_state(game_state, TABLES["e0"])
+        for game in (unlimited, limited):
+            game.quiescence_nodes = 0
+            game.quiescence_left = game.quiescence_budget
+            game.quiescence(state, float('-inf'), float('inf'), state.turn == 0)
+        assert limited.quiescence_nodes <= budget
+        if unlimited.quiescence_nodes <= budget:
+            assert limited.quiescence_nodes == unlimited.quiescence_nodes
+        busy += unlimited.quiescence_nodes > budget
+    # Some of the positions do need more nodes than the budget
+    assert busy > 0
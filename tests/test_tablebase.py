@@ -0,0 +1,144 @@
+import random
+
+import pytest
+
+from bitboard import BitboardPosition, WHITE
+from tablebase import (Tablebases, generate, piece_set, parse_piece, required_sets, set_name, decode_index,
+                       table_size, _reachable, LOSS)
+
+# Plies searched by the brute-force check
+HORIZON = 5
+
+
+@pytest.fixture(scope="module")
+def tablebase_dir(tmp_path_factory):
+    """KvK, KQvK and KpvK."""
+    directory = str(tmp_path_factory.mktemp("tablebases"))
+    generate([piece_set([parse_piece("wp")])], directory, verbose=False)
+    return directory
+
+
+@pytest.fixture
+def tablebases(tablebase_dir):
+    return Tablebases(tablebase_dir)
+
+
+def sample_positions(pieces, count, seed):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        squares, turn = decode_index(rng.randrange(table_size(pieces)), len(pieces))
+        if not _reachable(pieces, squares, turn):
+            continue
+        bitboards = [0] * 10
+        for piece, sq in zip(pieces, squares):
+            bitboards[piece] |= 1 << sq
+        positions.append(BitboardPosition(bitboards, turn))
+    return positions
+
+
+def wins_within(position, plies):
+    """The side to move captures the King within plies, whatever the opponent does."""
+    moves = position.generate_moves()
+    if any(position.captures_king(move) for move in moves):
+        return True
+    if plies < 3:
+        return False
+    for move in moves:
+        undo = position.apply_move(move)
+        lost = loses_within(position, plies - 1)
+        position.undo_move(undo)
+        if lost:
+            return True
+    return False
+
+
+def loses_within(position, plies):
+    """Every move of the side to move lets the opponent capture its King within plies."""
+    moves = position.generate_moves()
+    if not moves or plies < 2:
+        return False
+    for move in moves:
+        if position.captures_king(move):
+            return False
+        undo = position.apply_move(move)
+        won = wins_within(position, plies - 1)
+        position.undo_move(undo)
+        if not won:
+            return False
+    return True
+
+
+def test_required_sets():
+    pieces = piece_set([parse_piece("wp")])
+    assert [set_name(p) for p in required_sets(pieces)] == ["KvK", "KQvK", "KpvK"]
+
+
+@pytest.mark.parametrize("extra", ["wQ", "wp"])
+def test_tables_match_brute_force(tablebases, extra):
+    for position in sample_positions(piece_set([parse_piece(extra)]), 150, seed=len(extra)):
+        value = tablebases.lookup(position)
+        distance = value % LOSS
+        if 0 < value < LOSS and distance <= HORIZON:
+            assert wins_within(position, distance)
+            assert distance <= 2 or not wins_within(position, distance - 2)
+        elif value > LOSS and distance <= HORIZON:
+            assert loses_within(position, distance)
+            assert distance <= 2 or not loses_within(position, distance - 2)
+        else:
+            # A draw, or a result beyond the horizon
+            assert not wins_within(position, HORIZON)
+            assert not loses_within(position, HORIZON)
+
+
+def test_probe_and_best_move(tablebases):
+    for position in sample_positions(piece_set([parse_piece("wQ")]), 100, seed=5):
+        value = tablebases.lookup(position)
+        probed = tablebases.probe(position)
+        if value == 0:
+            assert probed == 0
+            continue
+        white_wins = (value < LOSS) == (position.turn == WHITE)
+        assert probed == (1000 if white_wins else -1000)
+        score, move = tablebases.best_move(position)
+        assert score == probed
+        if position.captures_king(move):
+            continue
+        # The move keeps the result, one ply closer to the King capture
+        position.apply_move(move)
+        child = tablebases.lookup(position)
+        if value < LOSS:
+            assert child == LOSS + value - 1
+        else:
+            assert 0 < child < LOSS and child <= value - LOSS - 1
+
+
+def test_turn_limit_cutoff(tablebases):
+    position = next(position for position in sample_positions(piece_set([parse_piece("wQ")]), 2000, seed=6)
+                    if tablebases.lookup(position) == 3)
+    assert tablebases.probe(position, plies_left=2) is None
+    assert tablebases.best_move(position, plies_left=2) is None
+    assert tablebases.probe(position, plies_left=3) in (1000, -1000)
+    assert tablebases.best_move(position, plies_left=3) is not None
+    # Draws are draws whatever the limit
+    draw = next(position for position in sample_positions(piece_set([parse_piece("wQ")]), 2000, seed=7)
+                if tablebases.lookup(position) == 0)
+    assert tablebases.probe(draw, plies_left=0) == 0
+
+
+def test_uncovered_positions(tablebases, game):
+    assert tablebases.probe(BitboardPosition.from_game_state(game.init_board())) is None
+    assert tablebases.best_move(BitboardPosition.from_game_state(game.init_board())) is None
+
+
+def test_engine_searches_when_the_capture_comes_too_late(tablebases, tablebase_dir, make_game):
+    position = next(position for position in sample_positions(piece_set([parse_piece("wQ")]), 2000, seed=8)
+                    if position.turn == WHITE and tablebases.lookup(position) == 5)
+    game_state = dict(position.to_game_state(), halfmove_clock=0, turns=0, history=[])
+    game = make_game(tablebase_dir=tablebase_dir, max_turns=100)
+    (depth, score, move), = game.search_position(game_state, 0, float('inf'), depth_limit=2)
+    assert score == 1000 and game.states_explored == 1
+    # Four plies before max_turns the tablebase cannot answer, the search has to
+    game.max_turns = 4
+    game.search_position(game_state, 0, float('inf'), depth_limit=2)
+    assert game.states_explored > 1
@@ -0,0 +1,79 @@
+import time
+
+from time_manager import TimeManager, MAX_BRANCHING
+
+
+def test_node_limit_stops_search():
+    timer = TimeManager(float('inf'), node_limit=100, poll_interval=512)
+    stopped_at = next(node for node in range(1, 1000) if timer.expired())
+    assert stopped_at == 100
+    assert not timer.can_start_next_iteration()
+
+
+def test_stop_from_another_thread():
+    timer = TimeManager(60)
+    timer.stop()
+    assert timer.expired()
+    assert not timer.can_start_next_iteration()
+
+
+def test_no_new_iteration_after_soft_deadline():
+    timer = TimeManager(1.0, start_time=time.time() - 0.6)
+    assert not timer.can_start_next_iteration()
+
+
+def test_small_iterations_give_no_estimate():
+    # Iterations answered from a warm transposition table
+    timer = TimeManager(2.0)
+    for nodes, seconds in [(14, 0.0), (14, 0.0), (12821, 0.465)]:
+        timer.record_iteration(nodes, seconds)
+    assert timer.effective_branching_factor() is None
+    assert timer.predicted_next_iteration() is None
+    assert timer.can_start_next_iteration()
+
+
+def test_branching_factor_is_capped():
+    timer = TimeManager(2.0)
+    timer.record_iteration(1000, 0.01)
+    timer.record_iteration(50000, 0.1)
+    assert timer.effective_branching_factor() == MAX_BRANCHING
+    assert timer.predicted_next_iteration() == 0.1 * MAX_BRANCHING
+
+
+def test_predicted_iteration_past_hard_deadline():
+    timer = TimeManager(1.0)
+    timer.record_iteration(1000, 0.1)
+    timer.record_iteration(4000, 0.3)
+    assert not timer.can_start_next_iteration()
+
+
+class FakeClock:
+    """Stands in for the time module: every reading of the clock moves it on by tick seconds."""
+
+    def __init__(self, tick):
+        self.now = 1000.0
+        self.tick = tick
+
+    def time(self):
+        self.now += self.tick
+        return self.now
+
+
+def test_engine_uses_most_of_the_budget_on_a_warm_table(make_game, monkeypatch):
+    import MiniChessSkeletonCode
+    import time_manager
+    # The clock is read about once every poll_interval nodes, so time is proportional to the nodes searched
+    clock = FakeClock(0.01)
+    monkeypatch.setattr(MiniChessSkeletonCode, "time", clock)
+    monkeypatch.setattr(time_manager, "time", clock)
+    budget = 1.0
+    game = make_game(time_limit=budget)
+    game_state = game.init_board()
+    for move_number in range(3):
+        move_str, stats = game.choose_ai_move(game_state)
+        game_state, _, _ = game.make_move(game_state, game.parse_input(move_str))
+        assert stats["time"] <= budget
+        # The table is warm after the first move: its tiny early iterations must not stop the search
+        # before the soft deadline (half the budget)
+        if move_number > 0:
+            assert stats["time"] >= game.time_manager.soft_deadline - game.time_manager.start_time
@@ -0,0 +1,59 @@
+import math
+
+import pytest
+
+from tournament import elo_difference, parse_engine, play_game, run_tournament, summarize
+
+
+def result(white, black, winner, nodes=100, seconds=1.0):
+    return {"white": white, "black": black, "winner": winner, "reason": "King Capture", "turns": 10,
+            "nodes": {"white": nodes, "black": nodes}, "search_time": {"white": seconds, "black": seconds}}
+
+
+def test_elo_difference():
+    assert elo_difference(0.5) == 0
+    assert elo_difference(1.0) == math.inf
+    assert elo_difference(0.0) == -math.inf
+    assert elo_difference(0.75) == pytest.approx(190.85, abs=0.01)
+    assert elo_difference(0.25) == pytest.approx(-elo_difference(0.75))
+
+
+def test_summarize():
+    engines, pairings = summarize([result("a", "b", "white"), result("b", "a", None), result("b", "a", "white")])
+    assert (engines["a"]["wins"], engines["a"]["draws"], engines["a"]["losses"]) == (1, 1, 1)
+    assert engines["a"]["games"] == 3
+    assert engines["a"]["score"] == 0.5 and engines["a"]["elo"] == 0
+    assert engines["b"]["nodes_per_second"] == 100
+    pair = pairings[("a", "b")]
+    assert (pair["wins"], pair["draws"], pair["losses"], pair["games"]) == (1, 1, 1, 3)
+    # Every game won: the Elo difference is unbounded
+    engines, _ = summarize([result("a", "b", "white"), result("b", "a", "black")])
+    assert engines["a"]["elo"] == math.inf and engines["b"]["elo"] == -math.inf
+
+
+def test_parse_engine():
+    name, parameters = parse_engine("fast:heuristic=e1,node_limit=500,alpha_beta=False")
+    assert name == "fast"
+    assert (parameters["heuristic"], parameters["node_limit"], parameters["alpha_beta"]) == ("e1", 500, False)
+    with pytest.raises(ValueError):
+        parse_engine("bad:nonsense=1")
+
+
+def test_two_game_smoke(tmp_path):
+    settings = "node_limit=300,time_limit=60,book=,tablebase_dir=,ponder=False"
+    engines = [parse_engine(f"e0:heuristic=e0,{settings}"), parse_engine(f"e2:heuristic=e2,{settings}")]
+    results = run_tournament(engines, [["B2 B3", "C4 C3"]], 12, 2, str(tmp_path))
+    assert [(game["white"], game["black"]) for game in results] == [("e0", "e2"), ("e2", "e0")]
+    for game in results:
+        assert game["turns"] <= 12
+        assert game["winner"] in ("white", "black", None)
+        assert game["nodes"]["white"] > 0 and game["nodes"]["black"] > 0
+    engines_summary, _ = summarize(results)
+    assert sum(entry["games"] for entry in engines_summary.values()) == 4
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_illegal_opening_is_rejected():
+    engine = parse_engine("e0:book=,tablebase_dir=,ponder=False")
+    with pytest.raises(ValueError):
+        play_game(engine, engine, ["B2 B4"], 10)
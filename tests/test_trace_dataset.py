@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from game_io import default_game_parameters, save_game_trace
+from game_trace import TraceWriter
+from trace_dataset import TraceDataset, ingest, parse_text_trace, SCORE_MISSING
+
+MOVES = [("B2 B3", ((3, 1), (2, 1))), ("C4 B3", ((1, 2), (2, 1))), ("C2 B3", ((3, 2), (2, 1)))]
+
+
+def write_traces(game, folder):
+    """The same three moves as a binary trace (with search statistics) and a text trace."""
+    parameters = default_game_parameters()
+    board = game.init_board()["board"]
+    writer = TraceWriter(parameters, board, folder=str(folder))
+    stats = {"score": 2, "heuristic_score": 0, "time": 0.5, "nodes": 100}
+    for turn, (_, move) in enumerate(MOVES, 1):
+        writer.record_move(turn, "white" if turn % 2 else "black", move, None, stats)
+    writer.finish("White")
+    moves_log = [f"Turn {turn} ({'White' if turn % 2 else 'Black'}): move from {move_str}"
+                 for turn, (move_str, _) in enumerate(MOVES, 1)]
+    text = folder / "game.txt"
+    save_game_trace(parameters, moves_log, "Black", board, filename=str(text))
+    return text
+
+
+def test_text_trace_round_trip(game, tmp_path):
+    trace = parse_text_trace(write_traces(game, tmp_path))
+    assert trace["initial_board"] == game.init_board()["board"]
+    assert [(entry["start"], entry["end"]) for entry in trace["moves"]] == [move for _, move in MOVES]
+    assert trace["winner"] == "Black"
+
+
+def test_ingest_and_query(game, tmp_path):
+    write_traces(game, tmp_path)
+    dataset_dir = tmp_path / "dataset"
+    assert ingest([str(tmp_path)], str(dataset_dir)) == 2
+    dataset = TraceDataset(str(dataset_dir))
+    assert len(dataset) == 2 * len(MOVES)
+
+    summary = dataset.position_summary(game.init_board())
+    assert summary["occurrences"] == 2 and summary["games"] == 2
+    entry = summary["moves"]["B2 B3"]
+    assert entry["count"] == 2
+    assert entry["white_wins"] == 1 and entry["black_wins"] == 1
+    # Only the binary trace has search scores
+    assert entry["scores"] == [2]
+
+    after, _, _ = game.make_move(game.init_board(), MOVES[0][1])
+    assert set(dataset.position_summary(after)["moves"]) == {"C4 B3"}
+    assert len(dataset.rows(12345)) == 0
+    assert SCORE_MISSING in set(int(score) for score in dataset.score)
+
+
+def test_ingest_skips_known_files(game, tmp_path):
+    write_traces(game, tmp_path)
+    dataset_dir = tmp_path / "dataset"
+    ingest([str(tmp_path)], str(dataset_dir))
+    assert ingest([str(tmp_path)], str(dataset_dir)) == 0
+    assert len(TraceDataset(str(dataset_dir))) == 2 * len(MOVES)
@@ -0,0 +1,73 @@
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+
+def small_table():
+    table = TranspositionTable(0.001)
+    assert table.size > 10
+    return table
+
+
+def test_store_and_probe():
+    table = small_table()
+    assert table.probe(12345) is None
+    table.store(12345, 4, EXACT, -7, 33)
+    assert table.probe(12345) == (4, EXACT, -7, 33)
+    assert table.probes == 2 and table.hits == 1
+    assert table.hit_rate() == 0.5
+
+
+def test_missing_move_is_none():
+    table = small_table()
+    table.store(5, 1, UPPER_BOUND, 0, None)
+    assert table.probe(5) == (1, UPPER_BOUND, 0, None)
+
+
+def test_deeper_entry_of_the_same_search_is_kept():
+    table = small_table()
+    first, second = 7, 7 + table.size  # same slot
+    table.store(first, 6, EXACT, 1, 2)
+    table.store(second, 3, LOWER_BOUND, 4, 5)
+    assert table.probe(first) == (6, EXACT, 1, 2)
+    assert table.probe(second) is None
+    # A deeper result does replace it
+    table.store(second, 7, LOWER_BOUND, 4, 5)
+    assert table.probe(second) == (7, LOWER_BOUND, 4, 5)
+    assert table.probe(first) is None
+
+
+def test_same_position_is_always_replaced():
+    table = small_table()
+    table.store(7, 6, EXACT, 1, 2)
+    table.store(7, 2, UPPER_BOUND, -3, 4)
+    assert table.probe(7) == (2, UPPER_BOUND, -3, 4)
+
+
+def test_entries_of_earlier_searches_are_replaceable():
+    table = small_table()
+    first, second = 9, 9 + table.size
+    table.store(first, 8, EXACT, 1, 2)
+    table.new_search()
+    assert table.probes == 0 and table.hits == 0
+    # Still readable in the new search...
+    assert table.probe(first) == (8, EXACT, 1, 2)
+    # ...but a shallower result of this search takes the slot
+    table.store(second, 1, EXACT, 3, 4)
+    assert table.probe(second) == (1, EXACT, 3, 4)
+
+
+def test_generation_wraps_around():
+    table = small_table()
+    for _ in range(300):
+        table.new_search()
+    assert 0 <= table.generation < 256
+
+
+def test_fill_and_clear():
+    table = small_table()
+    for key in range(10):
+        table.store(key, 1, EXACT, 0, None)
+    assert table.used == 10
+    assert table.fill() == 10 / table.size
+    table.clear()
+    assert table.fill() == 0
+    assert table.probe(3) is None
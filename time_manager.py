@@ -0,0 +1,85 @@
+"""
+Time management for one get_ai_move search.
+
+The clock is only read every `poll_interval` nodes. An optional node budget
+makes searches reproducible regardless of machine speed. A new iteration is only
+started before the soft deadline, and only if the time it is predicted to take
+(the last iteration's time multiplied by the measured effective branching
+factor) fits before the hard deadline. Iterations answered almost entirely
+from the transposition table say nothing about the branching factor, so only
+iterations of at least MIN_ESTIMATE_NODES nodes are used, and the estimate is
+capped at MAX_BRANCHING; without an estimate the soft deadline alone decides. Reaching the hard deadline or the node
+budget, or a call to stop() from another thread, aborts the search at the next
+node.
+"""
+
+import time
+
+# Iterative deepening never goes deeper than this
+MAX_SEARCH_DEPTH = 64
+# Smallest iteration whose node count is used to estimate the branching factor
+MIN_ESTIMATE_NODES = 200
+# Upper bound of the branching factor estimate
+MAX_BRANCHING = 8.0
+
+
+class TimeManager:
+    """Soft and hard deadlines for one search, with cooperative cancellation."""
+
+    def __init__(self, time_limit, start_time=None, soft_fraction=0.5, hard_fraction=0.95, poll_interval=512, node_limit=0):
+        self.start_time = start_time if start_time is not None else time.time()
+        self.time_limit = time_limit
+        self.soft_deadline = self.start_time + time_limit * soft_fraction
+        self.hard_deadline = self.start_time + time_limit * hard_fraction
+        self.poll_interval = poll_interval
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.next_poll = self._next_poll()
+        self.stopped = False
+        # (nodes, seconds) of every completed iteration
+        self.iterations = []
+
+    def _next_poll(self):
+        next_poll = self.nodes + self.poll_interval
+        return min(next_poll, self.node_limit) if self.node_limit else next_poll
+
+    def expired(self):
+        """Called at every node; reads the clock once every poll_interval nodes."""
+        self.nodes += 1
+        if self.nodes >= self.next_poll:
+            self.next_poll = self._next_poll()
+            if time.time() >= self.hard_deadline or (self.node_limit and self.nodes >= self.node_limit):
+                self.stopped = True
+        return self.stopped
+
+    def stop(self):
+        """Ask the search to stop at its next node (safe to call from another thread)."""
+        self.stopped = True
+
+    def record_iteration(self, nodes, seconds):
+        self.iterations.append((nodes, seconds))
+
+    def effective_branching_factor(self):
+        """Ratio of the node counts of the last two iterations, or None if they are too small to tell."""
+        if len(self.iterations) < 2 or self.iterations[-2][0] < MIN_ESTIMATE_NODES:
+            return None
+        return min(MAX_BRANCHING, self.iterations[-1][0] / self.iterations[-2][0])
+
+    def predicted_next_iteration(self):
+        """Seconds the next iteration is expected to take, or None without a branching factor estimate."""
+        branching = self.effective_branching_factor()
+        if branching is None:
+            return None
+        return self.iterations[-1][1] * max(1.0, branching)
+
+    def can_start_next_iteration(self):
+        now = time.time()
+        if self.stopped or now >= self.soft_deadline:
+            return False
+        if self.node_limit and self.nodes >= self.node_limit:
+            return False
+        predicted = self.predicted_next_iteration()
+        return predicted is None or now + predicted <= self.hard_deadline
+
+    def elapsed(self):
+        return time.time() - self.start_time
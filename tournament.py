@@ -0,0 +1,219 @@
+"""
+Headless AI-vs-AI tournaments across a process pool.
+
+Engines are described as name:key=value,... where the keys are game
+parameters (see default_game_parameters in game_io.py), for example
+"ab-e1:heuristic=e1,alpha_beta=True,time_limit=0.2" or
+"nodes-e0:heuristic=e0,node_limit=5000,time_limit=60". Every pair of engines
+plays every opening twice, once with each colour. Openings are either random
+legal plies from init_board or lines read from a book file (one opening per
+line, moves separated by commas, e.g. "B2 B3,B5 B4").
+
+Games print nothing and write no trace files unless -t gives a folder for
+streamed binary traces (see game_trace.py). The runner prints the win/draw/loss
+table, Elo differences and nodes per second when all games are done.
+
+python tournament.py -e "e0:heuristic=e0,node_limit=2000" -e "e2:heuristic=e2,node_limit=2000" -g 100 -w 8
+"""
+
+import os
+import json
+import math
+import random
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from game_io import default_game_parameters, parse_parameter
+from game_trace import TraceWriter
+from bitboard import NO_CAPTURE_LIMIT
+
+
+def parse_engine(spec):
+    """'name:key=value,...' -> (name, game_parameters)."""
+    name, _, settings = spec.partition(":")
+    parameters = default_game_parameters(play_mode="AI-AI")
+    for setting in filter(None, settings.split(",")):
+        key, _, value = setting.partition("=")
+        if key not in parameters:
+            raise ValueError(f"Unknown game parameter {key!r} in engine {name!r}")
+        parameters[key] = parse_parameter(parameters, key, value)
+    return name, parameters
+
+
+def random_openings(count, plies, seed):
+    """count openings of `plies` random legal moves from init_board."""
+    from MiniChessSkeletonCode import MiniChess
+    game = MiniChess(default_game_parameters())
+    rng = random.Random(seed)
+    openings = []
+    while len(openings) < count:
+        game_state = game.init_board()
+        line = []
+        for _ in range(plies):
+            start, end = rng.choice(game.valid_moves(game_state))
+            game_state, game_over, _ = game.make_move(game_state, (start, end))
+            if game_over:
+                break
+            line.append(f"{game.coordinate_to_string(start)} {game.coordinate_to_string(end)}")
+        if len(line) == plies:
+            openings.append(line)
+    return openings
+
+
+def read_book_openings(path):
+    with open(path) as f:
+        return [[move.strip() for move in line.split(",")] for line in f if line.strip() and not line.startswith("#")]
+
+
+def play_game(white, black, opening, max_turns, trace_folder=None):
+    """
+    Play one game between two (name, game_parameters) engines after the opening
+    moves, with the rules of MiniChess.execute_move. Returns a result dict.
+    """
+    from MiniChessSkeletonCode import MiniChess
+    # The engines search with the game's max_turns, so they see the same draws as the referee
+    engines = {"white": MiniChess(dict(white[1], max_turns=max_turns)), "black": MiniChess(dict(black[1], max_turns=max_turns))}
+    game_state = engines["white"].init_board()
+    nodes = {"white": 0, "black": 0}
+    search_time = {"white": 0.0, "black": 0.0}
+    no_capture = 0
+    turns = 0
+    winner = None
+    reason = "Max Moves Reached"
+    trace = None
+    if trace_folder:
+        trace_parameters = dict(white[1], max_turns=max_turns, play_mode=f"{white[0]}-{black[0]}")
+        trace = TraceWriter(trace_parameters, game_state["board"], white[1].get("snapshot_interval", 10), trace_folder)
+
+    while True:
+        side = game_state["turn"]
+        engine = engines[side]
+        stats = None
+        if turns < len(opening):
+            move_str = opening[turns]
+        else:
+            move_str, stats = engine.get_ai_move(game_state)
+            nodes[side] += stats["nodes"]
+            search_time[side] += stats["time"]
+        if move_str is None:
+            reason = "No Moves"
+            break
+        move = engine.parse_input(move_str)
+        if move is None or move not in engine.valid_moves(game_state):
+            raise ValueError(f"Illegal move {move_str!r} in game {white[0]} - {black[0]}")
+
+        target_piece = game_state["board"][move[1][0]][move[1][1]]
+        next_state, _, _ = engine.make_move(game_state, move)
+        if trace is not None:
+            trace.record_move(turns + 1, side, move, next_state["board"], stats)
+        if target_piece in ["bK", "wK"]:
+            winner = side
+            reason = "King Capture"
+            break
+        no_capture = 0 if target_piece != '.' else no_capture + 1
+        turns += 1
+        if no_capture >= NO_CAPTURE_LIMIT:
+            reason = "10 Turns No Capture"
+            break
+        game_state = next_state
+        if turns >= max_turns:
+            break
+
+    if trace is not None:
+        trace.finish(f"{winner.capitalize()} ({reason})" if winner else f"Draw ({reason})")
+    for engine in engines.values():
+        engine.close()
+    return {
+        "white": white[0],
+        "black": black[0],
+        "winner": winner,
+        "reason": reason,
+        "turns": turns,
+        "nodes": nodes,
+        "search_time": search_time,
+    }
+
+
+def elo_difference(score):
+    """Elo difference implied by a score fraction (1 = all wins)."""
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+
+def summarize(results):
+    """Aggregate game results per engine and per pairing."""
+    engines = {}
+    pairings = {}
+    for result in results:
+        for side, other in (("white", "black"), ("black", "white")):
+            name = result[side]
+            entry = engines.setdefault(name, {"wins": 0, "draws": 0, "losses": 0, "nodes": 0, "search_time": 0.0})
+            pair = pairings.setdefault((name, result[other]), {"wins": 0, "draws": 0, "losses": 0})
+            if result["winner"] is None:
+                outcome = "draws"
+            elif result["winner"] == side:
+                outcome = "wins"
+            else:
+                outcome = "losses"
+            entry[outcome] += 1
+            pair[outcome] += 1
+            entry["nodes"] += result["nodes"][side]
+            entry["search_time"] += result["search_time"][side]
+    for entry in list(engines.values()) + list(pairings.values()):
+        games = entry["wins"] + entry["draws"] + entry["losses"]
+        entry["games"] = games
+        entry["score"] = (entry["wins"] + 0.5 * entry["draws"]) / games if games else 0.0
+        entry["elo"] = elo_difference(entry["score"])
+    for entry in engines.values():
+        entry["nodes_per_second"] = entry["nodes"] / entry["search_time"] if entry["search_time"] else 0.0
+    return engines, pairings
+
+
+def run_tournament(engines, openings, max_turns, workers, trace_folder=None):
+    """Play every pairing of engines on every opening with both colours; returns the list of results."""
+    games = []
+    for first, second in itertools.combinations(engines, 2):
+        for opening in openings:
+            games.append((first, second, opening, max_turns, trace_folder))
+            games.append((second, first, opening, max_turns, trace_folder))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(play_game, *zip(*games))) if games else []
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless Mini Chess AI-vs-AI tournament")
+    parser.add_argument("-e", "--engine", action="append", required=True,
+                        help="Engine as name:key=value,... (give at least two)")
+    parser.add_argument("-g", "--games", type=int, default=10, help="Number of openings (each played with both colours)")
+    parser.add_argument("-r", "--random_plies", type=int, default=2, help="Plies of each random opening")
+    parser.add_argument("-b", "--book", type=str, default=None, help="File of opening lines instead of random openings")
+    parser.add_argument("-m", "--max_turns", type=int, default=100, help="Maximum number of turns per game")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Seed for random openings")
+    parser.add_argument("-t", "--traces", type=str, default=None, help="Folder for binary game traces (none by default)")
+    parser.add_argument("-j", "--json", type=str, default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    engines = [parse_engine(spec) for spec in args.engine]
+    openings = read_book_openings(args.book)[:args.games] if args.book else random_openings(args.games, args.random_plies, args.seed)
+    results = run_tournament(engines, openings, args.max_turns, args.workers, args.traces)
+    per_engine, per_pairing = summarize(results)
+
+    print(f"{len(results)} games")
+    for name, entry in per_engine.items():
+        print(f"{name}: +{entry['wins']} ={entry['draws']} -{entry['losses']}  score {entry['score'] * 100:.1f}%  "
+              f"Elo {entry['elo']:+.0f}  {entry['nodes_per_second']:.0f} nodes/sec")
+    for (name, opponent), entry in per_pairing.items():
+        print(f"  {name} vs {opponent}: +{entry['wins']} ={entry['draws']} -{entry['losses']}  Elo {entry['elo']:+.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "games": results,
+                "engines": per_engine,
+                "pairings": [dict(entry, engine=name, opponent=opponent) for (name, opponent), entry in per_pairing.items()],
+            }, f, indent=2)
@@ -0,0 +1,324 @@
+"""
+Columnar dataset of the positions played in recorded games, with a hash index.
+
+`ingest` replays every game trace (the text files written by save_game_trace
+and the binary .mct files of game_trace.py) and stores one row per move
+played, as NumPy columns that are opened memory-mapped:
+
+    key        uint64   Zobrist key of the position before the move (bitboard.py)
+    board      uint8    25 squares of that position (0 empty, colour * 5 + piece type + 1)
+    turn       uint8    side to move (0 White, 1 Black)
+    move       uint16   packed move played (start | end << 5)
+    score      int32    search score of the move (SCORE_MISSING for human moves)
+    heuristic  int32    heuristic score of the move (SCORE_MISSING for human moves)
+    seconds    float32  search time
+    nodes      uint32   nodes searched (0 when the trace does not say)
+    ply        uint16   move number in its game, from 1
+    game       uint32   row of the game in games.json
+    outcome    int8     +1 White won, -1 Black won, 0 draw, OUTCOME_UNKNOWN unfinished
+
+The index is an open-addressing hash table on the key, with linear probing:
+slot_keys/slot_starts/slot_counts point into `order`, the row numbers sorted
+by key, so all the occurrences of a position are one contiguous slice.
+
+python trace_dataset.py ingest game_traces -o trace_dataset
+python trace_dataset.py query -o trace_dataset --board "bK bQ bB bN . . . bp bp . . . . . . . . . . . . . wN wB wQ wK" --turn black
+"""
+
+import os
+import re
+import json
+import glob
+import argparse
+
+import numpy as np
+
+from bitboard import BitboardPosition, WHITE, BLACK, encode_move, decode_move
+from game_io import default_game_parameters
+from game_trace import read_trace, square_name
+
+SCORE_MISSING = np.iinfo(np.int32).min
+OUTCOME_UNKNOWN = -2
+
+COLUMNS = {
+    "key": np.uint64,
+    "board": np.uint8,
+    "turn": np.uint8,
+    "move": np.uint16,
+    "score": np.int32,
+    "heuristic": np.int32,
+    "seconds": np.float32,
+    "nodes": np.uint32,
+    "ply": np.uint16,
+    "game": np.uint32,
+    "outcome": np.int8,
+}
+INDEX_COLUMNS = ("order", "slot_keys", "slot_starts", "slot_counts")
+
+MOVE_LINE = re.compile(r"Turn (\d+) \((White|Black)\): move from ([A-E][1-5]) ([A-E][1-5])(.*)")
+STAT_FIELDS = {
+    "seconds": re.compile(r"time for this action: ([-\d.]+) sec"),
+    "heuristic": re.compile(r"heuristic score: (-?\d+)"),
+    "score": re.compile(r"alpha-beta search score: (-?\d+)"),
+}
+
+
+def parse_square(text):
+    return 5 - int(text[1]), ord(text[0]) - ord('A')
+
+
+def outcome_of(winner):
+    """+1/-1/0 from a winner string such as 'White (King Capture)' or 'Draw (Max Moves Reached)'."""
+    if winner is None:
+        return OUTCOME_UNKNOWN
+    if winner.startswith("White"):
+        return 1
+    if winner.startswith("Black"):
+        return -1
+    if winner.startswith("Draw"):
+        return 0
+    return OUTCOME_UNKNOWN
+
+
+def parse_text_trace(filename):
+    """
+    Read a text trace into the same dict layout as game_trace.read_trace
+    (parameters, initial_board, moves and winner).
+    """
+    with open(filename, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    trace = {"parameters": {}, "initial_board": None, "moves": [], "winner": None}
+    section = None
+    board_rows = []
+    for line in lines:
+        if line.endswith(":") and not line.startswith("Turn"):
+            section = line
+            continue
+        if section == "Game Parameters:" and ": " in line:
+            name, value = line.split(": ", 1)
+            trace["parameters"][name] = value
+        elif section == "Initial Board Configuration:" and line.strip() and len(board_rows) < 5 and not line.startswith("["):
+            board_rows.append(line.split())
+        elif section == "Game Moves:":
+            match = MOVE_LINE.match(line)
+            if match:
+                entry = {
+                    "turn": int(match.group(1)),
+                    "player": match.group(2).lower(),
+                    "start": parse_square(match.group(3)),
+                    "end": parse_square(match.group(4)),
+                }
+                for name, pattern in STAT_FIELDS.items():
+                    found = pattern.search(match.group(5))
+                    if found:
+                        entry[name] = float(found.group(1)) if name == "seconds" else int(found.group(1))
+                trace["moves"].append(entry)
+        if line.startswith("Winner: "):
+            trace["winner"] = line[len("Winner: "):].rsplit(" (after", 1)[0]
+    if len(board_rows) == 5:
+        trace["initial_board"] = board_rows
+    return trace
+
+
+def _initial_board():
+    from MiniChessSkeletonCode import MiniChess
+    return MiniChess(default_game_parameters(hash_size=0, tablebase_dir="")).init_board()["board"]
+
+
+def position_bytes(position):
+    """25-byte board of a BitboardPosition, in the encoding of game_trace.encode_board."""
+    board = bytearray(25)
+    for index, bb in enumerate(position.pieces):
+        while bb:
+            low = bb & -bb
+            board[low.bit_length() - 1] = index + 1
+            bb ^= low
+    return bytes(board)
+
+
+def game_rows(trace, game, default_board):
+    """Replay one trace and return its rows as a list of tuples in COLUMNS order."""
+    board = trace["initial_board"] or default_board
+    position = BitboardPosition.from_game_state({"board": board, "turn": "white"})
+    outcome = outcome_of(trace["winner"])
+    rows = []
+    for ply, entry in enumerate(trace["moves"], 1):
+        turn = BLACK if entry["player"] == "black" else WHITE
+        if turn != position.turn:
+            raise ValueError(f"Move {ply} is played by the wrong side")
+        move = encode_move(entry["start"], entry["end"])
+        rows.append((
+            position.key,
+            position_bytes(position),
+            turn,
+            move,
+            entry.get("score", SCORE_MISSING),
+            entry.get("heuristic", entry.get("heuristic_score", SCORE_MISSING)),
+            entry.get("seconds", entry.get("time", 0.0)),
+            entry.get("nodes", 0),
+            ply,
+            game,
+            outcome,
+        ))
+        if position.captures_king(move):
+            break
+        position.apply_move(move)
+    return rows
+
+
+def build_index(keys):
+    """
+    Hash index of a key column: returns (order, slot_keys, slot_starts, slot_counts).
+    Empty slots have a count of 0.
+    """
+    order = np.argsort(keys, kind="stable").astype(np.uint32)
+    sorted_keys = keys[order]
+    unique_keys, starts, counts = np.unique(sorted_keys, return_index=True, return_counts=True)
+    size = 1 << max(4, (2 * len(unique_keys)).bit_length())
+    mask = np.uint64(size - 1)
+    slot_keys = np.zeros(size, dtype=np.uint64)
+    slot_starts = np.zeros(size, dtype=np.uint32)
+    slot_counts = np.zeros(size, dtype=np.uint32)
+
+    # Linear probing done in rounds: in round r every key not yet placed tries
+    # home + r, and the first one to claim an empty slot takes it. A key placed in
+    # round r saw slots home..home+r-1 taken, so probing from home finds it.
+    home = unique_keys & mask
+    pending = np.arange(len(unique_keys))
+    probe = 0
+    while len(pending):
+        slots = ((home[pending] + np.uint64(probe)) & mask).astype(np.int64)
+        free = slot_counts[slots] == 0
+        candidates, first = np.unique(slots[free], return_index=True)
+        winners = pending[free][first]
+        slot_keys[candidates] = unique_keys[winners]
+        slot_starts[candidates] = starts[winners]
+        slot_counts[candidates] = counts[winners]
+        placed = np.zeros(len(pending), dtype=bool)
+        placed[np.flatnonzero(free)[first]] = True
+        pending = pending[~placed]
+        probe += 1
+    return order, slot_keys, slot_starts, slot_counts
+
+
+def ingest(paths, directory):
+    """
+    Add the games of the trace files in `paths` (files or folders) to the dataset
+    in `directory`, skipping files that are already in it. Returns the number of
+    games added.
+    """
+    os.makedirs(directory, exist_ok=True)
+    games_file = os.path.join(directory, "games.json")
+    games = []
+    if os.path.exists(games_file):
+        with open(games_file) as f:
+            games = json.load(f)
+    known = {game["file"] for game in games}
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(glob.glob(os.path.join(path, "*.txt")) + glob.glob(os.path.join(path, "*.mct")))
+        else:
+            files.append(path)
+
+    default_board = _initial_board()
+    rows = []
+    added = 0
+    for filename in files:
+        name = os.path.abspath(filename)
+        if name in known:
+            continue
+        trace = read_trace(filename) if filename.endswith(".mct") else parse_text_trace(filename)
+        rows += game_rows(trace, len(games), default_board)
+        games.append({"file": name, "parameters": trace["parameters"], "winner": trace["winner"], "moves": len(trace["moves"])})
+        known.add(name)
+        added += 1
+
+    columns = {}
+    for column, (name, dtype) in enumerate(COLUMNS.items()):
+        values = [row[column] for row in rows]
+        if name == "board":
+            new = np.frombuffer(b"".join(values), dtype=np.uint8).reshape(-1, 25)
+        else:
+            new = np.array(values, dtype=dtype)
+        path = os.path.join(directory, f"{name}.npy")
+        columns[name] = np.concatenate([np.load(path), new]) if os.path.exists(path) else new
+    for name, values in columns.items():
+        np.save(os.path.join(directory, f"{name}.npy"), values)
+    for name, values in zip(INDEX_COLUMNS, build_index(columns["key"])):
+        np.save(os.path.join(directory, f"{name}.npy"), values)
+    with open(games_file, "w") as f:
+        json.dump(games, f, indent=1)
+    return added
+
+
+class TraceDataset:
+    """Read-only, memory-mapped view of a dataset written by ingest."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        for name in list(COLUMNS) + list(INDEX_COLUMNS):
+            setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+        with open(os.path.join(directory, "games.json")) as f:
+            self.games = json.load(f)
+        self.mask = len(self.slot_keys) - 1
+
+    def __len__(self):
+        return len(self.key)
+
+    def rows(self, key):
+        """Row numbers of every recorded occurrence of the position with this Zobrist key."""
+        slot = key & self.mask
+        while self.slot_counts[slot]:
+            if self.slot_keys[slot] == key:
+                start = int(self.slot_starts[slot])
+                return np.asarray(self.order[start:start + int(self.slot_counts[slot])])
+            slot = (slot + 1) & self.mask
+        return np.zeros(0, dtype=np.uint32)
+
+    def rows_for(self, game_state):
+        return self.rows(BitboardPosition.from_game_state(game_state).key)
+
+    def position_summary(self, game_state):
+        """How a position was played and scored across all the recorded games."""
+        rows = self.rows_for(game_state)
+        moves = {}
+        for row in rows:
+            start, end = decode_move(int(self.move[row]))
+            move_str = f"{square_name(start)} {square_name(end)}"
+            entry = moves.setdefault(move_str, {"count": 0, "scores": [], "white_wins": 0, "draws": 0, "black_wins": 0})
+            entry["count"] += 1
+            if self.score[row] != SCORE_MISSING:
+                entry["scores"].append(int(self.score[row]))
+            outcome = int(self.outcome[row])
+            if outcome == 1:
+                entry["white_wins"] += 1
+            elif outcome == -1:
+                entry["black_wins"] += 1
+            elif outcome == 0:
+                entry["draws"] += 1
+        return {"occurrences": len(rows), "games": len(set(int(self.game[row]) for row in rows)), "moves": moves}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index recorded Mini Chess games by position")
+    parser.add_argument("command", choices=["ingest", "query"])
+    parser.add_argument("paths", nargs="*", default=["game_traces"], help="Trace files or folders to ingest")
+    parser.add_argument("-o", "--dataset", type=str, default="trace_dataset", help="Dataset folder")
+    parser.add_argument("--board", type=str, default=None, help="25 squares row by row from A5 (default: init_board)")
+    parser.add_argument("--turn", type=str, choices=["white", "black"], default="white", help="Side to move")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        added = ingest(args.paths, args.dataset)
+        print(f"Added {added} games; {len(TraceDataset(args.dataset))} positions in {args.dataset}")
+    else:
+        from perft import parse_board
+        board = parse_board(args.board, args.turn)["board"] if args.board else _initial_board()
+        summary = TraceDataset(args.dataset).position_summary({"board": board, "turn": args.turn})
+        print(f"{summary['occurrences']} occurrences in {summary['games']} games")
+        for move_str, entry in sorted(summary["moves"].items(), key=lambda item: -item[1]["count"]):
+            average = f"{sum(entry['scores']) / len(entry['scores']):.1f}" if entry["scores"] else "-"
+            print(f"{move_str}: played {entry['count']} times, average score {average}, "
+                  f"+{entry['white_wins']} ={entry['draws']} -{entry['black_wins']} (White's view)")
@@ -0,0 +1,76 @@
+"""
+Fixed-size transposition table for the alpha-beta search.
+
+Entries are kept in parallel typed arrays (key, depth, bound, score, move,
+generation), so the memory use is fixed by the size in MB given on the command
+line and does not grow during the game.
+"""
+
+from array import array
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+# key (8) + score (4) + move (2) + depth (1) + bound (1) + generation (1)
+ENTRY_BYTES = 17
+
+
+class TranspositionTable:
+    """Zobrist-keyed table of search results with a depth-preferred replacement policy."""
+
+    def __init__(self, size_mb=16):
+        self.size_mb = size_mb
+        self.size = max(1, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        self.keys = array('Q', [0]) * self.size
+        self.scores = array('i', [0]) * self.size
+        self.moves = array('H', [0]) * self.size
+        self.depths = array('b', [-1]) * self.size
+        self.bounds = array('B', [0]) * self.size
+        self.generations = array('B', [0]) * self.size
+        self.generation = 0
+        self.used = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self):
+        """Start a new search: entries from earlier searches become replaceable and the counters reset."""
+        self.generation = (self.generation + 1) & 0xFF
+        self.probes = 0
+        self.hits = 0
+
+    def clear(self):
+        self.__init__(self.size_mb)
+
+    def probe(self, key):
+        """Return (depth, bound, score, move) stored for key, or None."""
+        self.probes += 1
+        slot = key % self.size
+        if self.keys[slot] != key or self.depths[slot] < 0:
+            return None
+        self.hits += 1
+        return self.depths[slot], self.bounds[slot], self.scores[slot], self.moves[slot] or None
+
+    def store(self, key, depth, bound, score, move):
+        """
+        Store a result. A slot holding a different position is only replaced
+        if it comes from an earlier search or was searched less deeply.
+        """
+        slot = key % self.size
+        stored_depth = self.depths[slot]
+        if stored_depth < 0:
+            self.used += 1
+        elif (self.keys[slot] != key and self.generations[slot] == self.generation
+              and stored_depth > depth):
+            return
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.bounds[slot] = bound
+        self.scores[slot] = score
+        self.moves[slot] = move if move is not None else 0
+        self.generations[slot] = self.generation
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def fill(self):
+        """Fraction of slots in use."""
+        return self.used / self.size